@@ -0,0 +1,29 @@
+"""批量分类基准测试 - 多进程分块分类样例标题的吞吐量"""
+import sys
+from pathlib import Path
+from typing import Iterator, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.batch_classifier import BatchClassifier
+from benchmarks.bench_keyword_matcher import _sample_titles
+
+
+def _sample_batches(count: int, batch: int = 1_000_000) -> Iterator[List[str]]:
+    """按批生成样例标题"""
+    for offset in range(0, count, batch):
+        yield _sample_titles(min(batch, count - offset), distinct=batch)
+
+
+if __name__ == '__main__':
+    # 用法: python benchmarks/bench_batch_classifier.py [标题数量] [进程数]
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    with BatchClassifier(workers=workers) as classifier:
+        for titles in _sample_batches(count):
+            classifier.classify(titles, "600519", "贵州茅台")
+        stats = classifier.get_stats()
+    print(
+        f"进程数 {stats['workers']}，分类 {stats['titles']} 条标题，耗时 {stats['seconds']:.1f} 秒，"
+        f"{stats['titles_per_second']} 条/秒"
+    )
@@ -0,0 +1,95 @@
+"""JSON/JSONP解码基准测试 - 原来的正则+json.loads解码方式与 decode() 的耗时对比"""
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.collectors.jsonp import BACKEND, decode
+
+
+def _sample_payload(source: str, records: int = 25) -> bytes:
+    """生成与上交所/东方财富公告接口响应结构一致的样例（JSONP包装）"""
+    if source == 'sse':
+        rows = [
+            {
+                'SECURITY_CODE': '600519', 'SECURITY_NAME': '贵州茅台',
+                'TITLE': f'贵州茅台关于第{i}次临时股东大会决议的公告',
+                'URL': f'/disclosure/listedinfo/announcement/c/new/2026-09-{i % 28 + 1:02d}/600519_20260901_{i}.pdf',
+                'SSEDATE': f'2026-09-{i % 28 + 1:02d}', 'BULLETIN_TYPE': '临时公告', 'BULLETIN_HEADING': '股东大会决议'
+            }
+            for i in range(records)
+        ]
+        body = {'actionErrors': [], 'pageHelp': {'pageNo': 1, 'pageSize': records, 'total': 1200, 'data': [rows]},
+                'result': [rows], 'isPagination': 'true'}
+        return b'jsonpCallback1(' + json.dumps(body, ensure_ascii=False).encode('utf-8') + b')'
+    notices = [
+        {
+            'code': f'AN2026090{i:06d}', 'title': f'<em class="red">贵州茅台</em>:关于回购股份进展的公告{i}',
+            'content': '公司' * 60, 'date': f'2026-09-{i % 28 + 1:02d} 00:00:00',
+            'securityFullName': '贵州茅台', 'stockCode': '600519'
+        }
+        for i in range(records)
+    ]
+    body = {'code': 0, 'msg': '', 'hitsTotal': 1200, 'result': {'noticeWeb': notices}}
+    return b'jQuery(' + json.dumps(body, ensure_ascii=False).encode('utf-8') + b')'
+
+
+def _legacy_decode(text: str) -> Any:
+    """原来的解码方式：正则提取回调内容后用标准库解析（基准测试对照）"""
+    match = re.search(r'\w+\((.*)\)', text, re.S)
+    return json.loads(match.group(1))
+
+
+def benchmark(payloads: dict, rounds: int = 2000) -> dict:
+    """
+    对比原解码方式（response.text + 正则 + json.loads）与 decode(response.content)
+    
+    Args:
+        payloads: 名称到响应字节的字典
+        rounds: 每种方式的重复次数
+    
+    Returns:
+        名称到 {legacy_us, decode_us, speedup, identical} 的字典（单次耗时，微秒）
+    """
+    results = {}
+    for name, raw in payloads.items():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            legacy = _legacy_decode(raw.decode('utf-8'))
+        legacy_seconds = (time.perf_counter() - start) / rounds
+        
+        start = time.perf_counter()
+        for _ in range(rounds):
+            decoded = decode(raw)
+        decode_seconds = (time.perf_counter() - start) / rounds
+        
+        results[name] = {
+            'legacy_us': round(legacy_seconds * 1e6, 1),
+            'decode_us': round(decode_seconds * 1e6, 1),
+            'speedup': round(legacy_seconds / decode_seconds, 1) if decode_seconds else 0.0,
+            'identical': legacy == decoded
+        }
+    return results
+
+
+if __name__ == '__main__':
+    # 用法: python benchmarks/bench_jsonp.py [名称=保存的响应文件 ...]
+    # 不指定文件时使用生成的上交所/东方财富样例响应
+    payloads = {}
+    for arg in sys.argv[1:]:
+        name, _, path = arg.partition('=')
+        with open(path or name, 'rb') as f:
+            payloads[name] = f.read()
+    if not payloads:
+        payloads = {'sse': _sample_payload('sse'), 'eastmoney': _sample_payload('eastmoney')}
+    
+    print(f"JSON库: {BACKEND}")
+    for name, result in benchmark(payloads).items():
+        print(
+            f"{name:12s} 原方式 {result['legacy_us']:8.1f} us  decode {result['decode_us']:8.1f} us  "
+            f"{result['speedup']:5.1f}x  结果一致: {result['identical']}"
+        )
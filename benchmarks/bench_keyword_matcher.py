@@ -0,0 +1,174 @@
+"""标题关键词匹配基准测试 - 原来逐个关键词判断的实现与预编译匹配器、实体索引的耗时对比"""
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.collectors.keyword_matcher import (
+    CATEGORIES, CATEGORY_RULES, DEFAULT_CATEGORY, FINANCIAL_REPORT_KEYWORDS, HIGH_KEYWORDS, IRRELEVANT_KEYWORDS,
+    LOW_KEYWORDS, MATCHER, OTHER_COMPANIES, EntityIndex, judge_category, judge_importance, title_flags
+)
+
+
+def _legacy_judge_importance(title: str, stock_code: str, stock_name: str = "") -> str:
+    """原来的实现：每次调用逐个关键词 in 判断（基准测试对照）"""
+    title_upper = title.upper()
+    is_directly_related = bool(stock_name and stock_name in title) or stock_code in title
+    if any(company in title for company in OTHER_COMPANIES) and not is_directly_related:
+        return "低"
+    for keyword in IRRELEVANT_KEYWORDS:
+        if keyword in title:
+            return "低"
+    for keyword in FINANCIAL_REPORT_KEYWORDS:
+        if keyword in title:
+            return "高"
+    if is_directly_related:
+        for keyword in HIGH_KEYWORDS:
+            if keyword in title or keyword in title_upper:
+                return "高"
+    for keyword in LOW_KEYWORDS:
+        if keyword in title or keyword in title_upper:
+            return "低"
+    if not is_directly_related:
+        return "低"
+    return "中"
+
+
+def _legacy_judge_category(title: str) -> str:
+    """原来的分类实现（基准测试对照）"""
+    for category, keywords in CATEGORY_RULES:
+        if any(kw in title for kw in keywords):
+            return category
+    return DEFAULT_CATEGORY
+
+
+def _sample_titles(count: int, distinct: int = 50_000) -> List[str]:
+    """
+    生成样例标题：公司名、关键词与编号组合，最多 distinct 个不同标题
+    
+    实际采集中同一标题会出现在多个来源和多只股票的结果里，因此样例也包含重复。
+    """
+    companies = ['贵州茅台', '600519', '药明康德', '恒瑞医药', '某科技公司', '']
+    phrases = [
+        '关于召开2026年第一次临时股东大会的通知', '2026年半年度报告', '关于筹划重大资产重组的停牌公告',
+        '关于控股股东减持股份的预披露公告', '网友热议新品发布', '行业观察：白酒板块十大看点',
+        '关于收到上海证券交易所问询函的公告', '中标重大项目', '分析师点评三季度业绩', '荣获年度品牌奖',
+        '关于回购股份进展的公告', '业绩快报', 'ETF资金流向', '关于高管辞职的公告'
+    ]
+    combinations = len(companies) * len(phrases)
+    titles = []
+    for i in range(count):
+        n = i % distinct
+        titles.append(
+            f"{companies[n % len(companies)]}{phrases[n // len(companies) % len(phrases)]}（{n // combinations}）"
+        )
+    return titles
+
+
+def benchmark(count: int = 1_000_000, stock_code: str = "600519", stock_name: str = "贵州茅台") -> Dict:
+    """
+    对比原实现与预编译匹配器分类 count 个标题的耗时
+    
+    Args:
+        count: 标题数量
+        stock_code: 股票代码
+        stock_name: 股票名称
+    
+    Returns:
+        {titles, legacy_seconds, matcher_seconds, uncached_seconds, speedup, identical}
+    """
+    titles = _sample_titles(count)
+    
+    start = time.perf_counter()
+    legacy = [
+        (_legacy_judge_importance(title, stock_code, stock_name), _legacy_judge_category(title))
+        for title in titles
+    ]
+    legacy_seconds = time.perf_counter() - start
+    
+    # 不使用缓存：每个标题都完整扫描一次重要性关键词
+    start = time.perf_counter()
+    for title in titles:
+        MATCHER.scan(title)
+    uncached_seconds = time.perf_counter() - start
+    
+    title_flags.cache_clear()
+    CATEGORIES.cache_clear()
+    start = time.perf_counter()
+    results = [
+        (judge_importance(title, stock_code, stock_name), judge_category(title))
+        for title in titles
+    ]
+    matcher_seconds = time.perf_counter() - start
+    
+    return {
+        'titles': count,
+        'legacy_seconds': round(legacy_seconds, 3),
+        'matcher_seconds': round(matcher_seconds, 3),
+        'uncached_seconds': round(uncached_seconds, 3),
+        'speedup': round(legacy_seconds / matcher_seconds, 1) if matcher_seconds else 0.0,
+        'identical': legacy == results
+    }
+
+
+def benchmark_entities(entities: int = 5000, titles: int = 20000) -> Dict:
+    """
+    对比逐个名称 in 判断与 EntityIndex 在全部A股规模的名称中查找公司的耗时
+    
+    Args:
+        entities: 公司数量（随机生成的四字简称）
+        titles: 标题数量
+    
+    Returns:
+        {entities, titles, naive_seconds, index_seconds, speedup, identical}
+    """
+    import random
+    
+    rng = random.Random(0)
+    pool = '中国华安平海通信科技电子能源医药生物银行证券保险建设实业控股集团发展新材智能汽车光伏'
+    names: Dict[str, str] = {}
+    while len(names) < entities:
+        name = ''.join(rng.choice(pool) for _ in range(4))
+        if name not in names.values():
+            names[f'{len(names):06d}'] = name
+    index = EntityIndex({code: [name] for code, name in names.items()})
+    samples = [
+        f"{rng.choice(list(names.values()))}{title}" if i % 3 else title
+        for i, title in enumerate(_sample_titles(titles, distinct=titles))
+    ]
+    
+    start = time.perf_counter()
+    naive = [{code for code, name in names.items() if name in title} for title in samples]
+    naive_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    found = [index._find_keys(title) for title in samples]
+    index_seconds = time.perf_counter() - start
+    
+    return {
+        'entities': entities,
+        'titles': titles,
+        'naive_seconds': round(naive_seconds, 3),
+        'index_seconds': round(index_seconds, 3),
+        'speedup': round(naive_seconds / index_seconds, 1) if index_seconds else 0.0,
+        'identical': all(set(keys) == expected for keys, expected in zip(found, naive))
+    }
+
+
+if __name__ == '__main__':
+    # 用法: python benchmarks/bench_keyword_matcher.py [标题数量]
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    result = benchmark(count)
+    print(f"标题数: {result['titles']}")
+    print(f"原实现（重要性+分类）: {result['legacy_seconds']:.3f} 秒")
+    print(f"仅扫描重要性关键词（无缓存）: {result['uncached_seconds']:.3f} 秒")
+    print(f"匹配器（重要性+分类）: {result['matcher_seconds']:.3f} 秒  {result['speedup']:.1f}x")
+    print(f"结果一致: {result['identical']}")
+    
+    result = benchmark_entities()
+    print(f"\n公司名称查找（{result['entities']} 家公司，{result['titles']} 条标题）")
+    print(f"逐个名称判断: {result['naive_seconds']:.3f} 秒")
+    print(f"实体索引:     {result['index_seconds']:.3f} 秒  {result['speedup']:.1f}x")
+    print(f"结果一致: {result['identical']}")
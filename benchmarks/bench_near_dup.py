@@ -0,0 +1,143 @@
+"""近似重复聚类基准测试 - 样例消息上的 LSH 聚类吞吐量，以及与两两比较的事件数对照"""
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.collectors.base_collector import NewsItem
+from src.collectors.near_dup import (
+    CONTENT_CHARS, MIN_TITLE_LENGTH, SIMILARITY_THRESHOLD, WINDOW_DAYS, NearDuplicateClusterer,
+    _DisjointSet, merge_signatures, minhash_signature, normalize_text, similarity
+)
+
+
+def _sample_news(count: int, seed: int = 7) -> Tuple[List[NewsItem], List[int]]:
+    """
+    生成样例消息：每个事件由 1~4 个来源以略有不同的标题转载（加前缀、增删词语、
+    正文截断或省略），一年内随机分布
+    
+    Returns:
+        (消息列表, 每条消息所属事件的编号)
+    """
+    import random
+    from datetime import datetime, timedelta
+    
+    rng = random.Random(seed)
+    words = [
+        '公司', '股东', '减持', '增持', '回购', '股份', '进展', '公告', '业绩', '预告', '季度', '报告', '中标',
+        '项目', '合同', '签订', '重大', '资产', '重组', '停牌', '复牌', '问询函', '回复', '董事会', '决议',
+        '高管', '辞职', '聘任', '分红', '派息', '实施', '募集', '资金', '使用', '临床', '试验', '获批', '上市',
+        '新药', '申请', '受理', '合作', '协议', '投资', '设立', '子公司', '诉讼', '仲裁', '担保', '关联', '交易',
+        '分析师', '点评', '评级', '买入', '目标价', '机构', '调研', '纪要', '北向', '流入', '涨停', '大宗',
+        '龙虎榜', '营收', '净利润', '同比', '增长', '下降', '亿元', '年度', '市场', '份额', '产品', '发布',
+        '技术', '突破', '海外', '订单'
+    ]
+    prefixes = ['', '', '【独家】', '快讯：', '重磅！', '突发｜']
+    sources = ['东方财富', '同花顺', '雪球', '新浪财经', '证券时报']
+    start = datetime(2026, 1, 1)
+    
+    items: List[NewsItem] = []
+    events: List[int] = []
+    event = 0
+    while len(items) < count:
+        published = start + timedelta(days=rng.randrange(365), hours=rng.randrange(24))
+        title = ''.join(rng.choices(words, k=rng.randint(6, 10)))
+        content = ''.join(rng.choices(words, k=rng.randint(20, 40)))
+        for source in rng.sample(sources, rng.choice([1, 1, 1, 2, 3, 4])):
+            variant = title
+            if rng.random() < 0.3:
+                position = rng.randrange(len(variant) + 1)
+                variant = variant[:position] + rng.choice(words) + variant[position:]
+            roll = rng.random()
+            items.append(NewsItem(
+                title=rng.choice(prefixes) + variant,
+                date=published + timedelta(hours=rng.randrange(12)),
+                source=source,
+                url=f"https://example.com/{source}/{event}",
+                content=content if roll < 0.6 else (content[:len(content) // 2] if roll < 0.8 else None)
+            ))
+            events.append(event)
+        event += 1
+    return items[:count], events[:count]
+
+
+def _pairwise_clusters(items: List[NewsItem], threshold: float, window_days: int) -> int:
+    """不分桶、两两比较窗口内全部消息时的事件数（基准测试对照）"""
+    texts = [normalize_text(item.title) for item in items]
+    titles = [minhash_signature(text) for text in texts]
+    full = [
+        merge_signatures(titles[i], minhash_signature(normalize_text(item.content[:CONTENT_CHARS])))
+        if item.content else titles[i]
+        for i, item in enumerate(items)
+    ]
+    groups = _DisjointSet(len(items))
+    for i in range(len(items)):
+        for j in range(i):
+            if len(texts[i]) < MIN_TITLE_LENGTH or len(texts[j]) < MIN_TITLE_LENGTH:
+                continue
+            if abs((items[i].date.date() - items[j].date.date()).days) > window_days:
+                continue
+            if similarity(titles[i], titles[j]) >= threshold or (
+                items[i].content and items[j].content and similarity(full[i], full[j]) >= threshold
+            ):
+                groups.union(i, j)
+    return len({groups.find(i) for i in range(len(items))})
+
+
+def benchmark(count: int = 200_000, pairwise: int = 5_000) -> Dict:
+    """
+    聚类 count 条样例消息，并在前 pairwise 条上与两两比较对照
+    
+    Args:
+        count: 消息数量
+        pairwise: 两两比较对照的消息数量
+    
+    Returns:
+        {items, events, clusters, impure, seconds, items_per_second, candidates,
+         pairwise_items, pairwise_clusters, lsh_clusters, pairwise_seconds, lsh_seconds}
+    """
+    items, events = _sample_news(count)
+    clusterer = NearDuplicateClusterer()
+    clusters = clusterer.cluster(items)
+    stats = clusterer.get_stats()
+    
+    event_of = {id(item): event for item, event in zip(items, events)}
+    impure = sum(1 for cluster in clusters if len({event_of[id(item)] for item in cluster.items}) > 1)
+    
+    sample = items[:pairwise]
+    start = time.perf_counter()
+    pairwise_clusters = _pairwise_clusters(sample, SIMILARITY_THRESHOLD, WINDOW_DAYS)
+    pairwise_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    lsh_clusters = len(NearDuplicateClusterer().cluster(sample))
+    lsh_seconds = time.perf_counter() - start
+    
+    return {
+        'items': count,
+        'events': len(set(events)),
+        'clusters': len(clusters),
+        'impure': impure,
+        'seconds': stats['seconds'],
+        'items_per_second': stats['items_per_second'],
+        'candidates': stats['candidates'],
+        'pairwise_items': len(sample),
+        'pairwise_clusters': pairwise_clusters,
+        'lsh_clusters': lsh_clusters,
+        'pairwise_seconds': round(pairwise_seconds, 3),
+        'lsh_seconds': round(lsh_seconds, 3)
+    }
+
+
+if __name__ == '__main__':
+    # 用法: python benchmarks/bench_near_dup.py [消息数量]
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    result = benchmark(count)
+    print(f"消息数: {result['items']}（样例事件 {result['events']} 个）")
+    print(f"LSH聚类: {result['seconds']:.3f} 秒，{result['items_per_second']} 条/秒，候选比较 {result['candidates']} 次")
+    print(f"事件数: {result['clusters']}，混入不同事件的组: {result['impure']}")
+    print(
+        f"\n前 {result['pairwise_items']} 条对照: 两两比较 {result['pairwise_seconds']:.3f} 秒 / "
+        f"{result['pairwise_clusters']} 个事件，LSH {result['lsh_seconds']:.3f} 秒 / {result['lsh_clusters']} 个事件"
+    )
@@ -0,0 +1,296 @@
+"""HTML解析基准测试 - lxml 快速路径与 BeautifulSoup 对照实现（快速路径上线前的版本）的耗时和结果对比"""
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.collectors.parsing import (
+    Record, _timed_call, parse_bse_results, parse_csrc_list, parse_eastmoney_news_search, parse_guba_list,
+    parse_tonghuashun_search, parse_tonghuashun_stock_page
+)
+
+
+def parse_tonghuashun_stock_page_bs4(html: str) -> List[Record]:
+    """
+    解析同花顺个股页面的新闻/公告板块
+    
+    date_text 优先取条目中的日期元素，没有时取文本中第一个形如日期的片段。
+    """
+    records = []
+    soup = BeautifulSoup(html, 'lxml')
+    
+    news_sections = soup.find_all(['div', 'ul'], class_=re.compile(r'news|notice|announcement|gglist', re.I))
+    for section in news_sections:
+        for news_elem in section.find_all(['li', 'a'], limit=30):
+            link = news_elem if news_elem.name == 'a' else news_elem.find('a', href=True)
+            if not link:
+                continue
+            
+            title = link.get_text(strip=True)
+            href = link.get('href', '')
+            if not title or len(title) < 5 or not href:
+                continue
+            
+            date_elem = news_elem.find(['span', 'em'], class_=re.compile(r'date|time', re.I))
+            if date_elem:
+                date_text = date_elem.get_text(strip=True)
+            else:
+                date_match = re.search(r'(\d{2}-\d{2}|\d{4}-\d{2}-\d{2})', news_elem.get_text())
+                date_text = date_match.group(1) if date_match else ''
+            
+            records.append({'title': title, 'href': href, 'date_text': date_text})
+    
+    return records
+
+
+def parse_tonghuashun_search_bs4(html: str) -> List[Record]:
+    """解析同花顺资讯搜索结果"""
+    records = []
+    soup = BeautifulSoup(html, 'lxml')
+    
+    for news in soup.find_all(['li', 'div'], class_=re.compile(r'list|item', re.I), limit=20):
+        link = news.find('a', href=True)
+        if not link:
+            continue
+        
+        date_elem = news.find(['span', 'time'], class_=re.compile(r'date|time', re.I))
+        records.append({
+            'title': link.get_text(strip=True),
+            'href': link['href'],
+            'date_text': date_elem.get_text(strip=True) if date_elem else ''
+        })
+    
+    return records
+
+
+def parse_guba_list_bs4(html: str, limit: int = 30) -> Tuple[int, List[Record]]:
+    """
+    解析东方财富股吧帖子列表（只保留带日期的帖子）
+    
+    Returns:
+        (页面上的帖子总数, 前 limit 个帖子中的有效记录)
+    """
+    records = []
+    soup = BeautifulSoup(html, 'lxml')
+    
+    posts = soup.find_all(['div', 'tr'], class_=re.compile(r'articleh|list-item', re.I))
+    for post in posts[:limit]:
+        link = post.find('a', href=True)
+        if not link:
+            continue
+        
+        title = link.get_text(strip=True)
+        if not title or len(title) < 5:
+            continue
+        
+        date_elem = post.find(['span', 'td'], class_=re.compile(r'time|date', re.I))
+        if not date_elem:
+            continue
+        
+        records.append({
+            'title': title,
+            'href': link['href'],
+            'date_text': date_elem.get_text(strip=True)
+        })
+    
+    return len(posts), records
+
+
+def parse_eastmoney_news_search_bs4(html: str, limit: int = 20) -> List[Record]:
+    """解析东方财富新闻搜索结果（只保留带日期的条目）"""
+    records = []
+    soup = BeautifulSoup(html, 'lxml')
+    
+    news_items = soup.find_all(['div', 'li'], class_=re.compile(r'news-item|result-item', re.I))
+    for news in news_items[:limit]:
+        link = news.find('a', href=True)
+        date_elem = news.find(['span', 'time'], class_=re.compile(r'date|time', re.I))
+        if not link or not date_elem:
+            continue
+        
+        records.append({
+            'title': link.get_text(strip=True),
+            'href': link['href'],
+            'date_text': date_elem.get_text(strip=True)
+        })
+    
+    return records
+
+
+def parse_csrc_list_bs4(html: str) -> List[Record]:
+    """解析证监会公告列表"""
+    records = []
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    for article in soup.select('.article-item'):
+        title_elem = article.select_one('.title')
+        date_elem = article.select_one('.date')
+        link_elem = article.select_one('a')
+        if not all([title_elem, date_elem, link_elem]):
+            continue
+        
+        records.append({
+            'title': title_elem.text.strip(),
+            'href': link_elem.get('href', ''),
+            'date_text': date_elem.text.strip()
+        })
+    
+    return records
+
+
+def parse_bse_results_bs4(html: str) -> Optional[List[Record]]:
+    """
+    解析北交所搜索结果页（#quotationTable 中的 div.main-show）
+    
+    Returns:
+        记录列表；页面中没有结果表格时返回None
+    """
+    soup = BeautifulSoup(html, 'lxml')
+    
+    quotation_table = soup.find('div', id='quotationTable')
+    if not quotation_table:
+        return None
+    
+    records = []
+    for result_div in quotation_table.find_all('div', class_='main-show'):
+        tit_cell = result_div.find('div', class_='tit-cell')
+        if not tit_cell:
+            continue
+        
+        link = tit_cell.find('a', href=True)
+        if not link:
+            continue
+        
+        # 标题在 p.tit1 的 title 属性中，没有时从链接文本提取并去掉末尾的日期
+        title_p = link.find('p', class_='tit1')
+        if title_p and title_p.get('title'):
+            title = title_p.get('title').strip()
+        else:
+            title_text = link.get_text(strip=True)
+            title = re.sub(r'\s*\d{4}[-/]\d{1,2}[-/]\d{1,2}\s*$', '', title_text).strip()
+        
+        href = link.get('href', '')
+        if not title or not href:
+            continue
+        
+        date_span = result_div.find('span', class_=re.compile(r'time', re.I))
+        records.append({
+            'title': title,
+            'href': href,
+            'date_text': date_span.get_text(strip=True) if date_span else ''
+        })
+    
+    return records
+
+
+SAMPLE_PARSERS = {
+    'tonghuashun_stock': (parse_tonghuashun_stock_page, parse_tonghuashun_stock_page_bs4),
+    'tonghuashun_search': (parse_tonghuashun_search, parse_tonghuashun_search_bs4),
+    'guba': (parse_guba_list, parse_guba_list_bs4),
+    'eastmoney_news': (parse_eastmoney_news_search, parse_eastmoney_news_search_bs4),
+    'csrc': (parse_csrc_list, parse_csrc_list_bs4),
+    'bse': (parse_bse_results, parse_bse_results_bs4),
+}
+
+
+def _sample_page(source: str, entries: int = 300, filler: int = 3000) -> str:
+    """生成接近真实页面规模的样例页面（大量无关节点 + 目标列表）"""
+    noise = ''.join(
+        f'<div class="nav-{i % 7}"><span>菜单{i}</span><a href="/m/{i}">栏目 {i}</a><p>{"正文" * 5}</p></div>'
+        for i in range(filler)
+    )
+    if source == 'tonghuashun_stock':
+        body = ''.join(
+            f'<ul class="news_list"><li><a href="/20260{i % 9 + 1}01/c{i}.shtml">贵州茅台公告第{i}号 重大合同</a>'
+            f'<span class="date">0{i % 9 + 1}-01</span></li></ul>'
+            for i in range(entries)
+        )
+    elif source == 'tonghuashun_search':
+        body = ''.join(
+            f'<li class="list-item"><a href="/cjxx/{i}.shtml">贵州茅台资讯{i}</a><span class="time">2026-09-01</span></li>'
+            for i in range(entries)
+        )
+    elif source == 'guba':
+        body = ''.join(
+            f'<div class="articleh normal_post"><span class="l3"><a href="/news,600519,{i}.html">茅台股吧帖子标题{i}</a></span>'
+            f'<span class="l5 update_time">2026-09-01 10:{i % 60:02d}</span></div>'
+            for i in range(entries)
+        )
+    elif source == 'eastmoney_news':
+        body = ''.join(
+            f'<div class="news-item"><a href="https://finance.eastmoney.com/a/{i}.html">茅台新闻<em>{i}</em></a>'
+            f'<span class="news-time">2026-09-01 08:00</span></div>'
+            for i in range(entries)
+        )
+    elif source == 'csrc':
+        body = ''.join(
+            f'<div class="article-item"><a href="/csrc/c{i}/content.shtml"><span class="title"> 行政处罚决定书{i} </span></a>'
+            f'<span class="date">2026-09-01</span></div>'
+            for i in range(entries)
+        )
+    else:
+        body = '<div id="quotationTable">' + ''.join(
+            f'<div class="main-show clearfix"><div class="tit-cell"><a href="/disclosure/2026/{i}.pdf">'
+            f'<p class="tit1" title="[临时公告]诺思兰德:公告{i}">公告{i}</p></a></div><span class="time">2026-09-01</span></div>'
+            for i in range(entries)
+        ) + '</div>'
+    return f'<html><head><title>样例</title><style>.a{{}}</style></head><body>{noise}{body}{noise}</body></html>'
+
+
+def benchmark(pages: Dict[str, str], rounds: int = 5) -> Dict[str, Dict]:
+    """
+    对比 lxml 快速路径与 BeautifulSoup 对照实现的解析耗时，并校验两者结果一致
+    
+    Args:
+        pages: 数据源名称到页面HTML的字典（名称见 SAMPLE_PARSERS）
+        rounds: 每个解析函数的重复次数（取最短耗时）
+    
+    Returns:
+        数据源名称到 {lxml_ms, bs4_ms, speedup, records, identical} 的字典
+    """
+    results = {}
+    for source, html in pages.items():
+        fast, reference = SAMPLE_PARSERS[source]
+        timings = []
+        outputs = []
+        for func in (fast, reference):
+            best = None
+            for _ in range(rounds):
+                output, elapsed = _timed_call(func, html)
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(best)
+            outputs.append(output)
+        
+        records = outputs[0][1] if isinstance(outputs[0], tuple) else outputs[0]
+        results[source] = {
+            'lxml_ms': round(timings[0] * 1000, 2),
+            'bs4_ms': round(timings[1] * 1000, 2),
+            'speedup': round(timings[1] / timings[0], 1) if timings[0] else 0.0,
+            'records': len(records or []),
+            'identical': outputs[0] == outputs[1]
+        }
+    return results
+
+
+if __name__ == '__main__':
+    # 用法: python benchmarks/bench_parsing.py [数据源=保存的页面.html ...]
+    # 不指定页面时使用生成的样例页面
+    pages = {}
+    for arg in sys.argv[1:]:
+        source, _, path = arg.partition('=')
+        if source not in SAMPLE_PARSERS or not path:
+            raise SystemExit(f"参数格式应为 数据源=文件路径，数据源可选: {', '.join(SAMPLE_PARSERS)}")
+        with open(path, 'r', encoding='utf-8') as f:
+            pages[source] = f.read()
+    if not pages:
+        pages = {source: _sample_page(source) for source in SAMPLE_PARSERS}
+    
+    for source, result in benchmark(pages).items():
+        print(
+            f"{source:20s} lxml {result['lxml_ms']:8.2f} ms  bs4 {result['bs4_ms']:8.2f} ms  "
+            f"{result['speedup']:5.1f}x  记录 {result['records']}  结果一致: {result['identical']}"
+        )
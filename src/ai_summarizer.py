@@ -1,15 +1,29 @@
 """AI摘要生成器"""
-import httpx
 import json
 from typing import List, Dict, Optional
 from datetime import datetime
 from .collectors.base_collector import NewsItem
+from .collectors.http_session import HTTPSessionManager
 
 
 class AISummarizer:
-    """使用Qwen API生成摘要"""
+    """
+    使用Qwen API生成摘要
     
-    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://dashscope.aliyuncs.com/compatible-mode/v1", model: str = "qwen-plus"):
+    未注入共享会话时使用自有的HTTP会话，用完后需调用 aclose()（或 async with）关闭。
+    
+    用法:
+        async with AISummarizer(api_key) as summarizer:
+            summary = await summarizer.generate_daily_summary("2026-09-01", items, "贵州茅台")
+    """
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = "https://dashscope.aliyuncs.com/compatible-mode/v1",
+        model: str = "qwen-plus",
+        http_session: Optional[HTTPSessionManager] = None
+    ):
         """
         初始化AI摘要生成器
         
@@ -17,8 +31,11 @@ class AISummarizer:
             api_key: Qwen API密钥（DashScope API Key）
             base_url: API基础URL，默认使用阿里云灵积模型服务
             model: 使用的模型名称，可选: qwen-turbo, qwen-plus, qwen-max 等
+            http_session: 共享HTTP会话（可选），不提供时使用自有的会话
         """
         self.api_key = api_key
+        self._owns_session = http_session is None
+        self.http_session = http_session or HTTPSessionManager()
         self.base_url = base_url.rstrip('/')
         self.model = model
         self.url = f"{self.base_url}/chat/completions"
@@ -27,7 +44,8 @@ class AISummarizer:
         self,
         date: str,
         news_items: List[NewsItem],
-        stock_name: str
+        stock_name: str,
+        source_counts: Optional[List[int]] = None
     ) -> str:
         """
         生成单日新闻摘要
@@ -36,6 +54,7 @@ class AISummarizer:
             date: 日期
             news_items: 该日期的新闻列表
             stock_name: 股票名称
+            source_counts: 每条新闻的报道来源数（可选，与 news_items 一一对应，多来源报道的事件在列表中注明）
             
         Returns:
             摘要文本
@@ -49,7 +68,8 @@ class AISummarizer:
             importance = item.importance
             title = item.title
             content = item.content[:200] if item.content else ""
-            news_text.append(f"{i}. [{importance}] {title}\n   {content}")
+            sources = f"[{source_counts[i - 1]}个来源]" if source_counts and source_counts[i - 1] > 1 else ""
+            news_text.append(f"{i}. [{importance}]{sources} {title}\n   {content}")
         
         news_content = "\n\n".join(news_text)
         
@@ -77,7 +97,8 @@ class AISummarizer:
         news_items: List[NewsItem],
         stock_name: str,
         start_date: str,
-        end_date: str
+        end_date: str,
+        source_counts: Optional[List[int]] = None
     ) -> str:
         """
         生成时段总结
@@ -87,6 +108,8 @@ class AISummarizer:
             stock_name: 股票名称
             start_date: 开始日期
             end_date: 结束日期
+            source_counts: 每条新闻的报道来源数（可选，与 news_items 一一对应），提供时
+                重要事件优先选择报道来源多的
             
         Returns:
             总结文本
@@ -100,12 +123,17 @@ class AISummarizer:
         for item in news_items:
             importance_stats[item.importance] = importance_stats.get(item.importance, 0) + 1
         
-        # 提取高重要性新闻
-        high_importance = [item for item in news_items if item.importance == "高"][:10]
+        # 提取高重要性新闻（多来源报道的事件优先）
+        counts = source_counts or [1] * total
+        high_importance = [(item, count) for item, count in zip(news_items, counts) if item.importance == "高"]
+        if source_counts:
+            high_importance.sort(key=lambda pair: pair[1], reverse=True)
+        high_importance = high_importance[:10]
         
         news_text = []
-        for i, item in enumerate(high_importance, 1):
-            news_text.append(f"{i}. {item.date.strftime('%Y-%m-%d')} {item.title}")
+        for i, (item, count) in enumerate(high_importance, 1):
+            sources = f"（{count}个来源报道）" if count > 1 else ""
+            news_text.append(f"{i}. {item.date.strftime('%Y-%m-%d')} {item.title}{sources}")
         
         news_list = "\n".join(news_text) if news_text else "无特别重要的事件"
         
@@ -168,23 +196,33 @@ class AISummarizer:
             "top_p": 0.8
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                self.url,
-                headers=headers,
-                json=data
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"API调用失败: {response.status_code} {response.text}")
-            
-            result = response.json()
-            
-            # 解析返回结果
-            if "choices" in result and len(result["choices"]) > 0:
-                return result["choices"][0]["message"]["content"].strip()
-            else:
-                raise Exception(f"无法解析API响应: {result}")
+        response = await self.http_session.client.post(
+            self.url,
+            headers=headers,
+            json=data
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"API调用失败: {response.status_code} {response.text}")
+        
+        result = response.json()
+        
+        # 解析返回结果
+        if "choices" in result and len(result["choices"]) > 0:
+            return result["choices"][0]["message"]["content"].strip()
+        else:
+            raise Exception(f"无法解析API响应: {result}")
+    
+    async def aclose(self):
+        """关闭自有的HTTP会话（注入的共享会话由调用方负责关闭）"""
+        if self._owns_session:
+            await self.http_session.aclose()
+    
+    async def __aenter__(self) -> 'AISummarizer':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
     
     def is_available(self) -> bool:
         """检查是否可用"""
@@ -0,0 +1,224 @@
+"""批量消息分类 - 多进程分块计算重要性和分类，用于规则变更后重新分类历史消息"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .collectors.keyword_matcher import CATEGORIES, CategoryClassifier, configure_categories, judge_importance
+from .collectors.stock_master import StockMaster, configure_stock_master, get_stock_master
+from .news_store import NewsStore
+
+
+StockContext = Union[str, Sequence[str]]
+
+
+def _init_worker(category_rules: Optional[str], stock_master: Optional[str]):
+    """工作进程初始化：使用与主进程相同的分类规则配置和股票主数据"""
+    if category_rules:
+        configure_categories(category_rules)
+    if stock_master:
+        configure_stock_master(stock_master)
+
+
+def _classify_chunk(
+    titles: Sequence[str],
+    stock_codes: StockContext,
+    stock_names: StockContext,
+    classifier: Optional[CategoryClassifier] = None,
+    master: Optional[StockMaster] = None
+) -> Tuple[List[str], List[str]]:
+    """分类一块标题（在工作进程中执行时使用进程内共享的分类器和股票主数据）"""
+    classifier = classifier or CATEGORIES
+    master = master or get_stock_master()
+    if isinstance(stock_codes, str):
+        stock_codes = [stock_codes] * len(titles)
+        stock_names = [stock_names] * len(titles)
+    importances = [
+        judge_importance(
+            title, code, name,
+            mentions_other_issuer=master.mentions_other_issuer(title, code, name)
+        )
+        for title, code, name in zip(titles, stock_codes, stock_names)
+    ]
+    categories = [classifier.classify(title) for title in titles]
+    return importances, categories
+
+
+class BatchClassifier:
+    """
+    批量分类器
+    
+    按 chunk_size 把标题切块，分发到进程池并行计算重要性和分类，规则与采集时
+    BaseCollector 使用的完全一致（keyword_matcher 和 stock_master）。workers 为 1 或数据量不足
+    一块时直接在当前进程计算。指定的规则配置和股票主数据只在本分类器和工作进程中生效，
+    不改变当前进程共享的配置。
+    
+    用法:
+        with BatchClassifier(workers=8) as classifier:
+            importances, categories = classifier.classify(titles, "600519", "贵州茅台")
+            classifier.reclassify_store(store, {"600519": "贵州茅台"})
+    """
+    
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        chunk_size: int = 20000,
+        category_rules: Optional[str] = None,
+        stock_master: Optional[str] = None
+    ):
+        """
+        初始化批量分类器（进程池在第一次需要时才启动）
+        
+        Args:
+            workers: 工作进程数，默认使用CPU核数
+            chunk_size: 每个任务分类的标题数
+            category_rules: 分类规则配置文件（默认使用当前进程共享分类器的配置）
+            stock_master: 股票主数据文件（默认使用当前进程共享的股票主数据）
+        
+        Raises:
+            OSError, ValueError: 分类规则配置或股票主数据文件无法读取或格式错误
+        """
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.chunk_size = max(1, chunk_size)
+        self.category_rules = category_rules or CATEGORIES.config_path
+        self.stock_master = stock_master or get_stock_master().path
+        self._pool: Optional[ProcessPoolExecutor] = None
+        
+        # 当前进程内计算时使用的分类器和股票主数据
+        self._classifier = CategoryClassifier(config_path=category_rules) if category_rules else CATEGORIES
+        self._master = StockMaster.load(stock_master) if stock_master else get_stock_master()
+        
+        self.titles = 0
+        self.seconds = 0.0
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.category_rules, self.stock_master)
+            )
+        return self._pool
+    
+    def classify(
+        self,
+        titles: Sequence[str],
+        stock_codes: StockContext,
+        stock_names: StockContext = ""
+    ) -> Tuple[List[str], List[str]]:
+        """
+        批量判断重要性和分类
+        
+        Args:
+            titles: 标题列表
+            stock_codes: 股票代码，所有标题属于同一只股票时传字符串，否则传与标题等长的列表
+            stock_names: 股票名称，形式同 stock_codes
+        
+        Returns:
+            (重要性列表, 分类列表)，与 titles 一一对应
+        
+        Raises:
+            ValueError: 股票代码/名称列表与标题数量不一致
+        """
+        if isinstance(stock_codes, str) != isinstance(stock_names, str):
+            # 统一成逐条的列表
+            if isinstance(stock_codes, str):
+                stock_codes = [stock_codes] * len(titles)
+            else:
+                stock_names = [stock_names] * len(titles)
+        if not isinstance(stock_codes, str) and not (len(stock_codes) == len(stock_names) == len(titles)):
+            raise ValueError("股票代码/名称列表必须与标题数量一致")
+        
+        start = time.perf_counter()
+        size = self.chunk_size
+        if self.workers == 1 or len(titles) <= size:
+            importances, categories = _classify_chunk(
+                titles, stock_codes, stock_names, self._classifier, self._master
+            )
+        else:
+            per_title = not isinstance(stock_codes, str)
+            futures = [
+                self._get_pool().submit(
+                    _classify_chunk,
+                    titles[i:i + size],
+                    stock_codes[i:i + size] if per_title else stock_codes,
+                    stock_names[i:i + size] if per_title else stock_names
+                )
+                for i in range(0, len(titles), size)
+            ]
+            importances, categories = [], []
+            for future in futures:
+                chunk_importances, chunk_categories = future.result()
+                importances.extend(chunk_importances)
+                categories.extend(chunk_categories)
+        
+        self.titles += len(titles)
+        self.seconds += time.perf_counter() - start
+        return importances, categories
+    
+    def reclassify_store(
+        self,
+        store: NewsStore,
+        stock_names: Optional[Dict[str, str]] = None,
+        batch_size: int = 200000
+    ) -> Dict:
+        """
+        用当前规则重新分类消息库中的全部消息，只写回结果有变化的记录
+        
+        Args:
+            store: 消息库
+            stock_names: 股票代码到名称的字典（库中不保存名称；缺少名称时只按代码判断是否直接相关）
+            batch_size: 每次从库中读取的条数
+        
+        Returns:
+            {total, changed, missing_names, seconds, titles_per_second}
+        """
+        stock_names = stock_names or {}
+        start = time.perf_counter()
+        total = changed = 0
+        missing_names = set()
+        
+        for rows in store.iter_classification(batch_size):
+            codes = [row[1] for row in rows]
+            names = [stock_names.get(code, "") for code in codes]
+            missing_names.update(code for code, name in zip(codes, names) if not name)
+            
+            importances, categories = self.classify([row[2] for row in rows], codes, names)
+            updates = [
+                (importance, category, row[0])
+                for row, importance, category in zip(rows, importances, categories)
+                if (importance, category) != (row[3], row[4])
+            ]
+            store.update_classification(updates)
+            total += len(rows)
+            changed += len(updates)
+        
+        seconds = time.perf_counter() - start
+        return {
+            'total': total,
+            'changed': changed,
+            'missing_names': sorted(missing_names),
+            'seconds': round(seconds, 3),
+            'titles_per_second': round(total / seconds) if seconds else 0
+        }
+    
+    def get_stats(self) -> Dict:
+        """获取分类统计：进程数、分类条数、耗时和吞吐量"""
+        return {
+            'workers': self.workers,
+            'titles': self.titles,
+            'seconds': round(self.seconds, 3),
+            'titles_per_second': round(self.titles / self.seconds) if self.seconds else 0
+        }
+    
+    def close(self):
+        """关闭进程池"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
+    def __enter__(self) -> 'BatchClassifier':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,8 +1,27 @@
 """基础收集器抽象类"""
+import asyncio
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import (
+    TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+)
+
+import httpx
+
+from .keyword_matcher import judge_category, judge_importance
+from .stock_master import get_stock_master
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+    
+    from .browser_pool import BrowserPool
+    from .http_session import HTTPSessionManager
+    from .parsing import ParsingExecutor
+    from .watermark import Watermark
+
+T = TypeVar('T')
 
 
 @dataclass
@@ -15,25 +34,72 @@ class NewsItem:
     content: Optional[str] = None
     importance: str = "中"  # 高、中、低
     category: Optional[str] = None
+    mentioned_codes: List[str] = field(default_factory=list)  # 标题中提到的其他上市公司（股票代码，无代码时为名称）
     
     def __str__(self):
         return f"[{self.date.strftime('%Y-%m-%d')}] {self.title} - {self.source}"
+    
+    def to_dict(self) -> Dict:
+        """转换为可JSON序列化的字典"""
+        return {
+            'date': self.date.strftime('%Y-%m-%d %H:%M:%S'),
+            'title': self.title,
+            'source': self.source,
+            'url': self.url,
+            'importance': self.importance,
+            'category': self.category,
+            'content': self.content,
+            'mentioned_codes': self.mentioned_codes
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'NewsItem':
+        """从 to_dict 生成的字典还原"""
+        return cls(
+            title=data['title'],
+            date=datetime.strptime(data['date'], '%Y-%m-%d %H:%M:%S'),
+            source=data['source'],
+            url=data['url'],
+            content=data.get('content'),
+            importance=data.get('importance') or "中",
+            category=data.get('category'),
+            mentioned_codes=data.get('mentioned_codes') or []
+        )
 
 
 class BaseCollector(ABC):
     """消息收集器基类"""
     
-    def __init__(self, stock_code: str, stock_name: str = ""):
+    def __init__(
+        self,
+        stock_code: str,
+        stock_name: str = "",
+        http_session: Optional['HTTPSessionManager'] = None,
+        browser_pool: Optional['BrowserPool'] = None,
+        parse_executor: Optional['ParsingExecutor'] = None
+    ):
         """
         初始化收集器
         
         Args:
             stock_code: 股票代码，如 "600519" 或 "000001.SZ"
             stock_name: 股票名称
+            http_session: 共享HTTP会话（可选），不提供时每次采集使用临时客户端
+            browser_pool: 共享浏览器池（可选，仅使用Playwright的收集器需要），
+                不提供时每次采集临时启动浏览器
+            parse_executor: HTML解析执行器（可选，仅解析网页的收集器需要），
+                不提供时在事件循环的默认线程池中解析
         """
         self.stock_code = self._normalize_code(stock_code)
         self.stock_name = stock_name
+        self.http_session = http_session
+        self.browser_pool = browser_pool
+        self.parse_executor = parse_executor
         self.news_items: List[NewsItem] = []
+        # 本次采集中失败的请求/分页（非空表示结果可能不完整）
+        self.errors: List[str] = []
+        # 增量采集的高水位（由调用方设置，None表示全量采集）
+        self.watermark: Optional['Watermark'] = None
     
     @staticmethod
     def _normalize_code(code: str) -> str:
@@ -57,133 +123,238 @@ class BaseCollector(ABC):
         """
         pass
     
+    async def collect_pages(self, days: int = 365) -> AsyncIterator[List[NewsItem]]:
+        """
+        逐页收集新闻消息
+        
+        分页采集的收集器重写此方法，每获取一页就产出一批，collect() 则由
+        _collect_from_pages() 汇总实现；默认实现调用 collect() 一次性产出全部结果。
+        
+        Args:
+            days: 收集最近多少天的消息
+            
+        Yields:
+            每页（批）新闻消息列表
+        """
+        items = await self.collect(days)
+        if items:
+            yield items
+    
+    async def _collect_from_pages(self, days: int) -> List[NewsItem]:
+        """汇总 collect_pages() 产出的所有批次，供分页收集器实现 collect()"""
+        items = []
+        async for page_items in self.collect_pages(days):
+            items.extend(page_items)
+        self.news_items = items
+        return items
+    
     def get_source_name(self) -> str:
         """获取数据源名称"""
         return self.__class__.__name__.replace('Collector', '')
     
-    def _judge_importance(self, title: str) -> str:
+    def _window_start(self, days: int) -> datetime:
         """
-        根据标题判断消息重要性
+        计算本次采集的起始日期
+        
+        设置了高水位时从高水位当天开始（增量采集），否则为最近 days 天。
+        """
+        start_date = datetime.now() - timedelta(days=days)
+        if self.watermark is None:
+            return start_date
+        return self.watermark.window_start(start_date)
+    
+    def _reached_watermark(self, items: Iterable[NewsItem]) -> bool:
+        """本页是否已包含之前采集过的消息（增量采集时据此停止翻页）"""
+        if self.watermark is None:
+            return False
+        return any(self.watermark.is_known(item) for item in items)
+    
+    @property
+    def incomplete(self) -> bool:
+        """本次采集是否有分页失败（结果可能被截断）"""
+        return bool(self.errors)
+    
+    def _record_error(self, context: str, error: Exception):
+        """记录一次采集失败，供调用方判断结果是否完整"""
+        message = f"{context}: {type(error).__name__} {error}"
+        self.errors.append(message)
+        print(f"    {self.get_source_name()} {message}")
+    
+    @asynccontextmanager
+    async def _http_client(self, **kwargs) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        获取HTTP客户端
+        
+        注入了共享会话时直接复用其连接池（不会在退出时关闭），
+        否则创建一个仅用于本次采集的临时客户端。
         
         Args:
-            title: 消息标题
-            
-        Returns:
-            "高"、"中"、"低"
+            **kwargs: 创建临时客户端时传给 httpx.AsyncClient 的额外参数
+        """
+        if self.http_session is not None:
+            yield self.http_session.client
+        else:
+            async with httpx.AsyncClient(timeout=30.0, **kwargs) as client:
+                yield client
+    
+    @asynccontextmanager
+    async def _browser_page(self, **context_options) -> AsyncIterator['Page']:
         """
-        title_upper = title.upper()
+        获取浏览器页面
         
-        # 先检查是否包含本公司名称/代码
-        is_directly_related = False
-        if self.stock_name and self.stock_name in title:
-            is_directly_related = True
-        if self.stock_code in title:
-            is_directly_related = True
+        注入了浏览器池时从池中借出独立上下文的页面，否则临时启动一个浏览器，
+        退出时关闭。
         
-        # 不相关新闻的关键词（其他公司、行业泛泛而谈）
-        irrelevant_keywords = [
-            '暗盘', '战争', '界商业', '行业观察', '市场盘点',
-            '十大', '排行', '榜单', '集锦', '盘点'
-        ]
+        Args:
+            **context_options: 传给 browser.new_context 的参数
+        """
+        if self.browser_pool is not None:
+            async with self.browser_pool.page(**context_options) as page:
+                yield page
+        else:
+            from .browser_pool import BrowserPool
+            
+            async with BrowserPool(max_pages=1) as pool:
+                async with pool.page(**context_options) as page:
+                    yield page
+    
+    async def _parse(self, func: Callable[..., T], *args) -> T:
+        """
+        在解析执行器中运行HTML解析函数，避免阻塞事件循环
         
-        # 其他公司名称（如果标题主要讲其他公司）
-        other_companies = [
-            '瑞博生物', '药明生物', '药明康德', '信达生物', '科伦博泰', '百济神州',
-            '恒瑞医药', '复星医药', '石药集团', '君实生物', '康方生物'
-        ]
+        Args:
+            func: 模块级解析函数（见 parsing 模块）
+            *args: 解析函数的参数
+        """
+        if self.parse_executor is not None:
+            return await self.parse_executor.run(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    @staticmethod
+    async def _iter_pages(
+        fetch_page: Callable[[int], Awaitable[T]],
+        page_numbers: Iterable[int],
+        concurrency: int,
+        should_stop: Optional[Callable[[T], bool]] = None
+    ) -> AsyncIterator[T]:
+        """
+        按批次并发获取多页数据，逐页产出
         
-        # 如果标题中包含其他公司且不包含本公司，判定为不相关
-        has_other_company = any(company in title for company in other_companies)
-        if has_other_company and not is_directly_related:
-            return "低"
+        每批最多同时请求 concurrency 页，每批完成后按页码顺序产出。某一页满足
+        should_stop 时不再发起后续批次，该页之后的结果也会被丢弃。
         
-        # 检查不相关关键词
-        for keyword in irrelevant_keywords:
-            if keyword in title:
-                return "低"
+        Args:
+            fetch_page: 获取单页的协程函数，参数为页码
+            page_numbers: 需要获取的页码（按顺序）
+            concurrency: 每批并发请求的页数
+            should_stop: 判断是否已到达时间边界的函数（可选）
+            
+        Yields:
+            按页码顺序的单页结果
+        """
+        pages = list(page_numbers)
+        concurrency = max(1, concurrency)
         
-        # 财务报告类始终为高重要性（无论是否直接相关，因为这些是官方公告）
-        financial_report_keywords = [
-            '年报', '中报', '季报', '财报', '业绩预告', '业绩快报',
-            '定期报告', '一季度报告', '三季度报告', '半年度报告', '年度报告'
-        ]
-        for keyword in financial_report_keywords:
-            if keyword in title:
-                return "高"
-        
-        # 高重要性关键词（只对直接相关的新闻有效）
-        if is_directly_related:
-            high_keywords = [
-                '重大', '处罚', '调查', '立案', '停牌', '复牌', '退市',
-                '重组', '并购', '收购', '增发', '配股', '分红', '送股',
-                '业绩', '预告', '快报',
-                '违规', '违法', '诉讼', '仲裁', '风险', '警示',
-                '董事会', '股东大会', '股权', '控股', '变更',
-                '亏损', '盈利', '扭亏', '减持', '增持', '回购'
-            ]
+        for start in range(0, len(pages), concurrency):
+            batch = pages[start:start + concurrency]
+            batch_results = await asyncio.gather(*(fetch_page(page_no) for page_no in batch))
             
-            for keyword in high_keywords:
-                if keyword in title or keyword in title_upper:
-                    return "高"
-        
-        # 低重要性关键词
-        low_keywords = [
-            '广告', '推广', '营销', '宣传', '点评', '评论',
-            '讨论', '猜测', '预测', '传闻', '网友', '据说'
+            for result in batch_results:
+                yield result
+                if should_stop is not None and should_stop(result):
+                    return
+    
+    @classmethod
+    async def _gather_pages(
+        cls,
+        fetch_page: Callable[[int], Awaitable[T]],
+        page_numbers: Iterable[int],
+        concurrency: int,
+        should_stop: Optional[Callable[[T], bool]] = None
+    ) -> List[T]:
+        """
+        按批次并发获取多页数据（_iter_pages 的列表版本）
+        
+        Returns:
+            按页码顺序排列的单页结果列表
+        """
+        return [
+            result
+            async for result in cls._iter_pages(fetch_page, page_numbers, concurrency, should_stop)
         ]
+    
+    @staticmethod
+    async def _merge_streams(streams: List[AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        并发消费多个异步迭代器，按到达顺序产出
         
-        for keyword in low_keywords:
-            if keyword in title or keyword in title_upper:
-                return "低"
+        Args:
+            streams: 异步迭代器列表
+            
+        Yields:
+            任一迭代器先产出的元素
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
         
-        # 如果不是直接相关的新闻，默认为低重要性
-        if not is_directly_related:
-            return "低"
+        async def pump(stream: AsyncIterator[T]):
+            # 迭代器的异常通过队列交给消费方抛出
+            try:
+                async for element in stream:
+                    await queue.put((element, None))
+            except Exception as e:
+                await queue.put((None, e))
+            finally:
+                await queue.put((finished, None))
         
-        return "中"
+        tasks = [asyncio.create_task(pump(stream)) for stream in streams]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                element, error = await queue.get()
+                if error is not None:
+                    raise error
+                if element is finished:
+                    remaining -= 1
+                    continue
+                yield element
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _judge_importance(self, title: str) -> str:
+        """
+        根据标题判断消息重要性
+        
+        关键词规则见 keyword_matcher，所有关键词由进程内共享的自动机一次扫描完成；
+        是否提到其他上市公司由股票主数据索引判断（没有主数据文件时使用原来的公司列表）。
+        
+        Args:
+            title: 消息标题
+            
+        Returns:
+            "高"、"中"、"低"
+        """
+        return judge_importance(
+            title, self.stock_code, self.stock_name,
+            mentions_other_issuer=get_stock_master().mentions_other_issuer(title, self.stock_code, self.stock_name)
+        )
+    
+    def _other_issuers(self, title: str) -> List[str]:
+        """标题中提到的本公司以外的上市公司（股票代码，主数据中没有代码时为名称）"""
+        return get_stock_master().other_issuers(title, self.stock_code, self.stock_name)
     
     def _judge_category(self, title: str) -> str:
         """
         根据标题判断消息分类
         
+        使用进程内共享的 CategoryClassifier，规则可通过配置文件热更新。
+        
         Args:
             title: 消息标题
             
         Returns:
             分类字符串
         """
-        title_upper = title.upper()
-        
-        # 公司治理
-        if any(kw in title for kw in ['董事会', '股东大会', '监事会', '高管', '任命', '辞职', '选举']):
-            return "公司治理"
-        
-        # 财务报告
-        if any(kw in title for kw in ['年报', '中报', '季报', '业绩', '财报', '快报', '预告']):
-            return "财务报告"
-        
-        # 股权变动
-        if any(kw in title for kw in ['股权', '增持', '减持', '回购', '股份', '解禁', '质押']):
-            return "股权变动"
-        
-        # 重大事项
-        if any(kw in title for kw in ['重组', '并购', '收购', '出售', '投资', '合作', '签约']):
-            return "重大事项"
-        
-        # 监管信息
-        if any(kw in title for kw in ['处罚', '调查', '立案', '违规', '问询', '关注函', '警示']):
-            return "监管信息"
-        
-        # 交易提示
-        if any(kw in title for kw in ['停牌', '复牌', '退市', '风险', '提示', '公告']):
-            return "交易提示"
-        
-        # 经营动态
-        if any(kw in title for kw in ['中标', '项目', '产品', '研发', '技术', '专利', '订单']):
-            return "经营动态"
-        
-        # 市场评论
-        if any(kw in title for kw in ['点评', '分析', '解读', '观点', '评论', '讨论']):
-            return "市场评论"
-        
-        return "其他"
+        return judge_category(title)
@@ -0,0 +1,253 @@
+"""共享浏览器池 - 在一次运行内复用 Playwright Chromium"""
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from playwright.async_api import Browser, Page, Playwright, Route, async_playwright
+
+
+class RoutePolicy:
+    """
+    浏览器请求拦截策略
+    
+    采集只需要页面文档、脚本和数据接口，图片、字体、样式表、音视频以及第三方
+    域名（统计、广告等）的请求一律拦截，以加快页面加载和 networkidle 等待。
+    被拦截的请求按类型计数，并按典型大小估算节省的流量。
+    """
+    
+    # 默认拦截的资源类型
+    BLOCKED_TYPES = {'image', 'font', 'stylesheet', 'media'}
+    
+    # 采集目标站点（含子域名），其余域名视为第三方
+    FIRST_PARTY_DOMAINS = ('bse.cn', 'sse.com.cn', 'szse.cn', 'cninfo.com.cn')
+    
+    # 各类资源的典型大小（字节），用于估算节省的流量
+    ESTIMATED_SIZES = {
+        'image': 30_000,
+        'font': 60_000,
+        'stylesheet': 25_000,
+        'media': 200_000,
+        'script': 40_000,
+    }
+    DEFAULT_ESTIMATED_SIZE = 10_000
+    
+    def __init__(
+        self,
+        blocked_types: Optional[Iterable[str]] = None,
+        first_party_domains: Optional[Iterable[str]] = None,
+        block_third_party: bool = True
+    ):
+        """
+        初始化拦截策略
+        
+        Args:
+            blocked_types: 拦截的资源类型（Playwright resource_type），默认图片/字体/样式/音视频
+            first_party_domains: 允许访问的站点域名（含子域名）
+            block_third_party: 是否拦截第三方域名的请求（页面文档除外）
+        """
+        self.blocked_types = set(self.BLOCKED_TYPES if blocked_types is None else blocked_types)
+        self.first_party_domains = tuple(
+            self.FIRST_PARTY_DOMAINS if first_party_domains is None else first_party_domains
+        )
+        self.block_third_party = block_third_party
+        
+        self.allowed_requests = 0
+        self.blocked_by_type: Counter = Counter()
+        self.blocked_third_party = 0
+    
+    def _is_first_party(self, url: str) -> bool:
+        host = urlsplit(url).hostname or ''
+        return any(host == domain or host.endswith('.' + domain) for domain in self.first_party_domains)
+    
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """判断请求是否应被拦截"""
+        if resource_type in self.blocked_types:
+            return True
+        if self.block_third_party and resource_type != 'document' and url.startswith('http'):
+            return not self._is_first_party(url)
+        return False
+    
+    async def handle(self, route: Route):
+        """context.route 的回调：拦截或放行请求"""
+        request = route.request
+        resource_type = request.resource_type
+        
+        if self.should_block(resource_type, request.url):
+            self.blocked_by_type[resource_type] += 1
+            if resource_type not in self.blocked_types:
+                self.blocked_third_party += 1
+            await route.abort()
+        else:
+            self.allowed_requests += 1
+            await route.continue_()
+    
+    def get_stats(self) -> Dict:
+        """获取拦截统计：放行/拦截请求数、按类型的拦截数、估算节省的字节数"""
+        blocked = sum(self.blocked_by_type.values())
+        return {
+            'allowed_requests': self.allowed_requests,
+            'blocked_requests': blocked,
+            'blocked_third_party': self.blocked_third_party,
+            'blocked_by_type': dict(self.blocked_by_type),
+            'estimated_bytes_saved': sum(
+                count * self.ESTIMATED_SIZES.get(resource_type, self.DEFAULT_ESTIMATED_SIZE)
+                for resource_type, count in self.blocked_by_type.items()
+            )
+        }
+
+
+class _BrowserSlot:
+    """池中的一个浏览器实例及其使用计数"""
+    
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.uses = 0
+        self.active = 0
+        self.retiring = False
+
+
+class BrowserPool:
+    """
+    浏览器池
+    
+    整个运行期间只启动一个 Chromium（达到使用次数上限后轮换），每次借出一个
+    独立的浏览器上下文（cookie/缓存互不影响）和页面，并限制同时打开的页面数。
+    每个上下文都安装请求拦截策略（见 RoutePolicy），不加载采集用不到的资源。
+    
+    用法:
+        async with BrowserPool(max_pages=4) as pool:
+            collector = BSECollector("430047", "诺思兰德", browser_pool=pool)
+            await collector.collect(30)
+    """
+    
+    def __init__(
+        self,
+        max_pages: int = 4,
+        max_uses: int = 50,
+        headless: bool = True,
+        launch_options: Optional[Dict] = None,
+        route_policy: Optional[RoutePolicy] = None,
+        block_resources: bool = True
+    ):
+        """
+        初始化浏览器池（浏览器在第一次借出页面时才启动）
+        
+        Args:
+            max_pages: 同时打开的页面数上限
+            max_uses: 单个浏览器借出多少次页面后轮换，避免长时间运行的内存增长
+            headless: 是否使用无头模式
+            launch_options: 传给 chromium.launch 的额外参数
+            route_policy: 请求拦截策略（默认使用 RoutePolicy 的默认配置）
+            block_resources: 是否启用请求拦截
+        """
+        self.max_pages = max(1, max_pages)
+        self.max_uses = max(1, max_uses)
+        self.headless = headless
+        self.launch_options = launch_options or {}
+        self.route_policy = (route_policy or RoutePolicy()) if block_resources else None
+        
+        self._semaphore = asyncio.Semaphore(self.max_pages)
+        self._lock = asyncio.Lock()
+        self._playwright: Optional[Playwright] = None
+        self._current: Optional[_BrowserSlot] = None
+        self._retired: List[_BrowserSlot] = []
+        
+        self.launches = 0
+        self.pages_served = 0
+    
+    async def _acquire_slot(self) -> _BrowserSlot:
+        """获取可用的浏览器（首次使用或当前浏览器达到使用上限时启动新浏览器）"""
+        async with self._lock:
+            slot = self._current
+            if slot is not None and (slot.uses >= self.max_uses or not slot.browser.is_connected()):
+                slot.retiring = True
+                self._current = None
+                if slot.active == 0:
+                    await self._close_browser(slot)
+                else:
+                    self._retired.append(slot)
+                slot = None
+            
+            if slot is None:
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                browser = await self._playwright.chromium.launch(
+                    headless=self.headless,
+                    **self.launch_options
+                )
+                self.launches += 1
+                slot = self._current = _BrowserSlot(browser)
+            
+            slot.uses += 1
+            slot.active += 1
+            return slot
+    
+    async def _release_slot(self, slot: _BrowserSlot):
+        """归还浏览器，已轮换下来的浏览器在最后一个页面关闭后退出"""
+        slot.active -= 1
+        if slot.retiring and slot.active == 0 and slot in self._retired:
+            self._retired.remove(slot)
+            await self._close_browser(slot)
+    
+    @staticmethod
+    async def _close_browser(slot: _BrowserSlot):
+        try:
+            await slot.browser.close()
+        except Exception as e:
+            print(f"    关闭浏览器失败: {e}")
+    
+    @asynccontextmanager
+    async def page(self, **context_options) -> AsyncIterator[Page]:
+        """
+        借出一个独立上下文中的页面，退出时关闭上下文
+        
+        Args:
+            **context_options: 传给 browser.new_context 的参数（如 user_agent）
+        """
+        async with self._semaphore:
+            slot = await self._acquire_slot()
+            context = None
+            try:
+                context = await slot.browser.new_context(**context_options)
+                if self.route_policy is not None:
+                    await context.route('**/*', self.route_policy.handle)
+                page = await context.new_page()
+                self.pages_served += 1
+                yield page
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        print(f"    关闭浏览器上下文失败: {e}")
+                await self._release_slot(slot)
+    
+    def get_stats(self) -> Dict:
+        """获取浏览器池统计：启动次数、借出页面数和请求拦截统计"""
+        stats = {
+            'launches': self.launches,
+            'pages_served': self.pages_served
+        }
+        if self.route_policy is not None:
+            stats['routing'] = self.route_policy.get_stats()
+        return stats
+    
+    async def aclose(self):
+        """关闭所有浏览器和 Playwright"""
+        slots = self._retired + ([self._current] if self._current is not None else [])
+        self._retired = []
+        self._current = None
+        for slot in slots:
+            await self._close_browser(slot)
+        
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+    
+    async def __aenter__(self) -> 'BrowserPool':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
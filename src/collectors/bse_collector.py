@@ -1,19 +1,37 @@
 """北京证券交易所（北交所）数据采集器"""
-from datetime import datetime, timedelta
-from typing import List
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 import re
-from bs4 import BeautifulSoup
+import httpx
 from urllib.parse import urljoin
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+from playwright.async_api import TimeoutError as PlaywrightTimeout
 
+from . import jsonp
 from .base_collector import BaseCollector, NewsItem
+from .dedup import IdentityIndex
+from .parsing import parse_bse_results
+from .resilience import RETRY_EXTENSION
 
 
 class BSECollector(BaseCollector):
-    """北交所消息收集器 - 通过搜索页面抓取"""
+    """北交所消息收集器 - 直接请求公告查询接口，必要时通过搜索页面抓取"""
     
     BASE_URL = "https://www.bse.cn"
     SEARCH_URL = "https://www.bse.cn/select/index/searchInfo.do"
+    INFO_RESULT_URL = "https://www.bse.cn/disclosureInfoController/infoResult.do"
+    
+    # 公告接口最多获取的页数
+    MAX_PAGES = 20
+    # 首页之后并发请求的页数上限
+    PAGE_CONCURRENCY = 4
+    
+    # 等待搜索结果响应/元素的超时时间（毫秒）
+    RESPONSE_TIMEOUT = 15000
+    
+    # JSON结果中可能的字段名
+    TITLE_FIELDS = ('disclosureTitle', 'title', 'TITLE', 'name')
+    DATE_FIELDS = ('publishDate', 'publishTime', 'date', 'time', 'SSEDATE')
+    URL_FIELDS = ('destFilePath', 'url', 'href', 'URL', 'filePath')
     
     async def collect(self, days: int = 365) -> List[NewsItem]:
         """
@@ -25,46 +43,168 @@ class BSECollector(BaseCollector):
         Returns:
             新闻消息列表
         """
-        news_items = []
-        start_date = datetime.now() - timedelta(days=days)
+        return await self._collect_from_pages(days)
+    
+    async def collect_pages(self, days: int = 365) -> AsyncIterator[List[NewsItem]]:
+        """
+        逐页从北交所收集消息
+        
+        优先直接请求公告查询接口（与 SSEAPICollector 相同的分页方式），
+        接口请求失败或响应无法解析、且没有获取到任何公告时才改用浏览器搜索页面；
+        接口正常返回但时间范围内没有公告时不回退。
+        """
+        start_date = self._window_start(days)
+        self.errors = []
+        identities = IdentityIndex(self.stock_code, self.stock_name)
+        
+        async for page_items in self._collect_direct(start_date):
+            page_items = identities.unique(page_items)
+            if page_items:
+                yield page_items
+        
+        if not identities and self.errors:
+            print("    北交所公告接口不可用，改用浏览器搜索")
+            # 浏览器搜索的结果取代接口结果，接口的失败记录不再影响完整性判断
+            self.errors = []
+            page_items = identities.unique(await self._collect_with_browser(start_date))
+            if page_items:
+                yield page_items
+    
+    async def _collect_direct(self, start_date: datetime) -> AsyncIterator[List[NewsItem]]:
+        """通过公告查询接口逐页采集（首页返回总页数后，剩余页按批次并发获取）"""
+        fetched_pages = 0
+        total_items = 0
         
         try:
-            # 使用Playwright抓取JavaScript渲染的页面
-            async with async_playwright() as p:
-                # 启动浏览器（使用headless模式）
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context()
-                page = await context.new_page()
+            async with self._http_client() as client:
+                page_items, total_pages, reached_boundary = await self._fetch_info_page(
+                    client, 0, start_date
+                )
+                fetched_pages = 1
+                total_items += len(page_items)
+                yield page_items
                 
-                try:
-                    # 使用股票名称搜索（股票名称通常更准确）
-                    if self.stock_name:
-                        items = await self._search_with_playwright(page, self.stock_name, start_date)
-                        news_items.extend(items)
+                last_page = min(self.MAX_PAGES, total_pages)
+                
+                if last_page > 1 and not reached_boundary and not self._reached_watermark(page_items):
+                    async def fetch_page(page_no: int):
+                        # 单页失败只记录错误，不当作"没有更多数据"而停止翻页
+                        try:
+                            return await self._fetch_info_page(client, page_no, start_date)
+                        except Exception as e:
+                            self._record_error(f"公告接口第 {page_no + 1} 页获取失败", e)
+                            return None
                     
-                    # 如果没有找到结果，尝试股票代码
-                    if not news_items and self.stock_code:
-                        items = await self._search_with_playwright(page, self.stock_code, start_date)
-                        news_items.extend(items)
+                    # 接口页码从0开始
+                    async for page in self._iter_pages(
+                        fetch_page,
+                        range(1, last_page),
+                        self.PAGE_CONCURRENCY,
+                        should_stop=lambda page: page is not None and (
+                            page[2] or self._reached_watermark(page[0])
+                        )
+                    ):
+                        fetched_pages += 1
+                        if page is not None:
+                            total_items += len(page[0])
+                            yield page[0]
+                
+                print(f"    北交所公告接口已获取 {fetched_pages} 页，共 {total_items} 条")
+        
+        except Exception as e:
+            self._record_error("北交所公告接口请求失败", e)
+    
+    async def _fetch_info_page(
+        self,
+        client: httpx.AsyncClient,
+        page_no: int,
+        start_date: datetime
+    ) -> Tuple[List[NewsItem], int, bool]:
+        """
+        获取公告查询接口的单页数据
+        
+        Returns:
+            (时间范围内的新闻列表, 总页数, 是否已到达时间边界或无更多数据)
+            
+        Raises:
+            httpx.HTTPError: 请求失败（已由共享会话重试）
+            ValueError: 响应无法解析
+        """
+        data = {
+            'page': str(page_no),
+            'companyCd': self.stock_code,
+            'isNewThree': '1',
+            'startTime': start_date.strftime('%Y-%m-%d'),
+            'endTime': datetime.now().strftime('%Y-%m-%d'),
+            'keyword': '',
+            'sortfield': 'publishDate',
+            'sorttype': 'desc',
+            'needFields[]': ['companyCd', 'companyName', 'disclosureTitle', 'destFilePath', 'publishDate'],
+        }
+        headers = {
+            'Referer': f'{self.BASE_URL}/',
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+            'X-Requested-With': 'XMLHttpRequest'
+        }
+        
+        response = await client.post(
+            self.INFO_RESULT_URL,
+            params={'callback': 'null'},
+            data=data,
+            headers=headers,
+            extensions={RETRY_EXTENSION: True}  # 只读查询，允许重试
+        )
+        response.raise_for_status()
+        
+        # 响应形如 null([{"listInfo": {"content": [...], "totalPages": N, ...}}])
+        payload = jsonp.decode(response.content, response.charset_encoding)
+        if isinstance(payload, list):
+            payload = payload[0] if payload else {}
+        list_info = payload.get('listInfo') or {}
+        if not isinstance(list_info, dict):
+            raise ValueError("无法解析北交所公告接口响应")
+        
+        records = list_info.get('content') or []
+        total_pages = int(list_info.get('totalPages') or 0)
+        
+        items = []
+        reached_boundary = not records
+        for record in records:
+            item = self._item_from_record(record, start_date)
+            if item is not None:
+                items.append(item)
+            elif self._record_date(record) < start_date:
+                # 结果按发布日期倒序，出现早于起始日期的公告说明之后都更早
+                reached_boundary = True
+        
+        if records and not items and not reached_boundary:
+            # 有记录但一条都无法转换，说明接口返回的字段已变化
+            raise ValueError("无法解析北交所公告接口记录")
+        
+        return items, total_pages, reached_boundary
+    
+    async def _collect_with_browser(self, start_date: datetime) -> List[NewsItem]:
+        """通过浏览器搜索页面采集（接口不可用时的回退方式）"""
+        news_items = []
+        
+        try:
+            # 使用Playwright抓取JavaScript渲染的页面（从共享浏览器池借出页面）
+            async with self._browser_page() as page:
+                # 使用股票名称搜索（股票名称通常更准确）
+                if self.stock_name:
+                    items = await self._search_with_playwright(page, self.stock_name, start_date)
+                    news_items.extend(items)
                 
-                finally:
-                    await browser.close()
+                # 如果没有找到结果，尝试股票代码
+                if not news_items and self.stock_code:
+                    items = await self._search_with_playwright(page, self.stock_code, start_date)
+                    news_items.extend(items)
         
         except Exception as e:
-            print(f"北交所数据收集失败: {str(e)}")
-            import traceback
-            traceback.print_exc()
-        
-        # 去重
-        seen = set()
-        unique_items = []
-        for item in news_items:
-            if item.url not in seen:
-                seen.add(item.url)
-                unique_items.append(item)
-        
-        self.news_items = unique_items
-        return unique_items
+            # 记录失败，使回退结果被标记为不完整（不推进高水位）
+            self._record_error("浏览器回退", e)
+        
+        return news_items
     
     async def _search_with_playwright(
         self,
@@ -73,66 +213,65 @@ class BSECollector(BaseCollector):
         start_date: datetime,
         max_pages: int = 10
     ) -> List[NewsItem]:
-        """使用Playwright搜索新闻"""
+        """
+        使用Playwright搜索新闻
+        
+        每次操作（搜索、排序、翻页）都等待对应的搜索结果响应并直接解析其内容，
+        不再固定等待；响应无法识别时才回退到解析页面中的 #quotationTable。
+        """
         items = []
         
         try:
             print(f"    正在搜索北交所: {keyword}")
             
-            # 访问搜索页面
-            await page.goto(self.BASE_URL, wait_until='networkidle', timeout=30000)
-            
-            # 等待iframe加载
-            await page.wait_for_timeout(2000)
-            
-            # 在iframe中的搜索框输入关键词
+            # 访问首页，等待iframe中的搜索框出现
+            await page.goto(self.BASE_URL, wait_until='domcontentloaded', timeout=30000)
             iframe = page.frame_locator('iframe').first
             search_box = iframe.locator('input[placeholder*="搜"]').first
+            await search_box.wait_for(state='visible', timeout=self.RESPONSE_TIMEOUT)
             await search_box.fill(keyword)
-            await search_box.press('Enter')
             
-            # 等待页面跳转到搜索结果页
-            await page.wait_for_url('**/searchInfo.do', timeout=10000)
-            await page.wait_for_timeout(2000)
+            # 提交搜索，等待跳转到搜索结果页的响应
+            page_items = await self._act_and_parse(
+                page,
+                lambda: search_box.press('Enter'),
+                start_date
+            )
             
-            # 点击时间排序
+            # 点击时间排序（排序后的结果替换默认排序的结果）
             try:
                 time_sort = page.locator('text=时间排序').first
-                await time_sort.click()
-                await page.wait_for_timeout(2000)
-            except:
+                if await time_sort.is_visible():
+                    page_items = await self._act_and_parse(page, time_sort.click, start_date)
+                else:
+                    print("    未找到时间排序按钮，使用默认排序")
+            except Exception:
                 print("    未找到时间排序按钮，使用默认排序")
             
-            # 抓取当前页
-            page_items = await self._extract_items_from_page(page, start_date)
             items.extend(page_items)
             print(f"    第1页获取 {len(page_items)} 条")
+            if self._reached_watermark(page_items):
+                return items
             
             # 翻页
             for page_num in range(2, max_pages + 1):
                 try:
                     # 检查是否还有下一页
                     next_button = page.locator('text=">"|text="下一页"').first
-                    
-                    # 检查按钮是否可见
-                    is_visible = await next_button.is_visible(timeout=2000)
-                    if not is_visible:
+                    if not await next_button.is_visible():
                         print(f"    已到最后一页")
                         break
                     
-                    # 点击下一页
-                    await next_button.click(timeout=5000)
-                    await page.wait_for_timeout(2000)
-                    
-                    # 抓取页面
-                    page_items = await self._extract_items_from_page(page, start_date)
+                    page_items = await self._act_and_parse(page, next_button.click, start_date)
                     items.extend(page_items)
                     print(f"    第{page_num}页获取 {len(page_items)} 条")
                     
                     # 如果没有找到符合日期的，停止翻页
-                    if len([item for item in page_items if item.date >= start_date]) == 0:
+                    if not page_items:
                         print(f"    第{page_num}页无符合日期的数据，停止翻页")
                         break
+                    if self._reached_watermark(page_items):
+                        break
                 
                 except Exception as e:
                     # 可能已经是最后一页
@@ -140,71 +279,182 @@ class BSECollector(BaseCollector):
                     break
         
         except Exception as e:
-            print(f"    搜索失败: {e}")
-            import traceback
-            traceback.print_exc()
+            self._record_error(f"浏览器回退搜索 {keyword}", e)
         
         return items
     
-    async def _extract_items_from_page(self, page, start_date: datetime) -> List[NewsItem]:
-        """从当前页面提取新闻项"""
+    def _is_result_response(self, response) -> bool:
+        """是否为搜索结果的网络响应（结果页文档或分页/排序请求）"""
+        if response.status != 200 or 'bse.cn' not in response.url:
+            return False
+        if response.request.resource_type not in ('document', 'xhr', 'fetch'):
+            return False
+        return 'search' in response.url.lower()
+    
+    async def _act_and_parse(
+        self,
+        page,
+        action: Callable[[], Awaitable],
+        start_date: datetime
+    ) -> List[NewsItem]:
+        """
+        执行一次页面操作，等待其触发的搜索结果响应并解析
+        
+        Args:
+            page: Playwright页面
+            action: 触发搜索结果请求的操作（回车、点击排序/下一页）
+            start_date: 起始日期
+            
+        Returns:
+            该次操作得到的一页新闻列表
+        """
+        items = None
+        try:
+            async with page.expect_response(
+                self._is_result_response,
+                timeout=self.RESPONSE_TIMEOUT
+            ) as response_info:
+                await action()
+            response = await response_info.value
+            items = await self._parse_payload(await response.text(), start_date)
+        except PlaywrightTimeout:
+            print("    未捕获到搜索结果响应，改为解析页面")
+        
+        if items is None:
+            # 响应不是可识别的结果数据，等结果表格渲染后从DOM提取
+            try:
+                await page.wait_for_selector(
+                    '#quotationTable .main-show',
+                    timeout=self.RESPONSE_TIMEOUT
+                )
+            except PlaywrightTimeout:
+                return []
+            items = await self._extract_items_from_page(page, start_date)
+        
+        return items
+    
+    async def _parse_payload(self, text: str, start_date: datetime) -> Optional[List[NewsItem]]:
+        """
+        解析搜索结果响应体
+        
+        支持结果页HTML（含 #quotationTable）和JSON/JSONP两种格式。
+        
+        Returns:
+            新闻列表；无法识别为搜索结果时返回None
+        """
+        text = text.strip()
+        if not text:
+            return None
+        
+        if text.startswith('<'):
+            if 'quotationTable' not in text:
+                return None
+            return await self._extract_items_from_html(text, start_date)
+        
+        # JSON或JSONP（callback(...)）
+        try:
+            data = jsonp.decode(text)
+        except ValueError:
+            return None
+        
+        records = self._find_records(data)
+        if records is None:
+            return None
+        
         items = []
+        for record in records:
+            item = self._item_from_record(record, start_date)
+            if item is not None:
+                items.append(item)
+        return items
+    
+    @classmethod
+    def _find_records(cls, data) -> Optional[List[Dict]]:
+        """在JSON结构中查找公告记录列表（首个包含标题字段的字典列表）"""
+        if isinstance(data, list):
+            if data and all(isinstance(entry, dict) for entry in data):
+                if any(cls._record_field(entry, cls.TITLE_FIELDS) for entry in data):
+                    return data
+            for entry in data:
+                found = cls._find_records(entry)
+                if found is not None:
+                    return found
+        elif isinstance(data, dict):
+            for value in data.values():
+                found = cls._find_records(value)
+                if found is not None:
+                    return found
+        return None
+    
+    @staticmethod
+    def _record_field(record: Dict, names) -> str:
+        for name in names:
+            value = record.get(name)
+            if value:
+                return str(value).strip()
+        return ''
+    
+    @classmethod
+    def _record_date(cls, record: Dict) -> datetime:
+        """解析JSON公告记录的发布日期（支持日期字符串和秒/毫秒时间戳）"""
+        date_value = cls._record_field(record, cls.DATE_FIELDS)
+        if date_value.isdigit():
+            return datetime.fromtimestamp(int(date_value) / (1000 if len(date_value) > 10 else 1))
+        return cls._parse_date(date_value)
+    
+    def _item_from_record(self, record: Dict, start_date: datetime) -> Optional[NewsItem]:
+        """将一条JSON公告记录转换为新闻项（超出日期范围或缺少字段时返回None）"""
+        title = re.sub(r'<[^>]+>', '', self._record_field(record, self.TITLE_FIELDS))
+        href = self._record_field(record, self.URL_FIELDS)
+        if not title or not href:
+            return None
+        
+        pub_date = self._record_date(record)
+        if pub_date < start_date:
+            return None
         
+        if not href.startswith('http'):
+            href = urljoin(self.BASE_URL, href)
+        
+        return NewsItem(
+            title=title,
+            date=pub_date,
+            source="北交所",
+            url=href,
+            importance=self._judge_importance(title),
+            category=self._judge_category(title)
+        )
+    
+    async def _extract_items_from_page(self, page, start_date: datetime) -> List[NewsItem]:
+        """从当前页面DOM提取新闻项"""
         try:
-            # 获取页面HTML
             html = await page.content()
-            soup = BeautifulSoup(html, 'lxml')
-            
-            # 查找quotationTable中的所有结果项
-            quotation_table = soup.find('div', id='quotationTable')
-            if not quotation_table:
+        except Exception as e:
+            print(f"    提取页面内容失败: {e}")
+            return []
+        return await self._extract_items_from_html(html, start_date)
+    
+    async def _extract_items_from_html(self, html: str, start_date: datetime) -> List[NewsItem]:
+        """从搜索结果HTML中提取新闻项（在解析执行器中解析，不阻塞事件循环）"""
+        items = []
+        
+        try:
+            records = await self._parse(parse_bse_results, html)
+            if records is None:
                 print("    未找到quotationTable")
                 return items
             
-            # 每个结果在 div.main-show 中
-            result_divs = quotation_table.find_all('div', class_='main-show')
-            
-            for result_div in result_divs:
+            for record in records:
                 try:
-                    # 查找标题链接 - 在tit-cell中
-                    tit_cell = result_div.find('div', class_='tit-cell')
-                    if not tit_cell:
-                        continue
-                    
-                    link = tit_cell.find('a', href=True)
-                    if not link:
-                        continue
-                    
-                    # 获取标题 - 在p.tit1的title属性中
-                    title_p = link.find('p', class_='tit1')
-                    if title_p and title_p.get('title'):
-                        title = title_p.get('title').strip()
-                    else:
-                        # 备用：从链接文本提取
-                        title_text = link.get_text(strip=True)
-                        # 移除末尾的日期
-                        title = re.sub(r'\s*\d{4}[-/]\d{1,2}[-/]\d{1,2}\s*$', '', title_text).strip()
-                    
-                    if not title:
-                        continue
-                    
-                    # 获取URL
-                    href = link.get('href', '')
-                    if not href:
-                        continue
+                    title = record['title']
                     
                     # 处理相对URL
+                    href = record['href']
                     if not href.startswith('http'):
                         href = urljoin(self.BASE_URL, href)
                     
-                    # 查找日期 - 在span.time中
-                    date_span = result_div.find('span', class_=re.compile(r'time', re.I))
-                    if date_span:
-                        date_str = date_span.get_text(strip=True)
-                    else:
-                        date_str = None
-                    
                     # 解析日期
+                    date_str = record['date_text']
                     pub_date = self._parse_date(date_str) if date_str else datetime.now()
                     
                     # 只添加符合日期范围的
@@ -230,7 +480,7 @@ class BSECollector(BaseCollector):
                     continue
         
         except Exception as e:
-            print(f"    提取页面内容失败: {e}")
+            print(f"    解析搜索结果失败: {e}")
         
         return items
     
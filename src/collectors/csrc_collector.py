@@ -1,11 +1,12 @@
 """证监会公告收集器"""
 import re
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List
 import httpx
-from bs4 import BeautifulSoup
 
 from .base_collector import BaseCollector, NewsItem
+from .dedup import IdentityIndex
+from .parsing import parse_csrc_list
 
 
 class CSRCCollector(BaseCollector):
@@ -25,10 +26,10 @@ class CSRCCollector(BaseCollector):
             新闻消息列表
         """
         news_items = []
-        start_date = datetime.now() - timedelta(days=days)
+        start_date = self._window_start(days)
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self._http_client() as client:
                 # 搜索关键词：股票代码或股票名称
                 search_keywords = [self.stock_code]
                 if self.stock_name:
@@ -41,13 +42,8 @@ class CSRCCollector(BaseCollector):
         except Exception as e:
             print(f"证监会数据收集失败: {str(e)}")
         
-        # 去重
-        seen = set()
-        unique_items = []
-        for item in news_items:
-            if item.url not in seen:
-                seen.add(item.url)
-                unique_items.append(item)
+        # 去重（多个关键词的搜索结果会重复）
+        unique_items = IdentityIndex(self.stock_code, self.stock_name).unique(news_items)
         
         self.news_items = unique_items
         return unique_items
@@ -70,27 +66,18 @@ class CSRCCollector(BaseCollector):
             )
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                # 根据实际HTML结构解析
-                # 示例代码，需要根据实际情况调整
-                for article in soup.select('.article-item'):
+                # 根据实际HTML结构解析（在解析执行器中进行，不阻塞事件循环）
+                records = await self._parse(parse_csrc_list, response.text)
+                for record in records:
                     try:
-                        title_elem = article.select_one('.title')
-                        date_elem = article.select_one('.date')
-                        link_elem = article.select_one('a')
-                        
-                        if not all([title_elem, date_elem, link_elem]):
-                            continue
-                        
-                        title = title_elem.text.strip()
-                        date_str = date_elem.text.strip()
-                        url = link_elem.get('href', '')
+                        title = record['title']
+                        url = record['href']
                         
                         if not url.startswith('http'):
                             url = self.BASE_URL + url
                         
                         # 解析日期
-                        date = self._parse_date(date_str)
+                        date = self._parse_date(record['date_text'])
                         if date and date >= start_date:
                             items.append(NewsItem(
                                 title=title,
@@ -0,0 +1,298 @@
+"""消息去重 - URL规范化、公告标识和标题+日期身份键，跨数据源判断同一条消息"""
+import hashlib
+import re
+import unicodedata
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .base_collector import NewsItem
+
+
+# 与消息身份无关的查询参数（统计、缓存刷新、来源标记等）
+IGNORED_QUERY_PARAMS = {'_', 't', 'ts', 'timestamp', 'random', 'r', 'v', 'spm', 'from', 'source', 'share_token'}
+IGNORED_QUERY_PREFIXES = ('utm_',)
+
+# 列表/栏目页：收集器在消息没有独立链接时会用它们代替，不能作为消息身份
+LISTING_PAGES = ('index.shtml', 'index.html', 'index.htm')
+
+# 交易所/披露平台域名到公告来源前缀（同一平台不同子域名、协议下的同一文件视为同一公告）
+ANNOUNCEMENT_HOSTS = {
+    'sse.com.cn': 'sse',
+    'szse.cn': 'szse',
+    'bse.cn': 'bse',
+    'neeq.com.cn': 'bse',
+    'cninfo.com.cn': 'cninfo',
+}
+ANNOUNCEMENT_FILE_RE = re.compile(r'/([^/]+)\.(?:pdf|doc|docx|html?|shtml)$', re.I)
+EASTMONEY_CODE_RE = re.compile(r'(AN\d{12,})', re.I)
+CNINFO_ID_RE = re.compile(r'announcementId=(\d+)', re.I)
+ANNOUNCEMENT_PREFIXES = {'em', 'cninfo', *ANNOUNCEMENT_HOSTS.values()}
+
+# 聚合平台的公告编号（东方财富转载的交易所公告），同一公告优先保留交易所/披露平台的原始版本
+AGGREGATOR_PREFIXES = {'em'}
+
+# 标题+日期身份键要求的最短标题长度（过短的标题如 "公告" 容易误合并）
+MIN_TITLE_KEY_LENGTH = 6
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    规范化URL
+    
+    - 协议相对地址（//host/path）和 http 统一为 https，域名转小写并去掉默认端口和 www.
+    - 合并路径中重复的斜杠，去掉末尾斜杠和片段（#...）
+    - 去掉统计/缓存类查询参数（utm_*、时间戳等），其余参数按名称排序
+    
+    没有URL的消息返回空字符串，相对地址原样返回（去掉首尾空白）。
+    """
+    if not url:
+        return ""
+    url = url.strip()
+    if url.startswith('//'):
+        url = 'https:' + url
+    parts = urlsplit(url)
+    if not parts.netloc:
+        return url
+    
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip('/') or '/'
+    query = urlencode(sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in IGNORED_QUERY_PARAMS and not name.lower().startswith(IGNORED_QUERY_PREFIXES)
+    ))
+    return urlunsplit(('https', host, path, query, ''))
+
+
+def announcement_id(url: str) -> str:
+    """
+    从URL中提取交易所/披露平台的公告标识
+    
+    - 东方财富公告编号（AN开头，公告详情页和PDF地址中都有）-> "em:AN..."
+    - 巨潮资讯 announcementId 参数 -> "cninfo:..."
+    - 上交所/深交所/北交所/巨潮的公告文件名（如 600519_20260901_XXXX.pdf）-> "sse:600519_20260901_XXXX"
+    
+    Returns:
+        公告标识，URL中没有时返回空字符串
+    """
+    if not url:
+        return ""
+    match = EASTMONEY_CODE_RE.search(url)
+    if match:
+        return 'em:' + match.group(1).upper()
+    match = CNINFO_ID_RE.search(url)
+    if match:
+        return 'cninfo:' + match.group(1)
+    
+    lowered = url.lower()
+    if not any(domain in lowered for domain in ANNOUNCEMENT_HOSTS):
+        # 不是交易所/披露平台的链接，省去解析URL
+        return ""
+    parts = urlsplit('https:' + url if url.startswith('//') else url)
+    host = (parts.hostname or '').lower()
+    for domain, prefix in ANNOUNCEMENT_HOSTS.items():
+        if host == domain or host.endswith('.' + domain):
+            match = ANNOUNCEMENT_FILE_RE.search(parts.path)
+            if match and match.group(1).lower() not in ('index', 'detail', 'view'):
+                return f"{prefix}:{match.group(1).lower()}"
+            break
+    return ""
+
+
+def normalize_title(title: str, stock_name: str = "", stock_code: str = "") -> str:
+    """
+    规范化标题：全角转半角、转小写、只保留字母数字和汉字，并去掉开头的股票名称/代码
+    
+    "贵州茅台：关于回购股份的公告" 和 "关于回购股份的公告" 规范化后相同。
+    """
+    text = unicodedata.normalize('NFKC', title).lower()
+    text = ''.join(char for char in text if char.isalnum())
+    for prefix in (stock_code, unicodedata.normalize('NFKC', stock_name).lower().replace(' ', '')):
+        while prefix and text.startswith(prefix):
+            text = text[len(prefix):]
+    return text
+
+
+def title_key(title: str, date: datetime, stock_name: str = "", stock_code: str = "") -> str:
+    """
+    标题+日期身份键（同一天发布、规范化标题相同的消息视为同一条）
+    
+    Returns:
+        身份键，标题过短时返回空字符串
+    """
+    normalized = normalize_title(title, stock_name, stock_code)
+    if len(normalized) < MIN_TITLE_KEY_LENGTH:
+        return ""
+    return f"title:{date.strftime('%Y-%m-%d')}|{normalized}"
+
+
+def identity_keys(item: NewsItem, stock_name: str = "", stock_code: str = "") -> List[str]:
+    """
+    消息的全部身份键：公告标识、规范化URL、标题+日期，任一相同即为同一条消息
+    
+    第一个键最能代表消息身份（有公告标识时为公告标识），可作为存储主键。
+    """
+    keys = []
+    announcement = announcement_id(item.url)
+    if announcement:
+        keys.append(announcement)
+    url = canonicalize_url(item.url)
+    if url and urlsplit(url).netloc and not url.split('?')[0].endswith(LISTING_PAGES):
+        keys.append('url:' + url)
+    title = title_key(item.title, item.date, stock_name, stock_code)
+    if title:
+        keys.append(title)
+    if not keys:
+        # 没有可靠身份的消息只与来源、标题和时间完全相同的消息合并
+        keys.append(f"item:{item.source}|{item.title}|{item.date.strftime('%Y-%m-%d %H:%M:%S')}|{item.url or ''}")
+    return keys
+
+
+def is_announcement_key(key: str) -> bool:
+    """身份键是否为公告标识（announcement_id 的返回值）"""
+    return key.split(':', 1)[0] in ANNOUNCEMENT_PREFIXES
+
+
+def announcement_namespace(announcement: str) -> str:
+    """公告标识的来源前缀（em、cninfo、sse、szse、bse）"""
+    return announcement.split(':', 1)[0]
+
+
+def announcements_conflict(announcement: str, known: Iterable[str]) -> bool:
+    """
+    公告标识是否与已知的公告标识冲突（即指向同一平台上的另一份公告）
+    
+    各平台的编号体系不同，同一份公告在上交所（文件名）和东方财富（AN编号）上的标识
+    总是不同，因此只有来源前缀相同而标识不同时才说明是两份公告。
+    
+    Args:
+        announcement: 消息的公告标识（没有时为空字符串）
+        known: 已有消息的公告标识
+    """
+    if not announcement:
+        return False
+    namespace = announcement_namespace(announcement)
+    return any(
+        other and other != announcement and announcement_namespace(other) == namespace
+        for other in known
+    )
+
+
+def announcement_rank(announcement: str) -> int:
+    """公告标识的优先级：交易所/披露平台的原始公告为2，聚合平台转载为1，没有公告标识为0"""
+    if not announcement:
+        return 0
+    return 1 if announcement_namespace(announcement) in AGGREGATOR_PREFIXES else 2
+
+
+def key_hash(key: str) -> int:
+    """身份键的64位哈希（有符号整数，可直接存入SQLite INTEGER列）"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+def identity_hashes(item: NewsItem, stock_name: str = "", stock_code: str = "") -> List[int]:
+    """消息全部身份键的哈希"""
+    return [key_hash(key) for key in identity_keys(item, stock_name, stock_code)]
+
+
+class IdentityIndex:
+    """
+    消息身份索引
+    
+    每条消息的全部身份键（公告标识、规范化URL、标题+日期）哈希后放入同一个集合，
+    任一键已存在即为重复。因此同一份上交所PDF经 http/https、// 前缀或不同查询参数
+    访问只计一次，雪球、东方财富转发的交易所公告也会与原公告合并。同一平台上公告
+    标识不同的两条公告（如同一天发布的多份 "独立董事述职报告"）即使标题相同也不会
+    合并（见 announcements_conflict）。
+    
+    用法:
+        index = IdentityIndex("600519", "贵州茅台")
+        unique_items = index.unique(items)
+    """
+    
+    def __init__(self, stock_code: str = "", stock_name: str = ""):
+        """
+        初始化索引
+        
+        Args:
+            stock_code: 股票代码（规范化标题时去掉开头的代码）
+            stock_name: 股票名称（规范化标题时去掉开头的名称）
+        """
+        self.stock_code = stock_code
+        self.stock_name = stock_name
+        self._hashes: Dict[int, int] = {}
+        self._announcements: Dict[int, Set[str]] = {}
+        self.items = 0
+        self.duplicates = 0
+    
+    def _match(self, keys: List[str], announcement: str) -> Optional[int]:
+        """按身份键查找已有消息的序号（与已有消息的公告标识冲突的不算）"""
+        for key in keys:
+            slot = self._hashes.get(key_hash(key))
+            if slot is None:
+                continue
+            if announcements_conflict(announcement, self._announcements.get(slot, ())):
+                continue
+            return slot
+        return None
+    
+    def lookup(self, item: NewsItem) -> Optional[int]:
+        """
+        查找消息是否已在索引中
+        
+        Returns:
+            已有消息的序号（按加入顺序），不存在时返回None
+        """
+        return self._match(identity_keys(item, self.stock_name, self.stock_code), announcement_id(item.url))
+    
+    def add(self, item: NewsItem) -> bool:
+        """
+        加入消息（重复消息的新身份键也会并入已有消息，以便合并后续的其他写法）
+        
+        Returns:
+            是否为新消息
+        """
+        keys = identity_keys(item, self.stock_name, self.stock_code)
+        announcement = announcement_id(item.url)
+        slot = self._match(keys, announcement)
+        is_new = slot is None
+        if is_new:
+            slot = self.items
+            self.items += 1
+        else:
+            self.duplicates += 1
+        
+        if announcement:
+            self._announcements.setdefault(slot, set()).add(announcement)
+        for key in keys:
+            self._hashes.setdefault(key_hash(key), slot)
+        return is_new
+    
+    def unique(self, items: Iterable[NewsItem]) -> List[NewsItem]:
+        """
+        去掉重复消息，保持原有顺序
+        
+        按 announcement_rank 从高到低加入索引，重复时保留交易所的原始公告，其次是
+        东方财富等聚合平台的公告，最后才是媒体转发。
+        
+        Returns:
+            去重后的消息列表
+        """
+        items = list(items)
+        order: List[Tuple[int, NewsItem]] = sorted(
+            enumerate(items), key=lambda pair: -announcement_rank(announcement_id(pair[1].url))
+        )
+        kept = {position for position, item in order if self.add(item)}
+        return [item for position, item in enumerate(items) if position in kept]
+    
+    def __contains__(self, item: NewsItem) -> bool:
+        return self.lookup(item) is not None
+    
+    def __len__(self) -> int:
+        return self.items
@@ -4,140 +4,194 @@
 """
 import httpx
 import json
+import math
 import re
 from urllib.parse import quote
-from datetime import datetime, timedelta
-from typing import List, Dict
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from . import jsonp
 from .base_collector import BaseCollector, NewsItem
+from .dedup import IdentityIndex
 
 class EastmoneyAPICollector(BaseCollector):
     """东方财富公告API收集器"""
     
-    def __init__(self, stock_code: str, stock_name: str):
-        super().__init__(stock_code, stock_name)
+    SEARCH_URL = "https://search-api-web.eastmoney.com/search/jsonp"
+    
+    PAGE_SIZE = 50
+    # 单个关键词最多获取的页数
+    MAX_PAGES = 20
+    # 首页之后并发请求的页数上限
+    PAGE_CONCURRENCY = 5
+    
+    def __init__(
+        self,
+        stock_code: str,
+        stock_name: str,
+        http_session=None,
+        page_concurrency: int = PAGE_CONCURRENCY
+    ):
+        super().__init__(stock_code, stock_name, http_session)
         self.source_name = "东方财富"
+        self.page_concurrency = page_concurrency
     
     async def collect(self, days: int = 30) -> List[NewsItem]:
-        """收集东方财富公告"""
-        results = []
-        start_date = datetime.now() - timedelta(days=days)
-        stock_name = self.stock_name
+        """收集东方财富公告（按股票代码和名称并行检索后合并），按日期由新到旧排列"""
+        results = await self._collect_from_pages(days)
+        results.sort(key=lambda item: item.date, reverse=True)
+        return results
+    
+    async def collect_pages(self, days: int = 30) -> AsyncIterator[List[NewsItem]]:
+        """按股票代码和名称并行检索，按到达顺序逐页产出（跨关键词按消息身份去重）"""
+        start_date = self._window_start(days)
+        keywords = [keyword for keyword in (self.stock_code, self.stock_name) if keyword]
+        self.errors = []
+        identities = IdentityIndex(self.stock_code, self.stock_name)
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            page_index = 1
-            page_size = 20
-            total_count = 0
-            
-            while True:
-                # 构建参数
-                param = {
-                    "uid": "",
-                    "keyword": stock_name,
-                    "type": ["noticeWeb"],
-                    "client": "web",
-                    "clientVersion": "curr",
-                    "clientType": "web",
-                    "param": {
-                        "noticeWeb": {
-                            "preTag": "<em class=\"red\">",
-                            "postTag": "</em>",
-                            "pageSize": page_size,
-                            "pageIndex": page_index
-                        }
-                    }
-                }
-                
-                # URL编码参数
-                param_str = json.dumps(param, separators=(',', ':'), ensure_ascii=False)
-                param_encoded = quote(param_str, safe='')
-                
-                timestamp = str(int(datetime.now().timestamp() * 1000))
-                url = f"https://search-api-web.eastmoney.com/search/jsonp?cb=jQuery&param={param_encoded}&_={timestamp}"
-                
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-                    'Referer': f'https://so.eastmoney.com/ann/s?keyword={quote(stock_name)}'
+        async with self._http_client() as client:
+            async for page_items in self._merge_streams(
+                [self._search(client, keyword, start_date) for keyword in keywords]
+            ):
+                unique_items = identities.unique(page_items)
+                if unique_items:
+                    yield unique_items
+    
+    async def _search(
+        self,
+        client: httpx.AsyncClient,
+        keyword: str,
+        start_date: datetime
+    ) -> AsyncIterator[List[NewsItem]]:
+        """
+        按关键词检索公告，逐页产出
+        
+        首页返回 hitsTotal 后，剩余页按批次并发获取，到达时间边界或增量采集时
+        遇到已采集的公告即停止。单页请求失败只记录到 errors，不会被当作到达边界而提前停止。
+        """
+        first_page = await self._fetch_page(client, keyword, 1, start_date)
+        if first_page is None:
+            return
+        
+        page_items, hits_total, reached_boundary = first_page
+        print(f"{self.source_name}搜索 {keyword} 到 {hits_total} 条相关公告")
+        total_items = len(page_items)
+        yield page_items
+        
+        last_page = min(self.MAX_PAGES, math.ceil(hits_total / self.PAGE_SIZE))
+        if last_page > 1 and not reached_boundary and not self._reached_watermark(page_items):
+            async for page in self._iter_pages(
+                lambda page_index: self._fetch_page(client, keyword, page_index, start_date),
+                range(2, last_page + 1),
+                self.page_concurrency,
+                should_stop=lambda page: page is not None and (page[2] or self._reached_watermark(page[0]))
+            ):
+                if page is not None:
+                    total_items += len(page[0])
+                    yield page[0]
+        
+        print(f"{self.source_name}关键词 {keyword} 共获取 {total_items} 条")
+    
+    async def _fetch_page(
+        self,
+        client: httpx.AsyncClient,
+        keyword: str,
+        page_index: int,
+        start_date: datetime
+    ) -> Optional[Tuple[List[NewsItem], int, bool]]:
+        """
+        获取单页公告
+        
+        Returns:
+            (时间范围内的新闻列表, 命中总数, 是否已到达时间边界或无更多数据)，请求失败时为None
+        """
+        page_results = []
+        
+        # 构建参数
+        param = {
+            "uid": "",
+            "keyword": keyword,
+            "type": ["noticeWeb"],
+            "client": "web",
+            "clientVersion": "curr",
+            "clientType": "web",
+            "param": {
+                "noticeWeb": {
+                    "preTag": "<em class=\"red\">",
+                    "postTag": "</em>",
+                    "pageSize": self.PAGE_SIZE,
+                    "pageIndex": page_index
                 }
-                
+            }
+        }
+        
+        # URL编码参数
+        param_str = json.dumps(param, separators=(',', ':'), ensure_ascii=False)
+        param_encoded = quote(param_str, safe='')
+        
+        timestamp = str(int(datetime.now().timestamp() * 1000))
+        url = f"{self.SEARCH_URL}?cb=jQuery&param={param_encoded}&_={timestamp}"
+        
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+            'Referer': f'https://so.eastmoney.com/ann/s?keyword={quote(keyword)}'
+        }
+        
+        try:
+            response = await client.get(url, headers=headers)
+            response.raise_for_status()
+            
+            # 解析JSONP响应
+            # jQuery(...) 格式，直接在响应字节上去掉回调包装；无法解析时按请求失败记录
+            data = jsonp.decode(response.content, response.charset_encoding)
+            
+            if data.get('code') != 0:
+                # 接口错误按请求失败记录，不能当作没有更多数据
+                raise ValueError(f"API返回错误: code={data.get('code')} {data.get('msg')}")
+            
+            hits_total = data.get('hitsTotal', 0)
+            
+            notices = data.get('result', {}).get('noticeWeb', [])
+            if not notices:
+                return page_results, hits_total, True
+            
+            for notice in notices:
                 try:
-                    print(f"正在获取第 {page_index} 页...")
-                    response = await client.get(url, headers=headers)
-                    text = response.text
-                    
-                    # 解析JSONP响应
-                    # jQuery(...) 格式
-                    json_start = text.find('(')
-                    json_end = text.rfind(')')
-                    if json_start == -1 or json_end == -1:
-                        print(f"无法解析响应格式")
-                        break
-                    
-                    json_str = text[json_start + 1:json_end]
-                    data = json.loads(json_str)
+                    # 解析日期
+                    date_str = notice.get('date', '')  # "2025-11-25 00:00:00"
+                    pub_date = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
                     
-                    if data.get('code') != 0:
-                        print(f"API返回错误: {data.get('msg')}")
-                        break
+                    # 检查日期范围（结果按时间倒序，之后的公告都更早）
+                    if pub_date < start_date:
+                        return page_results, hits_total, True
                     
-                    hits_total = data.get('hitsTotal', 0)
-                    if page_index == 1:
-                        total_count = hits_total
-                        print(f"{self.source_name}搜索到 {total_count} 条相关公告")
+                    # 清理标题（移除HTML标签）
+                    title = notice.get('title', '')
+                    title = re.sub(r'<[^>]+>', '', title)
                     
-                    notices = data.get('result', {}).get('noticeWeb', [])
-                    if not notices:
-                        break
+                    # 获取URL
+                    notice_url = notice.get('url', '')
                     
-                    page_results = []
-                    for notice in notices:
-                        try:
-                            # 解析日期
-                            date_str = notice.get('date', '')  # "2025-11-25 00:00:00"
-                            pub_date = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-                            
-                            # 检查日期范围
-                            if pub_date < start_date:
-                                print(f"已获取第 {page_index} 页，共 {len(page_results)} 条（已到达时间边界）")
-                                results.extend(page_results)
-                                return results
-                            
-                            # 清理标题（移除HTML标签）
-                            title = notice.get('title', '')
-                            title = re.sub(r'<[^>]+>', '', title)
-                            
-                            # 获取URL
-                            url = notice.get('url', '')
-                            
-                            # 清理内容（移除HTML标签）
-                            content = notice.get('content', '')
-                            content = re.sub(r'<[^>]+>', '', content)
-                            
-                            news_item = NewsItem(
-                                title=title,
-                                url=url,
-                                date=pub_date,
-                                source=self.source_name,
-                                importance=self._judge_importance(title),
-                                content=content[:100] if content else ""
-                            )
-                            
-                            page_results.append(news_item)
-                            
-                        except Exception as e:
-                            print(f"解析公告失败: {e}, 数据: {notice}")
-                            continue
+                    # 清理内容（移除HTML标签）
+                    content = notice.get('content', '')
+                    content = re.sub(r'<[^>]+>', '', content)
                     
-                    print(f"已获取第 {page_index} 页，共 {len(page_results)} 条")
-                    results.extend(page_results)
+                    news_item = NewsItem(
+                        title=title,
+                        url=notice_url,
+                        date=pub_date,
+                        source=self.source_name,
+                        importance=self._judge_importance(title),
+                        content=content[:100] if content else ""
+                    )
                     
-                    # 检查是否还有更多页
-                    if len(results) >= hits_total:
-                        break
-                    
-                    page_index += 1
+                    page_results.append(news_item)
                     
                 except Exception as e:
-                    print(f"请求失败: {e}")
-                    break
+                    print(f"解析公告失败: {e}, 数据: {notice}")
+                    continue
+            
+            return page_results, hits_total, False
         
-        return results
+        except Exception as e:
+            self._record_error(f"关键词 {keyword} 第 {page_index} 页获取失败", e)
+            return None
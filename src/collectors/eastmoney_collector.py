@@ -1,11 +1,11 @@
 """东方财富收集器"""
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List
 import httpx
-import re
-from bs4 import BeautifulSoup
 
 from .base_collector import BaseCollector, NewsItem
+from .dedup import IdentityIndex
+from .parsing import parse_eastmoney_news_search, parse_guba_list
 
 
 class EastMoneyCollector(BaseCollector):
@@ -26,10 +26,10 @@ class EastMoneyCollector(BaseCollector):
             新闻消息列表
         """
         news_items = []
-        start_date = datetime.now() - timedelta(days=days)
+        start_date = self._window_start(days)
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self._http_client() as client:
                 # 搜索股票代码和名称
                 search_keywords = [self.stock_code]
                 if self.stock_name:
@@ -42,13 +42,8 @@ class EastMoneyCollector(BaseCollector):
         except Exception as e:
             print(f"东方财富数据收集失败: {str(e)}")
         
-        # 去重
-        seen = set()
-        unique_items = []
-        for item in news_items:
-            if item.url not in seen:
-                seen.add(item.url)
-                unique_items.append(item)
+        # 去重（多个关键词的搜索结果会重复）
+        unique_items = IdentityIndex(self.stock_code, self.stock_name).unique(news_items)
         
         self.news_items = unique_items
         return unique_items
@@ -101,56 +96,43 @@ class EastMoneyCollector(BaseCollector):
             print(f"    响应状态: {response.status_code}")
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'lxml')
+                # 在解析执行器中解析帖子列表，不阻塞事件循环
+                post_count, records = await self._parse(parse_guba_list, response.text)
+                print(f"    找到 {post_count} 个帖子")
                 
-                # 查找帖子列表
-                posts = soup.find_all(['div', 'tr'], class_=re.compile(r'articleh|list-item', re.I))
-                print(f"    找到 {len(posts)} 个帖子")
-                
-                for post in posts[:30]:  # 限制数量
+                for record in records:
                     try:
-                        link = post.find('a', href=True)
-                        if not link:
-                            continue
-                        
-                        title = link.get_text(strip=True)
-                        if not title or len(title) < 5:
-                            continue
+                        title = record['title']
                         
                         # 过滤掉明显的灌水贴
                         if any(word in title for word in ['。。', '？？', '！！']):
                             continue
                         
-                        href = link['href']
+                        href = record['href']
                         if not href.startswith('http'):
                             href = self.STOCK_URL + href
                         
-                        # 查找日期
-                        date_elem = post.find(['span', 'td'], class_=re.compile(r'time|date', re.I))
-                        if date_elem:
-                            date_text = date_elem.get_text(strip=True)
-                            date = self._parse_date(date_text)
+                        date = self._parse_date(record['date_text'])
+                        if date and date >= start_date:
+                            # 使用基类方法判断重要性和分类
+                            importance = self._judge_importance(title)
+                            category = self._judge_category(title)
+                            
+                            # 如果是股吧帖子且未匹配到特定分类,则标记为社区讨论
+                            if category == "其他":
+                                category = "社区讨论"
+                                # 社区讨论类降低一级重要性（除非已经是高）
+                                if importance == "中":
+                                    importance = "低"
                             
-                            if date and date >= start_date:
-                                # 使用基类方法判断重要性和分类
-                                importance = self._judge_importance(title)
-                                category = self._judge_category(title)
-                                
-                                # 如果是股吧帖子且未匹配到特定分类,则标记为社区讨论
-                                if category == "其他":
-                                    category = "社区讨论"
-                                    # 社区讨论类降低一级重要性（除非已经是高）
-                                    if importance == "中":
-                                        importance = "低"
-                                
-                                items.append(NewsItem(
-                                    title=title,
-                                    date=date,
-                                    source="东方财富",
-                                    url=href,
-                                    importance=importance,
-                                    category=category
-                                ))
+                            items.append(NewsItem(
+                                title=title,
+                                date=date,
+                                source="东方财富",
+                                url=href,
+                                importance=importance,
+                                category=category
+                            ))
                     except Exception:
                         continue
                 
@@ -187,33 +169,21 @@ class EastMoneyCollector(BaseCollector):
             response = await client.get(search_url, params=params, headers=headers)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'lxml')
+                records = await self._parse(parse_eastmoney_news_search, response.text)
                 
-                # 查找新闻列表
-                news_items = soup.find_all(['div', 'li'], class_=re.compile(r'news-item|result-item', re.I))
-                
-                for news in news_items[:20]:
+                for record in records:
                     try:
-                        link = news.find('a', href=True)
-                        if not link:
-                            continue
-                        
-                        title = link.get_text(strip=True)
-                        href = link['href']
-                        
-                        # 查找日期
-                        date_elem = news.find(['span', 'time'], class_=re.compile(r'date|time', re.I))
-                        if date_elem:
-                            date = self._parse_date(date_elem.get_text(strip=True))
-                            if date and date >= start_date:
-                                items.append(NewsItem(
-                                    title=title,
-                                    date=date,
-                                    source="东方财富",
-                                    url=href,
-                                    importance=self._judge_importance(title),
-                                    category=self._judge_category(title)
-                                ))
+                        title = record['title']
+                        date = self._parse_date(record['date_text'])
+                        if date and date >= start_date:
+                            items.append(NewsItem(
+                                title=title,
+                                date=date,
+                                source="东方财富",
+                                url=record['href'],
+                                importance=self._judge_importance(title),
+                                category=self._judge_category(title)
+                            ))
                     except Exception:
                         continue
                 
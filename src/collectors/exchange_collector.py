@@ -1,16 +1,24 @@
 """交易所数据采集器 - 使用真实HTML页面抓取"""
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List, Optional
 import httpx
 from bs4 import BeautifulSoup
 
+from . import jsonp
 from .base_collector import BaseCollector, NewsItem
+from .resilience import RETRY_EXTENSION
 
 
 class ExchangeCollector(BaseCollector):
     """交易所数据采集器"""
     
-    def __init__(self, stock_code: str, stock_name: str = "", exchange: Optional[str] = None):
+    def __init__(
+        self,
+        stock_code: str,
+        stock_name: str = "",
+        exchange: Optional[str] = None,
+        http_session=None
+    ):
         """
         初始化
         
@@ -18,8 +26,9 @@ class ExchangeCollector(BaseCollector):
             stock_code: 股票代码
             stock_name: 股票名称
             exchange: 交易所类型 ('SSE' 或 'SZSE')，如果不提供则自动判断
+            http_session: 共享HTTP会话（可选）
         """
-        super().__init__(stock_code, stock_name)
+        super().__init__(stock_code, stock_name, http_session)
         if exchange:
             self.exchange = exchange.upper()
         else:
@@ -65,9 +74,9 @@ class ExchangeCollector(BaseCollector):
         Returns:
             新闻项列表
         """
-        start_date = datetime.now() - timedelta(days=days)
+        start_date = self._window_start(days)
         
-        async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
+        async with self._http_client() as client:
             if self.exchange == 'SSE':
                 items = await self._collect_sse(client, start_date)
             elif self.exchange == 'SZSE':
@@ -113,18 +122,13 @@ class ExchangeCollector(BaseCollector):
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
             }
             
-            response = await client.get(api_url, params=params, headers=headers, timeout=15.0)
+            response = await client.get(api_url, params=params, headers=headers, timeout=15.0, follow_redirects=True)
             
             if response.status_code == 200:
-                text = response.text
-                
                 # 提取JSONP数据
-                import re
-                import json
-                match = re.search(r'jsonpCallback\w*\((.*)\)', text)
+                data = jsonp.decode(response.content, response.charset_encoding)
                 
-                if match:
-                    data = json.loads(match.group(1))
+                if isinstance(data, dict):
                     result = data.get('result', [])
                     
                     if result:
@@ -228,7 +232,10 @@ class ExchangeCollector(BaseCollector):
                 'pageNum': 1,
             }
             
-            response = await client.post(url, json=data, headers=headers, timeout=10.0)
+            response = await client.post(
+                url, json=data, headers=headers, timeout=10.0, follow_redirects=True,
+                extensions={RETRY_EXTENSION: True}  # 只读查询，允许重试
+            )
             
             if response.status_code == 200:
                 result = response.json()
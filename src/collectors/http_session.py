@@ -0,0 +1,180 @@
+"""共享HTTP会话管理器 - 在一次运行内复用连接池"""
+import asyncio
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from .rate_limiter import HostRateLimiter
+from .resilience import ResilientTransport, RetryPolicy
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """响应体读取完毕（关闭）时释放主机连接名额的流包装，并统计响应体字节数"""
+    
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[int], None]):
+        self._stream = stream
+        self._release = release
+        self._size = 0
+    
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._size += len(chunk)
+            yield chunk
+    
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release(self._size)
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """按主机限制并发连接数和请求速率的传输层"""
+    
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        per_host_limit: int = 6,
+        rate_limiter: Optional[HostRateLimiter] = None
+    ):
+        """
+        初始化传输层
+        
+        Args:
+            transport: 实际发送请求的底层传输
+            per_host_limit: 单个主机允许的最大并发请求数
+            rate_limiter: 按主机的限速器（可选）
+        """
+        self._transport = transport
+        self._rate_limiter = rate_limiter
+        self._semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(max(1, per_host_limit))
+        )
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        semaphore = self._semaphores[host]
+        await semaphore.acquire()
+        
+        released = False
+        status_code = None
+        
+        def release(body_size: Optional[int] = None):
+            nonlocal released
+            if not released:
+                released = True
+                semaphore.release()
+                if self._rate_limiter is not None:
+                    self._rate_limiter.record(host, status_code, body_size)
+        
+        try:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire(host)
+            response = await self._transport.handle_async_request(request)
+        except asyncio.CancelledError:
+            released = True
+            semaphore.release()
+            raise
+        except BaseException:
+            release()
+            raise
+        
+        status_code = response.status_code
+        
+        # 连接名额一直持有到响应体被读取/关闭为止
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions
+        )
+    
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class HTTPSessionManager:
+    """
+    HTTP会话管理器
+    
+    持有一个共享的 httpx.AsyncClient，生命周期与一次运行绑定。收集器和
+    AISummarizer 通过注入使用同一个连接池，批量运行时跨股票复用 keep-alive 连接。
+    所有请求都经过按主机的令牌桶限速（见 rate_limiter），临时错误会抖动重试，
+    连续失败的主机会被熔断（见 resilience）。
+    
+    用法:
+        async with HTTPSessionManager() as session:
+            collector = SSEAPICollector("600519", "贵州茅台", http_session=session)
+            await collector.collect(30)
+    """
+    
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 40,
+        keepalive_expiry: float = 30.0,
+        per_host_limit: int = 6,
+        rate_limits: Optional[Dict[str, float]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0
+    ):
+        """
+        初始化会话管理器
+        
+        Args:
+            timeout: 请求超时时间（秒）
+            max_connections: 连接池最大连接数
+            max_keepalive_connections: 保持空闲的keep-alive连接数
+            keepalive_expiry: keep-alive连接空闲多久后关闭（秒）
+            per_host_limit: 单个主机的最大并发连接数
+            rate_limits: 按主机覆盖的请求速率（次/秒），未配置的主机使用默认速率
+            retry_policy: 重试策略（默认最多尝试3次，只重试GET/HEAD/OPTIONS；
+                单个请求可用 extensions={RETRY_EXTENSION: True} 开启重试）
+            failure_threshold: 主机熔断的连续失败阈值
+            reset_timeout: 主机熔断的冷却时间（秒）
+        """
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.per_host_limit = per_host_limit
+        self.rate_limiter = HostRateLimiter(rate_limits)
+        self.resilience = ResilientTransport(
+            HostLimitedTransport(
+                httpx.AsyncHTTPTransport(limits=self.limits),
+                per_host_limit=per_host_limit,
+                rate_limiter=self.rate_limiter
+            ),
+            retry_policy=retry_policy,
+            failure_threshold=failure_threshold,
+            reset_timeout=reset_timeout
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """共享的HTTP客户端（首次访问时创建）"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout, transport=self.resilience)
+        return self._client
+    
+    def open_hosts(self) -> List[str]:
+        """当前处于熔断状态的主机"""
+        return self.resilience.open_hosts()
+    
+    async def aclose(self):
+        """关闭共享客户端，释放所有连接"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def __aenter__(self) -> 'HTTPSessionManager':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
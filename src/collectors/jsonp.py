@@ -0,0 +1,154 @@
+"""JSON/JSONP解码 - 无正则剥离回调包装，可选使用更快的JSON库"""
+import json
+from typing import Any, AsyncIterator, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+Buffer = Union[str, bytes, bytearray, memoryview]
+
+# 当前使用的JSON库：orjson > ujson > 标准库json
+if orjson is not None:
+    BACKEND = 'orjson'
+elif ujson is not None:
+    BACKEND = 'ujson'
+else:
+    BACKEND = 'json'
+
+_WHITESPACE = ' \t\r\n'
+
+
+def loads(data: Buffer) -> Any:
+    """
+    用当前的JSON库解析
+    
+    orjson 可以直接解析 memoryview（不复制）；其他库需要时先转换为 bytes。
+    
+    Raises:
+        ValueError: 不是合法的JSON（各JSON库的解析异常均为 ValueError 的子类）
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, (memoryview, bytearray)):
+        data = bytes(data)
+    if ujson is not None:
+        return ujson.loads(data)
+    return json.loads(data)
+
+
+def jsonp_bounds(data: Buffer) -> Tuple[int, int]:
+    """
+    定位JSONP回调包装 callback(...) 中JSON的起止位置
+    
+    只向前扫描回调名、向后查找最后一个右括号，不使用正则，也不复制数据。
+    普通JSON（以 { 或 [ 开头）返回整个范围。
+    
+    Args:
+        data: 响应文本或字节
+    
+    Returns:
+        (起始位置, 结束位置)，data[start:end] 即为JSON
+    
+    Raises:
+        ValueError: 形如 callback(... 但缺少右括号
+    """
+    is_text = isinstance(data, str)
+    view = data if is_text else memoryview(data).cast('B')
+    length = len(view)
+    
+    start = 0
+    while start < length and _char(view[start], is_text) in _WHITESPACE:
+        start += 1
+    end = length
+    while end > start and _char(view[end - 1], is_text) in _WHITESPACE:
+        end -= 1
+    
+    if start == end or _char(view[start], is_text) in ('{', '['):
+        return start, end
+    
+    # 回调名由字母、数字、下划线、$ 和 . 组成，之后紧跟左括号
+    pos = start
+    while pos < end:
+        char = _char(view[pos], is_text)
+        if char == '(':
+            break
+        if not (char.isalnum() or char in '_$.'):
+            # 不是JSONP，交给JSON库报错
+            return start, end
+        pos += 1
+    else:
+        return start, end
+    
+    # 去掉结尾的分号，最后一个字符必须是右括号
+    if _char(view[end - 1], is_text) == ';':
+        end -= 1
+        while end > pos and _char(view[end - 1], is_text) in _WHITESPACE:
+            end -= 1
+    if end - 1 <= pos or _char(view[end - 1], is_text) != ')':
+        raise ValueError("无法解析JSONP响应：缺少右括号")
+    return pos + 1, end - 1
+
+
+def _char(value: Union[str, int], is_text: bool) -> str:
+    return value if is_text else chr(value)
+
+
+def decode(data: Buffer, encoding: Optional[str] = None) -> Any:
+    """
+    解析JSON或JSONP响应
+    
+    字节数据通过 memoryview 切片定位JSON，不复制回调包装内的内容。
+    
+    Args:
+        data: 响应文本或字节（httpx 的 response.content 或 response.text）
+        encoding: 字节不是UTF-8时使用的编码（可选，如响应头中的编码）
+    
+    Returns:
+        解析后的数据
+    
+    Raises:
+        ValueError: 响应不是合法的JSON/JSONP
+    """
+    start, end = jsonp_bounds(data)
+    if isinstance(data, str):
+        return loads(data[start:end])
+    
+    payload = memoryview(data)[start:end]
+    try:
+        return loads(payload)
+    except ValueError:
+        if not encoding or encoding.lower().replace('-', '') == 'utf8':
+            raise
+        return loads(bytes(payload).decode(encoding))
+
+
+async def decode_stream(chunks: AsyncIterator[bytes], encoding: Optional[str] = None) -> Any:
+    """
+    边接收边缓存流式响应，接收完毕后直接在缓冲区上解析
+    
+    分块追加到同一个 bytearray，省去拼接和解码成字符串的复制。
+    
+    用法:
+        async with client.stream('GET', url) as response:
+            response.raise_for_status()
+            data = await decode_stream(response.aiter_bytes(), response.encoding)
+    
+    Args:
+        chunks: 响应体分块（如 response.aiter_bytes()）
+        encoding: 字节不是UTF-8时使用的编码（可选）
+    
+    Returns:
+        解析后的数据
+    """
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+    return decode(buffer, encoding)
@@ -0,0 +1,553 @@
+"""标题关键词匹配 - 预编译的多模式匹配器（Aho-Corasick），一次扫描判断重要性和分类"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def build_automaton(patterns: Sequence[str]) -> Tuple[List[Dict[str, int]], List[int], List[Tuple[int, ...]]]:
+    """
+    构建 Aho-Corasick 自动机
+    
+    Args:
+        patterns: 模式串列表（空串忽略）
+    
+    Returns:
+        (goto, fail, output)：goto[状态][字符] 为字典树的边，fail[状态] 为失配指针，
+        output[状态] 为到达该状态时匹配到的模式串下标（已包含沿失配指针可达的输出）
+    """
+    goto: List[Dict[str, int]] = [{}]
+    output: List[List[int]] = [[]]
+    for index, pattern in enumerate(patterns):
+        if not pattern:
+            continue
+        state = 0
+        for char in pattern:
+            next_state = goto[state].get(char)
+            if next_state is None:
+                next_state = len(goto)
+                goto[state][char] = next_state
+                goto.append({})
+                output.append([])
+            state = next_state
+        output[state].append(index)
+    
+    # 按层次遍历计算失配指针
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        output[state].extend(output[fail[state]])
+        for char, next_state in goto[state].items():
+            fallback = fail[state]
+            while fallback and char not in goto[fallback]:
+                fallback = fail[fallback]
+            fail[next_state] = goto[fallback].get(char, 0)
+            queue.append(next_state)
+    return goto, fail, [tuple(ids) for ids in output]
+
+
+class KeywordMatcher:
+    """
+    多模式关键词匹配器（Aho-Corasick 自动机）
+    
+    所有关键词按组编译成一个自动机，失配跳转预先展开为完整的状态转移表，
+    扫描文本时每个字符只做一次查表，结果是命中的关键词组的位掩码。
+    
+    用法:
+        matcher = KeywordMatcher({'high': ['重组', '停牌'], 'low': ['传闻']})
+        mask = matcher.scan("某公司筹划重组停牌")
+        matcher.has(mask, 'high')  # True
+    """
+    
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        """
+        编译自动机
+        
+        Args:
+            groups: 组名到关键词列表的字典（同一关键词可属于多个组）
+        """
+        self.flags: Dict[str, int] = {name: 1 << i for i, name in enumerate(groups)}
+        
+        patterns: List[str] = []
+        pattern_flags: List[int] = []
+        for name, keywords in groups.items():
+            for keyword in keywords:
+                patterns.append(keyword)
+                pattern_flags.append(self.flags[name])
+        goto, fail, output = build_automaton(patterns)
+        
+        # 把失配跳转合并进转移表（得到确定性自动机），按层次遍历保证失配状态先展开
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in range(len(goto) - 1)]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            # 先继承失配状态的转移，再用自身的字典树边覆盖
+            transitions = dict(delta[fail[state]])
+            transitions.update(goto[state])
+            delta[state] = transitions
+            queue.extend(goto[state].values())
+        
+        self._delta = delta
+        self._output = [self._mask(ids, pattern_flags) for ids in output]
+    
+    @staticmethod
+    def _mask(pattern_ids: Iterable[int], pattern_flags: List[int]) -> int:
+        mask = 0
+        for index in pattern_ids:
+            mask |= pattern_flags[index]
+        return mask
+    
+    def scan(self, text: str) -> int:
+        """
+        扫描文本
+        
+        Args:
+            text: 待匹配文本
+        
+        Returns:
+            命中的关键词组位掩码
+        """
+        delta = self._delta
+        output = self._output
+        state = 0
+        mask = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            mask |= output[state]
+        return mask
+    
+    def has(self, mask: int, group: str) -> bool:
+        """判断位掩码中是否命中某个关键词组"""
+        return bool(mask & self.flags[group])
+    
+    def groups(self, mask: int) -> List[str]:
+        """位掩码中命中的关键词组名"""
+        return [name for name, flag in self.flags.items() if mask & flag]
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+
+class EntityIndex:
+    """
+    实体名称索引（Aho-Corasick 自动机）
+    
+    每个实体（如上市公司）有一个或多个名称（全称、简称、股票代码等），所有名称
+    编译成一个自动机，一次扫描找出文本中提到的全部实体，耗时只与文本长度有关，
+    与实体数量无关。实体数量较多，因此使用失配指针而不展开完整的转移表。
+    
+    以英文字母或数字开头/结尾的名称（如股票代码）要求两侧不紧邻字母或数字，
+    避免 "600519" 匹配到更长数字串的一部分；被其他实体更长的名称完整包含的
+    匹配会被忽略（如 "平安银行" 中不再单独报告 "平安"）。
+    
+    用法:
+        index = EntityIndex({'600519': ['贵州茅台', '600519'], '000001': ['平安银行']})
+        index.find_keys("贵州茅台与平安银行签署合作协议")  # ['600519', '000001']
+    """
+    
+    def __init__(self, entities: Dict[str, Iterable[str]], cache_size: int = 65536):
+        """
+        编译索引
+        
+        Args:
+            entities: 实体标识到名称列表的字典
+            cache_size: 按文本缓存的查找结果数上限
+        """
+        self._names: List[str] = []
+        self._keys: List[str] = []
+        seen = set()
+        for key, names in entities.items():
+            for name in names:
+                name = name.strip()
+                if name and (key, name) not in seen:
+                    seen.add((key, name))
+                    self._names.append(name)
+                    self._keys.append(key)
+        self.entities = len(entities)
+        self._goto, self._fail, self._output = build_automaton(self._names)
+        self.find_keys = lru_cache(maxsize=cache_size)(self._find_keys)
+    
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        查找文本中提到的实体
+        
+        Args:
+            text: 待查找文本（如消息标题）
+        
+        Returns:
+            (起始位置, 结束位置, 实体标识) 列表，按起始位置排列
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        names = self._names
+        matches = []
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                name = names[index]
+                start = end - len(name)
+                if _is_word_char(name[0]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if _is_word_char(name[-1]) and end < len(text) and _is_word_char(text[end]):
+                    continue
+                matches.append((start, end, self._keys[index]))
+        if len(matches) < 2:
+            return matches
+        
+        # 去掉被其他实体的更长匹配完整包含的匹配
+        matches.sort(key=lambda match: (match[0], -match[1]))
+        kept = []
+        for match in matches:
+            if any(
+                other[0] <= match[0] and match[1] <= other[1] and other[2] != match[2]
+                and (other[0], other[1]) != (match[0], match[1])
+                for other in kept
+            ):
+                continue
+            kept.append(match)
+        return kept
+    
+    def _find_keys(self, text: str) -> List[str]:
+        keys = []
+        for _, _, key in self.find(text):
+            if key not in keys:
+                keys.append(key)
+        return keys
+
+
+# 不相关新闻的关键词（其他公司、行业泛泛而谈）
+IRRELEVANT_KEYWORDS = [
+    '暗盘', '战争', '界商业', '行业观察', '市场盘点',
+    '十大', '排行', '榜单', '集锦', '盘点'
+]
+
+# 其他公司名称（如果标题主要讲其他公司）
+OTHER_COMPANIES = [
+    '瑞博生物', '药明生物', '药明康德', '信达生物', '科伦博泰', '百济神州',
+    '恒瑞医药', '复星医药', '石药集团', '君实生物', '康方生物'
+]
+
+# 财务报告类始终为高重要性（无论是否直接相关，因为这些是官方公告）
+FINANCIAL_REPORT_KEYWORDS = [
+    '年报', '中报', '季报', '财报', '业绩预告', '业绩快报',
+    '定期报告', '一季度报告', '三季度报告', '半年度报告', '年度报告'
+]
+
+# 高重要性关键词（只对直接相关的新闻有效）
+HIGH_KEYWORDS = [
+    '重大', '处罚', '调查', '立案', '停牌', '复牌', '退市',
+    '重组', '并购', '收购', '增发', '配股', '分红', '送股',
+    '业绩', '预告', '快报',
+    '违规', '违法', '诉讼', '仲裁', '风险', '警示',
+    '董事会', '股东大会', '股权', '控股', '变更',
+    '亏损', '盈利', '扭亏', '减持', '增持', '回购'
+]
+
+# 低重要性关键词
+LOW_KEYWORDS = [
+    '广告', '推广', '营销', '宣传', '点评', '评论',
+    '讨论', '猜测', '预测', '传闻', '网友', '据说'
+]
+
+# 分类规则，按顺序匹配，第一个命中的分类生效
+CATEGORY_RULES: List[Tuple[str, List[str]]] = [
+    ("公司治理", ['董事会', '股东大会', '监事会', '高管', '任命', '辞职', '选举']),
+    ("财务报告", ['年报', '中报', '季报', '业绩', '财报', '快报', '预告']),
+    ("股权变动", ['股权', '增持', '减持', '回购', '股份', '解禁', '质押']),
+    ("重大事项", ['重组', '并购', '收购', '出售', '投资', '合作', '签约']),
+    ("监管信息", ['处罚', '调查', '立案', '违规', '问询', '关注函', '警示']),
+    ("交易提示", ['停牌', '复牌', '退市', '风险', '提示', '公告']),
+    ("经营动态", ['中标', '项目', '产品', '研发', '技术', '专利', '订单']),
+    ("市场评论", ['点评', '分析', '解读', '观点', '评论', '讨论']),
+]
+DEFAULT_CATEGORY = "其他"
+
+# 重要性判断的关键词匹配器，进程内共享，模块导入时编译一次
+MATCHER = KeywordMatcher({
+    'irrelevant': IRRELEVANT_KEYWORDS,
+    'other_company': OTHER_COMPANIES,
+    'financial_report': FINANCIAL_REPORT_KEYWORDS,
+    'high': HIGH_KEYWORDS,
+    'low': LOW_KEYWORDS
+})
+
+_IRRELEVANT = MATCHER.flags['irrelevant']
+_OTHER_COMPANY = MATCHER.flags['other_company']
+_FINANCIAL_REPORT = MATCHER.flags['financial_report']
+_HIGH = MATCHER.flags['high']
+_LOW = MATCHER.flags['low']
+
+
+@lru_cache(maxsize=65536)
+def title_flags(title: str) -> int:
+    """扫描标题得到命中的关键词组位掩码（按标题缓存，同一标题在多个来源/股票间只扫描一次）"""
+    return MATCHER.scan(title)
+
+
+def load_category_rules(path: str) -> Tuple[List[Tuple[str, List[str]]], str]:
+    """
+    从JSON配置文件读取分类规则
+    
+    配置格式（rules 的顺序即优先级，第一个命中的分类生效）:
+        {
+            "default": "其他",
+            "rules": [
+                {"category": "公司治理", "keywords": ["董事会", "股东大会"]},
+                {"category": "财务报告", "keywords": ["年报", "季报"]}
+            ]
+        }
+    
+    Args:
+        path: 配置文件路径
+    
+    Returns:
+        (分类规则列表, 默认分类)
+    
+    Raises:
+        OSError: 文件无法读取
+        ValueError: 配置格式错误
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    
+    if not isinstance(config, dict) or not isinstance(config.get('rules'), list):
+        raise ValueError(f"分类规则配置格式错误: {path} 缺少 rules 列表")
+    
+    rules = []
+    for rule in config['rules']:
+        category = rule.get('category') if isinstance(rule, dict) else None
+        keywords = rule.get('keywords') if isinstance(rule, dict) else None
+        if not isinstance(category, str) or not category or not isinstance(keywords, list):
+            raise ValueError(f"分类规则配置格式错误: {rule}")
+        rules.append((category, [str(keyword) for keyword in keywords if keyword]))
+    return rules, str(config.get('default', DEFAULT_CATEGORY))
+
+
+class CategoryClassifier:
+    """
+    消息分类器
+    
+    分类规则按优先级排列，所有关键词编译成一个 KeywordMatcher，扫描一次标题后
+    取第一个命中的分类；结果按标题缓存在有界的LRU中。
+    
+    指定配置文件时支持热更新：分类时最多每 check_interval 秒检查一次文件的修改
+    时间，文件变化后重新编译规则并清空缓存，无需重启长时间运行的采集进程。
+    新配置有误时打印错误并继续使用原规则。
+    
+    用法:
+        classifier = CategoryClassifier(config_path="category_rules.json")
+        classifier.classify("关于召开2026年第一次临时股东大会的通知")  # "公司治理"
+    """
+    
+    def __init__(
+        self,
+        rules: Optional[Sequence[Tuple[str, Iterable[str]]]] = None,
+        default: str = DEFAULT_CATEGORY,
+        config_path: Optional[str] = None,
+        cache_size: int = 65536,
+        check_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        初始化分类器
+        
+        Args:
+            rules: (分类, 关键词列表) 的有序列表，默认使用 CATEGORY_RULES
+            default: 没有命中任何规则时的分类
+            config_path: 分类规则配置文件（指定后以文件中的规则为准并支持热更新）
+            cache_size: 按标题缓存的分类结果数上限
+            check_interval: 检查配置文件是否变化的最小间隔（秒）
+            clock: 计时函数（返回秒数），默认 time.monotonic
+        
+        Raises:
+            OSError, ValueError: 配置文件无法读取或格式错误
+        """
+        self.cache_size = cache_size
+        self.check_interval = check_interval
+        self.config_path: Optional[str] = None
+        self.reloads = 0
+        
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._classify: Callable[[str], str] = self._compile(CATEGORY_RULES if rules is None else rules, default)
+        
+        if config_path:
+            self.load(config_path)
+    
+    def _compile(self, rules: Sequence[Tuple[str, Iterable[str]]], default: str) -> Callable[[str], str]:
+        """编译规则表，返回带LRU缓存的分类函数"""
+        self.rules = [(category, list(keywords)) for category, keywords in rules]
+        self.default = default
+        
+        # 同名分类合并为一组，优先级取第一次出现的位置
+        groups: Dict[str, List[str]] = {}
+        for category, keywords in self.rules:
+            groups.setdefault(category, []).extend(keywords)
+        matcher = KeywordMatcher(groups)
+        priority = list(matcher.flags.items())
+        
+        def classify(title: str) -> str:
+            mask = matcher.scan(title)
+            if mask:
+                for category, flag in priority:
+                    if mask & flag:
+                        return category
+            return default
+        
+        return lru_cache(maxsize=self.cache_size)(classify)
+    
+    def load(self, config_path: str):
+        """
+        从配置文件加载规则，之后自动跟踪文件变化
+        
+        Raises:
+            OSError, ValueError: 配置文件无法读取或格式错误
+        """
+        mtime = os.stat(config_path).st_mtime
+        rules, default = load_category_rules(config_path)
+        with self._lock:
+            self._classify = self._compile(rules, default)
+            self.config_path = config_path
+            self._mtime = mtime
+            self._next_check = self._clock() + self.check_interval
+    
+    def reload_if_changed(self) -> bool:
+        """
+        配置文件的修改时间变化时重新加载规则
+        
+        Returns:
+            是否重新加载了规则
+        """
+        if self.config_path is None:
+            return False
+        with self._lock:
+            self._next_check = self._clock() + self.check_interval
+            try:
+                mtime = os.stat(self.config_path).st_mtime
+            except OSError as e:
+                print(f"    读取分类规则配置失败，继续使用原规则: {e}")
+                return False
+            if mtime == self._mtime:
+                return False
+            self._mtime = mtime
+            try:
+                rules, default = load_category_rules(self.config_path)
+                self._classify = self._compile(rules, default)
+            except (OSError, ValueError) as e:
+                print(f"    分类规则配置有误，继续使用原规则: {e}")
+                return False
+            self.reloads += 1
+            print(f"    已重新加载分类规则: {self.config_path}（{len(self.rules)} 个分类）")
+            return True
+    
+    def classify(self, title: str) -> str:
+        """
+        判断标题的分类
+        
+        Args:
+            title: 消息标题
+        
+        Returns:
+            分类字符串
+        """
+        if self.config_path is not None and self._clock() >= self._next_check:
+            self.reload_if_changed()
+        return self._classify(title)
+    
+    def cache_clear(self):
+        """清空分类缓存"""
+        self._classify.cache_clear()
+    
+    def get_stats(self) -> Dict:
+        """获取分类器统计：分类数、缓存命中情况和重新加载次数"""
+        info = self._classify.cache_info()
+        return {
+            'categories': len(self.rules),
+            'config_path': self.config_path,
+            'reloads': self.reloads,
+            'cache_hits': info.hits,
+            'cache_misses': info.misses,
+            'cache_size': info.currsize
+        }
+
+
+# 进程内共享的分类器（BaseCollector._judge_category 使用）
+CATEGORIES = CategoryClassifier()
+
+
+def configure_categories(config_path: str):
+    """
+    让共享分类器使用配置文件中的分类规则（之后文件变化时自动热更新）
+    
+    Raises:
+        OSError, ValueError: 配置文件无法读取或格式错误
+    """
+    CATEGORIES.load(config_path)
+
+
+def judge_importance(
+    title: str,
+    stock_code: str,
+    stock_name: str = "",
+    mentions_other_issuer: Optional[bool] = None
+) -> str:
+    """
+    根据标题判断消息重要性
+    
+    规则顺序与原来逐个关键词判断的实现完全一致。
+    
+    Args:
+        title: 消息标题
+        stock_code: 股票代码
+        stock_name: 股票名称
+        mentions_other_issuer: 标题是否提到其他上市公司（由股票主数据索引判断，见 stock_master）；
+            不提供时使用内置的 OTHER_COMPANIES 列表
+    
+    Returns:
+        "高"、"中"、"低"
+    """
+    mask = title_flags(title)
+    is_directly_related = bool(stock_name and stock_name in title) or stock_code in title
+    if mentions_other_issuer is None:
+        mentions_other_issuer = bool(mask & _OTHER_COMPANY)
+    
+    # 如果标题中包含其他公司且不包含本公司，判定为不相关
+    if mentions_other_issuer and not is_directly_related:
+        return "低"
+    if mask & _IRRELEVANT:
+        return "低"
+    if mask & _FINANCIAL_REPORT:
+        return "高"
+    if is_directly_related and mask & _HIGH:
+        return "高"
+    if mask & _LOW:
+        return "低"
+    
+    # 如果不是直接相关的新闻，默认为低重要性
+    if not is_directly_related:
+        return "低"
+    return "中"
+
+
+def judge_category(title: str) -> str:
+    """
+    根据标题判断消息分类（使用共享分类器，规则按优先级第一个命中的分类生效）
+    
+    Args:
+        title: 消息标题
+    
+    Returns:
+        分类字符串
+    """
+    return CATEGORIES.classify(title)
@@ -0,0 +1,84 @@
+"""事件循环阻塞监控 - 测量定时唤醒的延迟"""
+import asyncio
+from typing import Dict, Optional
+
+
+class LoopLagMonitor:
+    """
+    事件循环延迟监控
+    
+    后台任务每隔 interval 秒睡眠一次，实际唤醒时间超出 interval 的部分即为
+    事件循环被同步代码（如HTML解析）阻塞的时间。超过 stall_threshold 的延迟
+    计为一次卡顿。
+    
+    用法:
+        async with LoopLagMonitor() as monitor:
+            await collect_stock_news(...)
+        print(monitor.get_stats())
+    """
+    
+    def __init__(self, interval: float = 0.05, stall_threshold: float = 0.1):
+        """
+        初始化监控
+        
+        Args:
+            interval: 采样间隔（秒）
+            stall_threshold: 计为卡顿的延迟阈值（秒）
+        """
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self._task: Optional[asyncio.Task] = None
+        
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.stalled_seconds = 0.0
+    
+    def record(self, lag: float):
+        """记录一次唤醒延迟（秒）"""
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag >= self.stall_threshold:
+            self.stalls += 1
+            self.stalled_seconds += lag
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - start - self.interval))
+    
+    def start(self):
+        """开始监控（需要在事件循环中调用）"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """停止监控"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def get_stats(self) -> Dict:
+        """获取监控统计：采样数、平均/最大延迟、卡顿次数和卡顿累计时间"""
+        return {
+            'samples': self.samples,
+            'mean_lag_ms': round(self.total_lag / self.samples * 1000, 2) if self.samples else 0.0,
+            'max_lag_ms': round(self.max_lag * 1000, 1),
+            'stalls': self.stalls,
+            'stalled_seconds': round(self.stalled_seconds, 3)
+        }
+    
+    async def __aenter__(self) -> 'LoopLagMonitor':
+        self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
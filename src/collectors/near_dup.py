@@ -0,0 +1,370 @@
+"""近似重复消息聚类 - 标题+正文的字符片段 MinHash 签名与 LSH 分桶，把不同来源转载的同一事件归为一组"""
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from itertools import repeat
+from operator import add, eq
+from typing import Deque, Dict, Iterable, List, Set, Tuple
+
+from .base_collector import NewsItem
+from .dedup import announcement_id, announcement_rank, announcements_conflict
+
+
+# 参与比较的正文长度（字符）：转载的差别主要在标题，正文开头足以确认是同一事件
+CONTENT_CHARS = 80
+
+# LSH 分段：标题签名分为 BANDS 段、每段 ROWS 个值（签名长度为两者之积），任一段完全相同即为候选
+BANDS = 16
+ROWS = 3
+SIGNATURE_SIZE = BANDS * ROWS
+
+# 签名估计的相似度（Jaccard）达到该值即视为同一事件
+SIMILARITY_THRESHOLD = 0.5
+
+# 只比较发布日期相差不超过该天数的消息（每月的 "回购进展公告" 等标题相同但不是同一事件）
+WINDOW_DAYS = 1
+
+# 规范化标题短于该长度的消息不参与聚类（如只有公司名的标题，相互之间都会"相似"）
+MIN_TITLE_LENGTH = 6
+
+# 选择代表消息时的重要性顺序
+IMPORTANCE_RANK = {'高': 0, '中': 1, '低': 2}
+
+Signature = Tuple[int, ...]
+
+_NON_WORD = re.compile(r'[\W_]+')
+_HASH_MIN = -(1 << 63)
+_EMPTY_BIN = (1 << 63) - 1
+
+
+def normalize_text(text: str, stock_name: str = "", stock_code: str = "") -> str:
+    """全角转半角、转小写，去掉股票名称/代码、标点和空白（所有消息都提到的公司名不参与比较）"""
+    text = unicodedata.normalize('NFKC', text).lower()
+    for word in (stock_name, stock_code):
+        if word:
+            text = text.replace(unicodedata.normalize('NFKC', word).lower(), '')
+    return _NON_WORD.sub('', text)
+
+
+@lru_cache(maxsize=None)
+def _bin_bounds(size: int) -> Tuple[int, ...]:
+    """把64位哈希空间等分为 size 个区间的下界"""
+    return tuple(_HASH_MIN + (i << 64) // size for i in range(size))
+
+
+def minhash_signature(text: str, size: int = SIGNATURE_SIZE) -> Signature:
+    """
+    单排列 MinHash 签名（one permutation hashing）
+    
+    文本切成相邻两个字符的片段（中文的词多为两个字），每个片段只哈希一次，
+    把64位哈希空间等分为 size 个区间，第 j 位取不小于第 j 个区间下界的最小哈希值：
+    区间非空时即为区间内的最小值，空区间取右侧最近非空区间的最小值（旋转补齐），
+    右侧都为空时取固定值。排序后用二分查找定位，循环都在C实现的内置函数中完成。
+    两个文本签名中相同位置相等的比例即为片段集合 Jaccard 相似度的估计；两段文本
+    合并后的签名等于各自签名逐位取最小值（merge_signatures）。
+    
+    片段哈希使用内置 hash()，只保证同一进程内一致，签名不能跨进程比较或保存。
+    
+    Args:
+        text: 规范化后的文本
+        size: 签名长度
+    
+    Returns:
+        签名（size 个有符号64位整数）
+    """
+    if len(text) < 2:
+        hashes = [hash(text)] if text else []
+    else:
+        hashes = sorted(set(map(hash, map(add, text, text[1:]))))
+    hashes.append(_EMPTY_BIN)
+    return tuple(map(hashes.__getitem__, map(bisect_left, repeat(hashes, size), _bin_bounds(size))))
+
+
+def merge_signatures(first: Signature, second: Signature) -> Signature:
+    """两段文本片段集合的并集的签名"""
+    return tuple(map(min, first, second))
+
+
+def similarity(first: Signature, second: Signature) -> float:
+    """由两个 MinHash 签名估计 Jaccard 相似度"""
+    return sum(map(eq, first, second)) / len(first) if first else 0.0
+
+
+class _DisjointSet:
+    """并查集（路径减半 + 按大小合并）"""
+    
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+    
+    def find(self, node: int) -> int:
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+    
+    def union(self, first: int, second: int) -> bool:
+        """合并两个集合，已在同一集合时返回 False"""
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        if self.size[first] < self.size[second]:
+            first, second = second, first
+        self.parent[second] = first
+        self.size[first] += self.size[second]
+        return True
+
+
+@dataclass
+class NewsCluster:
+    """同一事件的一组消息"""
+    representative: NewsItem
+    items: List[NewsItem] = field(default_factory=list)
+    
+    @property
+    def sources(self) -> List[str]:
+        """报道该事件的数据源（按出现顺序去重）"""
+        return list(dict.fromkeys(item.source for item in self.items))
+    
+    @property
+    def source_count(self) -> int:
+        """报道该事件的数据源数"""
+        return len(self.sources)
+    
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def to_dict(self) -> Dict:
+        """转换为字典（代表消息的完整内容，以及组内全部消息的来源和链接）"""
+        return {
+            'representative': self.representative.to_dict(),
+            'size': len(self.items),
+            'source_count': self.source_count,
+            'sources': self.sources,
+            'items': [
+                {'source': item.source, 'title': item.title, 'url': item.url, 'date': item.date.isoformat()}
+                for item in self.items
+            ]
+        }
+
+
+def _representative_key(item: NewsItem) -> Tuple:
+    """代表消息优先级：交易所/披露平台的原始公告、聚合平台的公告、重要性高、发布最早、正文最长"""
+    return (
+        -announcement_rank(announcement_id(item.url)),
+        IMPORTANCE_RANK.get(item.importance, len(IMPORTANCE_RANK)),
+        item.date,
+        -len(item.content or "")
+    )
+
+
+class NearDuplicateClusterer:
+    """
+    近似重复消息聚类器
+    
+    东方财富、同花顺和雪球经常以略有不同的标题转载同一条消息。每条消息的标题计算
+    MinHash 签名，签名分段后放入 LSH 桶，只有至少一段完全相同的消息才进一步比较，
+    避免两两比较。标题相似、或标题+正文开头整体相似，且发布日期相差不超过
+    window_days 天的消息用并查集合并为同一事件。同一平台上标识不同的两份公告
+    不会进入同一组（包括经由与两者都相似的转载间接合并），交易所公告和东方财富的
+    转载可以合并，标题过短的消息各自成为一个事件。
+    
+    消息按日期顺序处理，桶只保留最近 window_days 天的消息，内存与窗口内的消息数
+    成正比。相同标题的签名只计算一次，标题+正文的签名只在标题不够相似的候选对上
+    才计算。
+    
+    用法:
+        clusterer = NearDuplicateClusterer("600519", "贵州茅台")
+        clusters = clusterer.cluster(items)
+        representatives = [cluster.representative for cluster in clusters]
+    """
+    
+    def __init__(
+        self,
+        stock_code: str = "",
+        stock_name: str = "",
+        threshold: float = SIMILARITY_THRESHOLD,
+        window_days: int = WINDOW_DAYS,
+        bands: int = BANDS,
+        rows: int = ROWS
+    ):
+        """
+        初始化聚类器
+        
+        Args:
+            stock_code: 股票代码（比较前从文本中去掉）
+            stock_name: 股票名称（比较前从文本中去掉）
+            threshold: 判定为同一事件的相似度
+            window_days: 参与比较的发布日期最大间隔（天）
+            bands: LSH 分段数
+            rows: 每段的签名值个数（签名长度为 bands * rows）
+        """
+        self.stock_code = stock_code
+        self.stock_name = stock_name
+        self.threshold = threshold
+        self.window_days = max(0, window_days)
+        self.bands = max(1, bands)
+        self.rows = max(1, rows)
+        
+        self.items = 0
+        self.candidates = 0
+        self.merged = 0
+        self.seconds = 0.0
+    
+    def _band_keys(self, signature: Signature) -> List[Signature]:
+        """LSH 桶：第 band 段取签名中间隔 bands 的 rows 个值（相邻位置在短文本中常取同一个值）"""
+        bands = self.bands
+        return [signature[band::bands] for band in range(bands)]
+    
+    def _link(self, items: List[NewsItem]) -> _DisjointSet:
+        """按日期顺序把每条消息与窗口内同桶的消息比较，相似的合并"""
+        size = self.bands * self.rows
+        groups = _DisjointSet(len(items))
+        
+        # 窗口内消息的标题签名和标题+正文签名，日期移出窗口时一并释放
+        titles: Dict[int, Signature] = {}
+        full: Dict[int, Signature] = {}
+        by_text: Dict[str, Signature] = {}
+        # 并查集的根 -> 组内全部消息的公告标识（组可能跨越窗口，不随窗口释放）
+        group_announcements: Dict[int, Set[str]] = {}
+        
+        def full_signature(i: int) -> Signature:
+            """标题+正文开头的签名（第一次用到时计算）"""
+            if i not in full:
+                content = normalize_text((items[i].content or "")[:CONTENT_CHARS], self.stock_name, self.stock_code)
+                full[i] = merge_signatures(titles[i], minhash_signature(content, size)) if content else titles[i]
+            return full[i]
+        
+        def conflicting(first: int, second: int) -> bool:
+            """两组中是否有同一平台上标识不同的公告（经由第三条转载也不能合并）"""
+            known = group_announcements.get(second)
+            return bool(known) and any(
+                announcements_conflict(announcement, known) for announcement in group_announcements.get(first, ())
+            )
+        
+        def merge(first: int, second: int):
+            """合并两个组（参数为根）及其公告标识"""
+            groups.union(first, second)
+            announcements = group_announcements.pop(first, set()) | group_announcements.pop(second, set())
+            if announcements:
+                group_announcements[groups.find(first)] = announcements
+        
+        def similar(i: int, j: int) -> bool:
+            if similarity(titles[i], titles[j]) >= self.threshold:
+                return True
+            # 转载时正文常被截断或省略，两条都有正文时再比较标题+正文整体
+            if not (items[i].content and items[j].content):
+                return False
+            return similarity(full_signature(i), full_signature(j)) >= self.threshold
+        
+        # 每段一个桶字典，只包含窗口内的消息；live 按日期顺序记录窗口内的消息及其桶键
+        buckets: List[Dict[Signature, List[int]]] = [{} for _ in range(self.bands)]
+        live: Deque[Tuple[int, date, List[Signature]]] = deque()
+        for i in sorted(range(len(items)), key=lambda i: items[i].date):
+            day = items[i].date.date()
+            if live and (day - live[0][1]).days > self.window_days:
+                while live and (day - live[0][1]).days > self.window_days:
+                    j, _, keys = live.popleft()
+                    for band, key in enumerate(keys):
+                        # 桶内按日期顺序排列，移出窗口的消息总在开头
+                        bucket = buckets[band][key]
+                        if len(bucket) == 1:
+                            del buckets[band][key]
+                        else:
+                            del bucket[0]
+                    del titles[j]
+                    full.pop(j, None)
+                by_text.clear()
+            
+            text = normalize_text(items[i].title, self.stock_name, self.stock_code)
+            if len(text) < MIN_TITLE_LENGTH:
+                continue
+            if text not in by_text:
+                by_text[text] = minhash_signature(text, size)
+            titles[i] = by_text[text]
+            announcement = announcement_id(items[i].url)
+            if announcement:
+                group_announcements[i] = {announcement}
+            
+            keys = self._band_keys(titles[i])
+            compared = {i}
+            for band, key in enumerate(keys):
+                bucket = buckets[band].get(key)
+                if bucket is None:
+                    buckets[band][key] = [i]
+                    continue
+                for j in bucket:
+                    if j in compared:
+                        continue
+                    compared.add(j)
+                    root_i, root_j = groups.find(i), groups.find(j)
+                    if root_i == root_j:
+                        continue
+                    if conflicting(root_i, root_j):
+                        # 同一平台上的两份公告文件不是转载关系
+                        continue
+                    self.candidates += 1
+                    if similar(i, j):
+                        merge(root_i, root_j)
+                        self.merged += 1
+                bucket.append(i)
+            live.append((i, day, keys))
+        return groups
+    
+    def cluster(self, items: Iterable[NewsItem]) -> List[NewsCluster]:
+        """
+        把消息聚为事件
+        
+        事件的代表消息优先选择交易所/披露平台的原始公告，其次是重要性高、发布最早、
+        正文最长的消息。
+        
+        Args:
+            items: 消息列表
+        
+        Returns:
+            事件列表，按每个事件第一条消息在输入中的顺序排列；组内消息保持输入顺序
+        """
+        start = time.perf_counter()
+        items = list(items)
+        groups = self._link(items)
+        
+        members: Dict[int, List[NewsItem]] = {}
+        for i, item in enumerate(items):
+            members.setdefault(groups.find(i), []).append(item)
+        clusters = [
+            NewsCluster(
+                representative=group[0] if len(group) == 1 else min(group, key=_representative_key),
+                items=group
+            )
+            for group in members.values()
+        ]
+        
+        self.items += len(items)
+        self.seconds += time.perf_counter() - start
+        return clusters
+    
+    def get_stats(self) -> Dict:
+        """获取聚类统计：消息数、候选比较次数、合并次数、耗时和吞吐量"""
+        return {
+            'items': self.items,
+            'candidates': self.candidates,
+            'merged': self.merged,
+            'seconds': round(self.seconds, 3),
+            'items_per_second': round(self.items / self.seconds) if self.seconds else 0
+        }
+
+
+def cluster_news(
+    items: Iterable[NewsItem],
+    stock_code: str = "",
+    stock_name: str = "",
+    threshold: float = SIMILARITY_THRESHOLD
+) -> List[NewsCluster]:
+    """用默认参数聚类消息（见 NearDuplicateClusterer）"""
+    return NearDuplicateClusterer(stock_code, stock_name, threshold=threshold).cluster(items)
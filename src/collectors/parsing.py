@@ -0,0 +1,401 @@
+"""HTML解析 - 基于lxml预编译选择器的快速提取，以及把解析移出事件循环的执行器"""
+import asyncio
+import os
+import re
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from lxml import etree
+
+
+# 解析函数返回的普通记录：title/href/date_text 均为字符串（href 未补全为绝对URL）
+Record = Dict[str, str]
+
+
+def _class_contains(*words: str) -> str:
+    """class 属性（忽略大小写）包含任一关键词"""
+    lowered = "translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+    return '(' + ' or '.join(f"contains({lowered}, '{word}')" for word in words) + ')'
+
+
+def _has_class(name: str) -> str:
+    """class 属性中含有指定的类名，等价于 CSS 的 .name"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# 各数据源的XPath定义（由 _selectors 按线程预编译，对应的 parse_* 函数使用）
+SELECTOR_DEFINITIONS: Dict[str, Dict[str, str]] = {
+    'tonghuashun_stock': {
+        'sections': f"//*[self::div or self::ul][{_class_contains('news', 'notice', 'announcement', 'gglist')}]",
+        'entries': "(.//*[self::li or self::a])[position() <= 30]",
+        'link': "(.//a[@href])[1]",
+        'date': f"(.//*[self::span or self::em][{_class_contains('date', 'time')}])[1]",
+    },
+    'tonghuashun_search': {
+        'entries': f"(//*[self::li or self::div][{_class_contains('list', 'item')}])[position() <= 20]",
+        'link': "(.//a[@href])[1]",
+        'date': f"(.//*[self::span or self::time][{_class_contains('date', 'time')}])[1]",
+    },
+    'guba': {
+        'posts': f"//*[self::div or self::tr][{_class_contains('articleh', 'list-item')}]",
+        'link': "(.//a[@href])[1]",
+        'date': f"(.//*[self::span or self::td][{_class_contains('time', 'date')}])[1]",
+    },
+    'eastmoney_news': {
+        'entries': f"//*[self::div or self::li][{_class_contains('news-item', 'result-item')}]",
+        'link': "(.//a[@href])[1]",
+        'date': f"(.//*[self::span or self::time][{_class_contains('date', 'time')}])[1]",
+    },
+    'csrc': {
+        'articles': f"//*[{_has_class('article-item')}]",
+        'title': f"(.//*[{_has_class('title')}])[1]",
+        'date': f"(.//*[{_has_class('date')}])[1]",
+        'link': "(.//a)[1]",
+    },
+    'bse': {
+        'table': "(//div[@id='quotationTable'])[1]",
+        'results': f".//div[{_has_class('main-show')}]",
+        'tit_cell': f"(.//div[{_has_class('tit-cell')}])[1]",
+        'link': "(.//a[@href])[1]",
+        'title_p': f"(.//p[{_has_class('tit1')}])[1]",
+        'date': f"(.//span[{_class_contains('time')}])[1]",
+    },
+}
+
+# 元素内的文本节点（不含注释和 script/style 内容）
+_TEXT_XPATH = ".//text()[not(parent::script) and not(parent::style)]"
+
+_local = threading.local()
+
+
+def _selectors(source: str) -> Dict[str, etree.XPath]:
+    """
+    获取数据源的预编译XPath
+    
+    编译后的XPath缓存在线程本地（lxml 的 XPath 对象不能跨线程并发使用），
+    每个线程/进程只编译一次。
+    """
+    compiled = getattr(_local, 'selectors', None)
+    if compiled is None:
+        compiled = _local.selectors = {
+            name: {key: etree.XPath(expr, smart_strings=False) for key, expr in definitions.items()}
+            for name, definitions in SELECTOR_DEFINITIONS.items()
+        }
+        _local.text_xpath = etree.XPath(_TEXT_XPATH, smart_strings=False)
+    return compiled[source]
+
+
+def _parse_html(html: str) -> Optional[etree._Element]:
+    """用lxml解析HTML（空文档返回None）"""
+    if not html or not html.strip():
+        return None
+    parser = getattr(_local, 'parser', None)
+    if parser is None:
+        parser = _local.parser = etree.HTMLParser(encoding='utf-8')
+    return etree.fromstring(html.encode('utf-8'), parser)
+
+
+def _first(xpath: etree.XPath, element) -> Optional[etree._Element]:
+    found = xpath(element)
+    return found[0] if found else None
+
+
+def _text(element, strip: bool = False) -> str:
+    """
+    元素文本，strip=True 时等价于 get_text(strip=True)，否则等价于 get_text()
+    
+    需要先调用 _selectors 完成当前线程的编译。
+    """
+    strings = _local.text_xpath(element)
+    if strip:
+        return ''.join(part for part in (string.strip() for string in strings) if part)
+    return ''.join(strings)
+
+
+def parse_tonghuashun_stock_page(html: str) -> List[Record]:
+    """
+    解析同花顺个股页面的新闻/公告板块
+    
+    date_text 优先取条目中的日期元素，没有时取文本中第一个形如日期的片段。
+    """
+    records = []
+    root = _parse_html(html)
+    if root is None:
+        return records
+    selectors = _selectors('tonghuashun_stock')
+    
+    for section in selectors['sections'](root):
+        for news_elem in selectors['entries'](section):
+            link = news_elem if news_elem.tag == 'a' else _first(selectors['link'], news_elem)
+            if link is None:
+                continue
+            
+            title = _text(link, strip=True)
+            href = link.get('href', '')
+            if not title or len(title) < 5 or not href:
+                continue
+            
+            date_elem = _first(selectors['date'], news_elem)
+            if date_elem is not None:
+                date_text = _text(date_elem, strip=True)
+            else:
+                date_match = re.search(r'(\d{2}-\d{2}|\d{4}-\d{2}-\d{2})', _text(news_elem))
+                date_text = date_match.group(1) if date_match else ''
+            
+            records.append({'title': title, 'href': href, 'date_text': date_text})
+    
+    return records
+
+
+def parse_tonghuashun_search(html: str) -> List[Record]:
+    """解析同花顺资讯搜索结果"""
+    records = []
+    root = _parse_html(html)
+    if root is None:
+        return records
+    selectors = _selectors('tonghuashun_search')
+    
+    for news in selectors['entries'](root):
+        link = _first(selectors['link'], news)
+        if link is None:
+            continue
+        
+        date_elem = _first(selectors['date'], news)
+        records.append({
+            'title': _text(link, strip=True),
+            'href': link.get('href'),
+            'date_text': _text(date_elem, strip=True) if date_elem is not None else ''
+        })
+    
+    return records
+
+
+def parse_guba_list(html: str, limit: int = 30) -> Tuple[int, List[Record]]:
+    """
+    解析东方财富股吧帖子列表（只保留带日期的帖子）
+    
+    Returns:
+        (页面上的帖子总数, 前 limit 个帖子中的有效记录)
+    """
+    records = []
+    root = _parse_html(html)
+    if root is None:
+        return 0, records
+    selectors = _selectors('guba')
+    
+    posts = selectors['posts'](root)
+    for post in posts[:limit]:
+        link = _first(selectors['link'], post)
+        if link is None:
+            continue
+        
+        title = _text(link, strip=True)
+        if not title or len(title) < 5:
+            continue
+        
+        date_elem = _first(selectors['date'], post)
+        if date_elem is None:
+            continue
+        
+        records.append({
+            'title': title,
+            'href': link.get('href'),
+            'date_text': _text(date_elem, strip=True)
+        })
+    
+    return len(posts), records
+
+
+def parse_eastmoney_news_search(html: str, limit: int = 20) -> List[Record]:
+    """解析东方财富新闻搜索结果（只保留带日期的条目）"""
+    records = []
+    root = _parse_html(html)
+    if root is None:
+        return records
+    selectors = _selectors('eastmoney_news')
+    
+    for news in selectors['entries'](root)[:limit]:
+        link = _first(selectors['link'], news)
+        date_elem = _first(selectors['date'], news)
+        if link is None or date_elem is None:
+            continue
+        
+        records.append({
+            'title': _text(link, strip=True),
+            'href': link.get('href'),
+            'date_text': _text(date_elem, strip=True)
+        })
+    
+    return records
+
+
+def parse_csrc_list(html: str) -> List[Record]:
+    """解析证监会公告列表"""
+    records = []
+    root = _parse_html(html)
+    if root is None:
+        return records
+    selectors = _selectors('csrc')
+    
+    for article in selectors['articles'](root):
+        title_elem = _first(selectors['title'], article)
+        date_elem = _first(selectors['date'], article)
+        link_elem = _first(selectors['link'], article)
+        if title_elem is None or date_elem is None or link_elem is None:
+            continue
+        
+        records.append({
+            'title': _text(title_elem).strip(),
+            'href': link_elem.get('href', ''),
+            'date_text': _text(date_elem).strip()
+        })
+    
+    return records
+
+
+def parse_bse_results(html: str) -> Optional[List[Record]]:
+    """
+    解析北交所搜索结果页（#quotationTable 中的 div.main-show）
+    
+    Returns:
+        记录列表；页面中没有结果表格时返回None
+    """
+    root = _parse_html(html)
+    if root is None:
+        return None
+    selectors = _selectors('bse')
+    
+    quotation_table = _first(selectors['table'], root)
+    if quotation_table is None:
+        return None
+    
+    records = []
+    for result_div in selectors['results'](quotation_table):
+        tit_cell = _first(selectors['tit_cell'], result_div)
+        if tit_cell is None:
+            continue
+        
+        link = _first(selectors['link'], tit_cell)
+        if link is None:
+            continue
+        
+        # 标题在 p.tit1 的 title 属性中，没有时从链接文本提取并去掉末尾的日期
+        title_p = _first(selectors['title_p'], link)
+        if title_p is not None and title_p.get('title'):
+            title = title_p.get('title').strip()
+        else:
+            title = re.sub(r'\s*\d{4}[-/]\d{1,2}[-/]\d{1,2}\s*$', '', _text(link, strip=True)).strip()
+        
+        href = link.get('href', '')
+        if not title or not href:
+            continue
+        
+        date_span = _first(selectors['date'], result_div)
+        records.append({
+            'title': title,
+            'href': href,
+            'date_text': _text(date_span, strip=True) if date_span is not None else ''
+        })
+    
+    return records
+
+
+def _timed_call(func: Callable, *args) -> Tuple[Any, float]:
+    """在工作线程/进程中执行解析函数，同时返回耗时（秒）"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class ParsingExecutor:
+    """
+    HTML解析执行器
+    
+    收集器把原始HTML交给模块级解析函数（见本模块的 parse_*），在线程池或进程池中
+    执行，拿回普通记录后再在事件循环中构造 NewsItem。inline 模式直接在事件循环中
+    解析，用于对比事件循环的阻塞时间。
+    
+    - thread: 线程池，开销最小；lxml 解析文档时释放GIL，XPath提取期间事件循环可以在间隙运行
+    - process: 进程池，解析完全并行，适合批量运行；HTML和记录需要在进程间序列化
+    
+    用法:
+        async with ParsingExecutor(mode='process') as parse_executor:
+            collector = TongHuaShunCollector("600519", "贵州茅台", parse_executor=parse_executor)
+            await collector.collect(30)
+    """
+    
+    MODES = ('inline', 'thread', 'process')
+    
+    def __init__(self, mode: str = 'thread', max_workers: Optional[int] = None):
+        """
+        初始化解析执行器（线程池/进程池在第一次解析时才创建）
+        
+        Args:
+            mode: 执行方式（inline/thread/process）
+            max_workers: 工作线程/进程数（默认 CPU 核数，最多4个）
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的解析执行方式: {mode}（可选 {', '.join(self.MODES)}）")
+        self.mode = mode
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._executor: Optional[Executor] = None
+        
+        self.jobs = 0
+        self.parse_seconds = 0.0
+        self.max_parse_seconds = 0.0
+    
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='html-parse'
+                )
+        return self._executor
+    
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        执行解析函数
+        
+        Args:
+            func: 模块级解析函数（process 模式下需要可被pickle）
+            *args: 解析函数的参数
+        
+        Returns:
+            解析函数的返回值
+        """
+        if self.mode == 'inline':
+            result, elapsed = _timed_call(func, *args)
+        else:
+            loop = asyncio.get_running_loop()
+            result, elapsed = await loop.run_in_executor(self._get_executor(), _timed_call, func, *args)
+        
+        self.jobs += 1
+        self.parse_seconds += elapsed
+        self.max_parse_seconds = max(self.max_parse_seconds, elapsed)
+        return result
+    
+    def get_stats(self) -> Dict:
+        """获取解析统计：执行方式、解析次数、累计/最长解析耗时"""
+        return {
+            'mode': self.mode,
+            'jobs': self.jobs,
+            'parse_seconds': round(self.parse_seconds, 3),
+            'max_parse_ms': round(self.max_parse_seconds * 1000, 1)
+        }
+    
+    async def aclose(self):
+        """关闭线程池/进程池"""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+    
+    async def __aenter__(self) -> 'ParsingExecutor':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
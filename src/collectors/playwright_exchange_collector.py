@@ -1,20 +1,32 @@
 """使用Playwright的交易所数据采集器"""
-from datetime import datetime, timedelta
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 import asyncio
 import re
-import json
 
-from playwright.async_api import async_playwright, Page
+from playwright.async_api import Page
 
+from . import jsonp
 from .base_collector import BaseCollector, NewsItem
 
 
 class PlaywrightExchangeCollector(BaseCollector):
     """使用Playwright的交易所数据采集器"""
     
-    def __init__(self, stock_code: str, exchange: str, stock_name: str = ""):
-        super().__init__(stock_code, stock_name)
+    # 等待页面操作触发的API响应的超时时间（秒）
+    RESPONSE_TIMEOUT = 15
+    # 点击"相关公告"标签及等待其响应的超时时间（秒），标签通常已由URL参数激活
+    TAB_TIMEOUT = 2
+    
+    def __init__(
+        self,
+        stock_code: str,
+        exchange: str,
+        stock_name: str = "",
+        http_session=None,
+        browser_pool=None
+    ):
+        super().__init__(stock_code, stock_name, http_session, browser_pool)
         self.exchange = exchange.upper()
     
     def get_source_name(self) -> str:
@@ -23,7 +35,7 @@ class PlaywrightExchangeCollector(BaseCollector):
         
     async def collect(self, days: int = 365) -> List[NewsItem]:
         """采集数据"""
-        start_date = datetime.now() - timedelta(days=days)
+        start_date = self._window_start(days)
         
         if self.exchange == 'SSE':
             items = await self._collect_sse(start_date)
@@ -36,168 +48,124 @@ class PlaywrightExchangeCollector(BaseCollector):
         return items
     
     async def _collect_sse(self, start_date: datetime) -> List[NewsItem]:
-        """采集上交所数据 - 使用Playwright监听API请求"""
-        items = []
-        captured_data = []
+        """
+        采集上交所数据 - 使用Playwright监听API请求
         
-        try:
-            async with async_playwright() as p:
-                # 使用无头模式
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context()
-                page = await context.new_page()
-                
-                # 监听API响应
-                async def handle_response(response):
-                    if 'queryCompanyBulletinNew.do' in response.url:
-                        try:
-                            text = await response.text()
-                            # 提取JSONP数据
-                            match = re.search(r'jsonpCallback\w*\((.*)\)', text)
-                            if match:
-                                data = json.loads(match.group(1))
-                                result = data.get('result')
-                                if result:
-                                    # 处理不同的返回结构
-                                    if isinstance(result, list):
-                                        # 检查列表元素是否为字典
-                                        for item in result:
-                                            if isinstance(item, dict):
-                                                captured_data.append(item)
-                                            elif isinstance(item, list):
-                                                # 如果是嵌套列表，展开
-                                                captured_data.extend([i for i in item if isinstance(i, dict)])
-                                    elif isinstance(result, dict):
-                                        captured_data.append(result)
-                        except Exception as e:
-                            print(f"    解析响应失败: {e}")
-                            import traceback
-                            traceback.print_exc()
+        响应到达时即转换为新闻项，并维护已见公告ID集合和最早日期，翻页时
+        O(1) 判断是否已覆盖时间窗口；每次点击都等待对应的API响应处理完毕，
+        不再固定等待。
+        """
+        items: List[NewsItem] = []
+        seen_ids = set()
+        state = {'oldest_date': None, 'captured': 0, 'reached_known': False}
+        processed = asyncio.Event()
+        
+        # 访问页面
+        url = f"https://www.sse.com.cn/assortment/stock/list/info/company/index.shtml?COMPANY_CODE={self.stock_code}&tabActive=1"
+        
+        def consume(records: List[dict]):
+            """将一次响应中的公告转换为新闻项，更新最早日期"""
+            page_items = []
+            for record in records:
+                record_id = record.get('SSEID') or record.get('URL') or (record.get('TITLE'), record.get('SSEDATE'))
+                if record_id in seen_ids:
+                    continue
+                seen_ids.add(record_id)
+                state['captured'] += 1
                 
-                page.on('response', handle_response)
+                news_item = self._sse_item_from_record(record, url)
+                if news_item is None:
+                    continue
                 
-                # 访问页面
-                url = f"https://www.sse.com.cn/assortment/stock/list/info/company/index.shtml?COMPANY_CODE={self.stock_code}&tabActive=1"
+                oldest_date = state['oldest_date']
+                if oldest_date is None or news_item.date < oldest_date:
+                    state['oldest_date'] = news_item.date
                 
-                await page.goto(url, wait_until="networkidle", timeout=30000)
+                # 检查日期范围
+                if news_item.date >= start_date:
+                    page_items.append(news_item)
+            
+            items.extend(page_items)
+            if self._reached_watermark(page_items):
+                state['reached_known'] = True
+        
+        # 监听API响应
+        async def handle_response(response):
+            if 'queryCompanyBulletinNew.do' not in response.url:
+                return
+            try:
+                # 提取JSONP数据
+                data = jsonp.decode(await response.body())
+                consume(self._flatten_sse_result(data.get('result')))
+            except Exception as e:
+                print(f"    解析响应失败: {e}")
+            finally:
+                processed.set()
+        
+        async def act_and_wait(action, timeout: float = self.RESPONSE_TIMEOUT) -> bool:
+            """执行页面操作并等待其触发的公告API响应处理完毕"""
+            processed.clear()
+            await action()
+            try:
+                await asyncio.wait_for(processed.wait(), timeout=timeout)
+                return True
+            except asyncio.TimeoutError:
+                return False
+        
+        def window_covered() -> bool:
+            oldest_date = state['oldest_date']
+            return state['reached_known'] or (oldest_date is not None and oldest_date < start_date)
+        
+        try:
+            async with self._browser_page() as page:
+                page.on('response', handle_response)
                 
-                # 等待数据加载
-                await asyncio.sleep(2)
+                await act_and_wait(lambda: page.goto(url, wait_until="domcontentloaded", timeout=30000))
                 
-                # 尝试点击"相关公告"标签来触发更多数据加载
-                try:
-                    await page.click('a[data-id="1"]', timeout=3000)
-                    await asyncio.sleep(2)
-                except:
-                    pass  # 可能已经在该标签页
+                # 打开页面时没有收到公告数据才点击"相关公告"标签；先确认标签存在，
+                # 并使用较短的超时，避免每只股票白等点击和响应超时
+                if not state['captured']:
+                    tab = await page.query_selector('a[data-id="1"]')
+                    if tab is not None:
+                        try:
+                            await act_and_wait(
+                                lambda: tab.click(timeout=self.TAB_TIMEOUT * 1000),
+                                timeout=self.TAB_TIMEOUT
+                            )
+                        except Exception:
+                            pass  # 可能已经在该标签页
                 
                 # 翻页获取更多数据（最多获取10页）
                 max_pages = 10
                 for page_num in range(2, max_pages + 1):
+                    # 最早的公告已超出时间范围，停止翻页
+                    if window_covered():
+                        print(f"    已获取到 {start_date.strftime('%Y-%m-%d')} 之前的数据，停止翻页")
+                        break
+                    
                     try:
                         # 查找"下一页"按钮或特定页码按钮
                         # 上交所的分页通常使用 class="next" 或类似的选择器
                         next_button = await page.query_selector('.pagination .next:not(.disabled)')
                         if not next_button:
                             # 尝试查找页码链接
-                            page_link = await page.query_selector(f'.pagination a:has-text("{page_num}")')
-                            if page_link:
-                                await page_link.click()
-                            else:
+                            next_button = await page.query_selector(f'.pagination a:has-text("{page_num}")')
+                            if not next_button:
                                 print(f"    未找到第{page_num}页，停止翻页")
                                 break
-                        else:
-                            await next_button.click()
                         
                         # 等待新数据加载
-                        await asyncio.sleep(2)
+                        if not await act_and_wait(next_button.click):
+                            print(f"    第{page_num}页未返回数据，停止翻页")
+                            break
                         print(f"    已翻到第{page_num}页，继续获取...")
-                        
-                        # 检查是否已收集足够的历史数据
-                        if captured_data:
-                            # 检查最旧的数据日期
-                            oldest_date = None
-                            for item in captured_data:
-                                if isinstance(item, dict):
-                                    date_str = item.get('SSEDATE', '')
-                                    if date_str:
-                                        try:
-                                            item_date = datetime.strptime(date_str[:10], '%Y-%m-%d')
-                                            if oldest_date is None or item_date < oldest_date:
-                                                oldest_date = item_date
-                                        except:
-                                            pass
-                            
-                            # 如果最旧的数据已经超出时间范围，停止翻页
-                            if oldest_date and oldest_date < start_date:
-                                print(f"    已获取到 {start_date.strftime('%Y-%m-%d')} 之前的数据，停止翻页")
-                                break
                     
                     except Exception as e:
                         print(f"    翻页失败: {e}")
                         break
-                
-                await browser.close()
-            
-            # 处理捕获的数据
-            print(f"    上交所捕获到 {len(captured_data)} 条公告")
             
-            for item in captured_data:
-                # 确保item是字典类型
-                if not isinstance(item, dict):
-                    print(f"    跳过非字典类型数据: {type(item)}")
-                    continue
-                    
-                title = item.get('TITLE', '')
-                date_str = item.get('SSEDATE', '')  # 正确的字段名是SSEDATE
-                url_path = item.get('URL', '')
-                
-                if not title:
-                    continue
-                
-                # 解析日期
-                try:
-                    if date_str:
-                        pub_date = datetime.strptime(date_str[:10], '%Y-%m-%d')
-                    else:
-                        # 如果没有日期，尝试从URL中提取
-                        if url_path and '/2025-' in url_path or '/2024-' in url_path:
-                            match = re.search(r'/(\d{4}-\d{2}-\d{2})/', url_path)
-                            if match:
-                                pub_date = datetime.strptime(match.group(1), '%Y-%m-%d')
-                            else:
-                                pub_date = datetime.now()
-                        else:
-                            pub_date = datetime.now()
-                except Exception as e:
-                    print(f"    日期解析失败: {date_str}, {e}")
-                    pub_date = datetime.now()
-                
-                # 检查日期范围
-                if pub_date < start_date:
-                    continue
-                
-                # 构造完整URL
-                if url_path:
-                    if url_path.startswith('//'):
-                        full_url = 'https:' + url_path
-                    elif url_path.startswith('/'):
-                        full_url = 'https://www.sse.com.cn' + url_path
-                    else:
-                        full_url = url_path
-                else:
-                    full_url = url
-                
-                news_item = NewsItem(
-                    title=title,
-                    url=full_url,
-                    source="上交所",
-                    date=pub_date,
-                    importance=self._judge_importance(title),
-                    category=self._judge_category(title)
-                )
-                items.append(news_item)
-                
+            print(f"    上交所捕获到 {state['captured']} 条公告")
+        
         except Exception as e:
             print(f"    上交所数据采集失败: {e}")
             import traceback
@@ -205,16 +173,71 @@ class PlaywrightExchangeCollector(BaseCollector):
         
         return items
     
+    @staticmethod
+    def _flatten_sse_result(result) -> List[dict]:
+        """展开公告API返回的 result（可能是字典、字典列表或嵌套列表）"""
+        records = []
+        if isinstance(result, list):
+            for item in result:
+                if isinstance(item, dict):
+                    records.append(item)
+                elif isinstance(item, list):
+                    # 如果是嵌套列表，展开
+                    records.extend(i for i in item if isinstance(i, dict))
+        elif isinstance(result, dict):
+            records.append(result)
+        return records
+    
+    def _sse_item_from_record(self, record: dict, page_url: str) -> Optional[NewsItem]:
+        """将一条上交所公告记录转换为新闻项（缺少标题时返回None）"""
+        title = record.get('TITLE', '')
+        date_str = record.get('SSEDATE', '')  # 正确的字段名是SSEDATE
+        url_path = record.get('URL', '')
+        
+        if not title:
+            return None
+        
+        # 解析日期
+        try:
+            if date_str:
+                pub_date = datetime.strptime(date_str[:10], '%Y-%m-%d')
+            else:
+                # 如果没有日期，尝试从URL中提取
+                match = re.search(r'/(\d{4}-\d{2}-\d{2})/', url_path or '')
+                if match:
+                    pub_date = datetime.strptime(match.group(1), '%Y-%m-%d')
+                else:
+                    pub_date = datetime.now()
+        except Exception as e:
+            print(f"    日期解析失败: {date_str}, {e}")
+            pub_date = datetime.now()
+        
+        # 构造完整URL
+        if url_path:
+            if url_path.startswith('//'):
+                full_url = 'https:' + url_path
+            elif url_path.startswith('/'):
+                full_url = 'https://www.sse.com.cn' + url_path
+            else:
+                full_url = url_path
+        else:
+            full_url = page_url
+        
+        return NewsItem(
+            title=title,
+            url=full_url,
+            source="上交所",
+            date=pub_date,
+            importance=self._judge_importance(title),
+            category=self._judge_category(title)
+        )
+    
     async def _collect_szse(self, start_date: datetime) -> List[NewsItem]:
         """采集深交所数据"""
         items = []
         
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context()
-                page = await context.new_page()
-                
+            async with self._browser_page() as page:
                 # 深交所信息披露页面
                 url = f"http://www.szse.cn/disclosure/listed/fixed/index.html?stock={self.stock_code}"
                 
@@ -277,8 +300,6 @@ class PlaywrightExchangeCollector(BaseCollector):
                 except Exception as e:
                     print(f"    等待表格失败: {e}")
                 
-                await browser.close()
-                
         except Exception as e:
             print(f"    深交所数据采集失败: {e}")
             import traceback
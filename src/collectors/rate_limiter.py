@@ -0,0 +1,196 @@
+"""按主机的令牌桶限速器 - 支持AIMD自适应降速"""
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+
+class TokenBucket:
+    """
+    单个主机的令牌桶
+    
+    速率按AIMD调整：请求正常时加性回升（不超过配置速率），
+    遇到限流信号（403/429/5xx、空响应、连接异常）时乘性下降。
+    """
+    
+    def __init__(
+        self,
+        rate: float,
+        min_rate: float = 0.2,
+        increase_step: float = 0.2,
+        decrease_factor: float = 0.5,
+        cooldown: float = 1.0,
+        window: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        初始化令牌桶
+        
+        Args:
+            rate: 配置的每秒请求数（也是自适应回升的上限）
+            min_rate: 自适应下降的下限
+            increase_step: 每次成功请求后速率的加性增量
+            decrease_factor: 遇到限流信号时速率的乘性系数
+            cooldown: 两次降速之间的最小间隔（秒），避免同一波失败连续降速
+            window: 统计实际请求速率的滑动窗口（秒）
+            clock: 计时函数（返回秒数），默认 time.monotonic
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.window = window
+        
+        self._clock = clock
+        self._tokens = max(1.0, rate)
+        self._updated_at = clock()
+        self._last_decrease = float('-inf')
+        self._lock = asyncio.Lock()
+        self._request_times = deque()
+        
+        self.requests = 0
+        self.throttled = 0
+    
+    def _refill(self):
+        now = self._clock()
+        capacity = max(1.0, self.rate)
+        self._tokens = min(capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+    
+    async def acquire(self):
+        """等待直到获得一个令牌"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+        
+        now = self._clock()
+        self.requests += 1
+        self._request_times.append(now)
+        while self._request_times and now - self._request_times[0] > self.window:
+            self._request_times.popleft()
+    
+    def on_success(self):
+        """请求正常：加性回升"""
+        self.rate = min(self.max_rate, self.rate + self.increase_step)
+    
+    def on_throttle(self):
+        """遇到限流信号：乘性下降"""
+        self.throttled += 1
+        now = self._clock()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+    
+    def observed_rate(self) -> float:
+        """滑动窗口内的实际请求速率（次/秒）"""
+        now = self._clock()
+        while self._request_times and now - self._request_times[0] > self.window:
+            self._request_times.popleft()
+        if not self._request_times:
+            return 0.0
+        return len(self._request_times) / max(1.0, now - self._request_times[0])
+
+
+class HostRateLimiter:
+    """
+    按主机的限速器
+    
+    每个主机一个令牌桶，速率可按主机配置；未配置的主机使用默认速率。
+    """
+    
+    # 主要数据源的默认速率（次/秒），偏保守以降低被封风险
+    DEFAULT_RATES = {
+        'query.sse.com.cn': 4.0,
+        'www.sse.com.cn': 4.0,
+        'www.szse.cn': 4.0,
+        'search-api-web.eastmoney.com': 6.0,
+        'guba.eastmoney.com': 3.0,
+        'so.eastmoney.com': 3.0,
+        'www.bse.cn': 3.0,
+        'stockpage.10jqka.com.cn': 3.0,
+        'news.10jqka.com.cn': 3.0,
+        'xueqiu.com': 2.0,
+        'stock.xueqiu.com': 2.0,
+        'www.csrc.gov.cn': 2.0,
+    }
+    
+    # 视为限流信号的状态码（另外所有5xx都视为限流信号）
+    THROTTLE_STATUS = {403, 429}
+    
+    def __init__(
+        self,
+        rates: Optional[Dict[str, float]] = None,
+        default_rate: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        初始化限速器
+        
+        Args:
+            rates: 按主机覆盖的速率（次/秒），与默认配置合并
+            default_rate: 未配置主机的默认速率
+            clock: 令牌桶使用的计时函数，默认 time.monotonic
+        """
+        self.rates = dict(self.DEFAULT_RATES)
+        if rates:
+            self.rates.update(rates)
+        self.default_rate = default_rate
+        self._clock = clock
+        self._buckets: Dict[str, TokenBucket] = {}
+    
+    def bucket(self, host: str) -> TokenBucket:
+        """获取主机对应的令牌桶（首次使用时创建）"""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(self.rates.get(host, self.default_rate), clock=self._clock)
+            self._buckets[host] = bucket
+        return bucket
+    
+    async def acquire(self, host: str):
+        """等待主机的发送许可"""
+        await self.bucket(host).acquire()
+    
+    def record(self, host: str, status_code: Optional[int], body_size: Optional[int] = None):
+        """
+        记录一次请求结果并调整速率
+        
+        Args:
+            host: 主机名
+            status_code: HTTP状态码，连接异常时为None
+            body_size: 响应体字节数（未知时为None）
+        """
+        bucket = self.bucket(host)
+        if (
+            status_code is None
+            or status_code in self.THROTTLE_STATUS
+            or status_code >= 500
+            or (status_code == 200 and body_size == 0)
+        ):
+            bucket.on_throttle()
+        else:
+            bucket.on_success()
+    
+    def get_stats(self) -> Dict[str, Dict]:
+        """
+        获取各主机的限速统计
+        
+        Returns:
+            主机为键的统计字典：配置速率、当前速率、实际速率、请求数、限流次数
+        """
+        return {
+            host: {
+                'configured_rate': bucket.max_rate,
+                'current_rate': round(bucket.rate, 2),
+                'observed_rate': round(bucket.observed_rate(), 2),
+                'requests': bucket.requests,
+                'throttled': bucket.throttled
+            }
+            for host, bucket in sorted(self._buckets.items())
+        }
@@ -0,0 +1,212 @@
+"""请求容错层 - 抖动重试与按主机熔断"""
+import asyncio
+import random
+import time
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+
+
+# 请求扩展字段：extensions={RETRY_EXTENSION: True} 让非幂等方法的请求（如只读查询用的POST）
+# 也参与重试，False 则禁止重试
+RETRY_EXTENSION = 'retry'
+
+
+class CircuitOpenError(httpx.TransportError):
+    """主机熔断期间直接拒绝请求"""
+
+
+class RetryPolicy:
+    """
+    带全抖动（full jitter）的指数退避重试策略
+    
+    默认只重试幂等方法（GET/HEAD/OPTIONS），POST 等请求重发可能产生重复的副作用
+    （如重复调用大模型接口），需要通过 retry_methods 或请求扩展 RETRY_EXTENSION 显式开启。
+    """
+    
+    # 视为临时错误、值得重试的状态码
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+    # 计入主机熔断的失败状态码：临时错误，以及反爬拦截（403，重试无益但说明主机在拒绝访问）
+    FAILURE_STATUS = RETRY_STATUS | {403}
+    # 默认允许重试的请求方法
+    RETRY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+    
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        retry_methods: Optional[Iterable[str]] = None
+    ):
+        """
+        初始化重试策略
+        
+        Args:
+            max_attempts: 最多尝试次数（含首次请求）
+            base_delay: 退避基准时间（秒）
+            max_delay: 单次退避的上限（秒）
+            retry_methods: 允许重试的请求方法（默认 RETRY_METHODS）
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_methods = frozenset(
+            method.upper() for method in retry_methods
+        ) if retry_methods is not None else self.RETRY_METHODS
+    
+    def can_retry(self, request: httpx.Request) -> bool:
+        """请求是否允许重试（请求扩展 RETRY_EXTENSION 优先于请求方法）"""
+        retry = request.extensions.get(RETRY_EXTENSION)
+        if retry is not None:
+            return bool(retry)
+        return request.method in self.retry_methods
+    
+    def should_retry(self, status_code: int) -> bool:
+        """状态码是否值得重试"""
+        return status_code in self.RETRY_STATUS
+    
+    def is_failure(self, status_code: int) -> bool:
+        """状态码是否计入主机熔断"""
+        return status_code in self.FAILURE_STATUS
+    
+    def delay(self, attempt: int) -> float:
+        """第 attempt 次失败（从1开始）之后的等待时间"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """
+    单个主机的熔断器
+    
+    连续失败达到阈值后进入打开状态，期间所有请求立即失败；
+    冷却时间过后放行一个试探请求（半开），成功则关闭，失败则重新打开。
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        """
+        初始化熔断器
+        
+        Args:
+            failure_threshold: 触发熔断的连续失败次数
+            reset_timeout: 打开状态持续的时间（秒）
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+    
+    @property
+    def state(self) -> str:
+        """当前状态：closed / open / half_open"""
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+    
+    def allow_request(self) -> bool:
+        """是否允许发出请求（半开状态下只放行一个试探请求）"""
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half_open' and not self._probing:
+            self._probing = True
+            return True
+        return False
+    
+    def release_probe(self):
+        """试探请求被取消时释放半开名额"""
+        self._probing = False
+    
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+    
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """
+    在底层传输之上增加抖动重试和按主机熔断的传输层
+    
+    只有 retry_policy 允许重试的请求才会重发；不论是否重试，连接错误、临时错误和
+    403 都计入熔断。
+    """
+    
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        retry_policy: Optional[RetryPolicy] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0
+    ):
+        """
+        初始化传输层
+        
+        Args:
+            transport: 实际发送请求的底层传输
+            retry_policy: 重试策略（默认最多3次）
+            failure_threshold: 主机熔断的连续失败阈值
+            reset_timeout: 主机熔断的冷却时间（秒）
+        """
+        self._transport = transport
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+    
+    def breaker(self, host: str) -> CircuitBreaker:
+        """获取主机对应的熔断器"""
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self.breakers[host] = breaker
+        return breaker
+    
+    def open_hosts(self) -> List[str]:
+        """当前处于熔断状态的主机"""
+        return sorted(host for host, breaker in self.breakers.items() if breaker.state == 'open')
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        breaker = self.breaker(host)
+        max_attempts = self.retry_policy.max_attempts if self.retry_policy.can_retry(request) else 1
+        attempt = 0
+        
+        while True:
+            if not breaker.allow_request():
+                raise CircuitOpenError(f"{host} 已熔断，跳过请求", request=request)
+            
+            attempt += 1
+            try:
+                response = await self._transport.handle_async_request(request)
+            except asyncio.CancelledError:
+                breaker.release_probe()
+                raise
+            except httpx.TransportError:
+                breaker.record_failure()
+                if attempt >= max_attempts:
+                    raise
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+                continue
+            
+            if not self.retry_policy.is_failure(response.status_code):
+                breaker.record_success()
+                return response
+            
+            breaker.record_failure()
+            if attempt >= max_attempts or not self.retry_policy.should_retry(response.status_code):
+                return response
+            
+            # 丢弃本次响应，退避后重试
+            await response.aclose()
+            await asyncio.sleep(self.retry_policy.delay(attempt))
+    
+    async def aclose(self):
+        await self._transport.aclose()
@@ -1,22 +1,33 @@
 """上交所API数据采集器 - 直接调用API支持分页"""
-from datetime import datetime, timedelta
-from typing import List
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
 import httpx
-import json
+import math
 import re
 
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from src.collectors import jsonp
 from src.collectors.base_collector import BaseCollector, NewsItem
 
 
 class SSEAPICollector(BaseCollector):
     """上交所API数据采集器 - 支持分页"""
     
-    def __init__(self, stock_code: str, stock_name: str = ""):
-        super().__init__(stock_code, stock_name)
+    # 首页之后并发请求的页数上限
+    PAGE_CONCURRENCY = 5
+    
+    def __init__(
+        self,
+        stock_code: str,
+        stock_name: str = "",
+        http_session=None,
+        page_concurrency: int = PAGE_CONCURRENCY
+    ):
+        super().__init__(stock_code, stock_name, http_session)
+        self.page_concurrency = page_concurrency
     
     def get_source_name(self) -> str:
         """获取数据源名称"""
@@ -24,42 +35,70 @@ class SSEAPICollector(BaseCollector):
     
     async def collect(self, days: int = 365) -> List[NewsItem]:
         """采集数据"""
-        start_date = datetime.now() - timedelta(days=days)
-        items = []
+        return await self._collect_from_pages(days)
+    
+    async def collect_pages(self, days: int = 365) -> AsyncIterator[List[NewsItem]]:
+        """逐页采集数据：首页确定总页数后，剩余页按批次并发获取并逐页产出"""
+        start_date = self._window_start(days)
+        self.errors = []
+        fetched_pages = 0
+        total_items = 0
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # 分页获取数据
+            async with self._http_client() as client:
                 page_size = 50
                 max_pages = 20  # 最多获取20页
                 
-                for page_no in range(1, max_pages + 1):
-                    page_items = await self._collect_page(
-                        client,
-                        start_date,
-                        page_no,
-                        page_size
-                    )
-                    
-                    if not page_items:
-                        break  # 没有更多数据
-                    
-                    items.extend(page_items)
-                    
-                    # 检查是否所有数据都早于起始日期
-                    if all(item.date < start_date for item in page_items):
-                        print(f"    已获取到所需时间范围的数据，停止翻页")
-                        break
+                # 首页返回总数，据此确定剩余页数
+                page_items, total, newest_date = await self._collect_page(
+                    client,
+                    start_date,
+                    1,
+                    page_size
+                )
+                fetched_pages = 1
+                total_items += len(page_items)
+                yield page_items
+                
+                last_page = min(max_pages, math.ceil(total / page_size))
+                
+                # 首页已到达时间边界，或增量采集时首页已出现采集过的公告，则无需翻页
+                if (
+                    last_page > 1
+                    and not self._is_exhausted(newest_date, start_date)
+                    and not self._reached_watermark(page_items)
+                ):
+                    async def fetch_page(page_no: int):
+                        # 单页失败只记录错误，不当作"没有更多数据"而停止翻页
+                        try:
+                            return await self._collect_page(client, start_date, page_no, page_size)
+                        except Exception as e:
+                            self._record_error(f"第 {page_no} 页获取失败", e)
+                            return None
                     
-                    print(f"    已获取第 {page_no} 页，共 {len(items)} 条")
+                    # 剩余页按批次并发获取，某页最新一条已早于起始日期或出现已采集公告时停止
+                    async for page in self._iter_pages(
+                        fetch_page,
+                        range(2, last_page + 1),
+                        self.page_concurrency,
+                        should_stop=lambda page: page is not None and (
+                            self._is_exhausted(page[2], start_date) or self._reached_watermark(page[0])
+                        )
+                    ):
+                        fetched_pages += 1
+                        if page is not None:
+                            total_items += len(page[0])
+                            yield page[0]
         
         except Exception as e:
-            print(f"    上交所数据采集失败: {e}")
-            import traceback
-            traceback.print_exc()
+            self._record_error("上交所数据采集失败", e)
         
-        self.news_items = items
-        return items
+        print(f"    已获取 {fetched_pages} 页，共 {total_items} 条")
+    
+    @staticmethod
+    def _is_exhausted(newest_date: Optional[datetime], start_date: datetime) -> bool:
+        """判断某页之后是否已无所需时间范围内的数据（空页或最新一条早于起始日期）"""
+        return newest_date is None or newest_date < start_date
     
     async def _collect_page(
         self,
@@ -67,124 +106,127 @@ class SSEAPICollector(BaseCollector):
         start_date: datetime,
         page_no: int,
         page_size: int
-    ) -> List[NewsItem]:
-        """采集单页数据"""
-        items = []
+    ) -> Tuple[List[NewsItem], int, Optional[datetime]]:
+        """
+        采集单页数据
         
-        try:
-            url = 'http://query.sse.com.cn/security/stock/queryCompanyBulletinNew.do'
+        Returns:
+            (时间范围内的新闻列表, 公告总数, 本页最新一条的日期)，空页时日期为None
             
-            params = {
-                'jsonCallBack': f'jsonpCallback{page_no}',
-                'isPagination': 'true',
-                'pageHelp.pageSize': str(page_size),
-                'pageHelp.cacheSize': '1',
-                'pageHelp.pageNo': str(page_no),
-                'pageHelp.beginPage': str(page_no),
-                'pageHelp.endPage': str(page_no + 5),
-                'START_DATE': '',
-                'END_DATE': '',
-                'SECURITY_CODE': self.stock_code,
-                'TITLE': '',
-                'BULLETIN_TYPE': '',
-                '_': str(int(datetime.now().timestamp() * 1000))
-            }
+        Raises:
+            httpx.HTTPError: 请求失败（已由共享会话重试）
+            ValueError: 响应无法解析
+        """
+        items = []
+        total = 0
+        newest_date = None
+        
+        url = 'http://query.sse.com.cn/security/stock/queryCompanyBulletinNew.do'
+        
+        params = {
+            'jsonCallBack': f'jsonpCallback{page_no}',
+            'isPagination': 'true',
+            'pageHelp.pageSize': str(page_size),
+            'pageHelp.cacheSize': '1',
+            'pageHelp.pageNo': str(page_no),
+            'pageHelp.beginPage': str(page_no),
+            'pageHelp.endPage': str(page_no + 5),
+            'START_DATE': '',
+            'END_DATE': '',
+            'SECURITY_CODE': self.stock_code,
+            'TITLE': '',
+            'BULLETIN_TYPE': '',
+            '_': str(int(datetime.now().timestamp() * 1000))
+        }
+        
+        headers = {
+            'Referer': 'http://www.sse.com.cn/',
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        }
+        
+        # 请求失败直接抛出，由调用方记录，避免被误判为"没有更多数据"
+        async with client.stream('GET', url, params=params, headers=headers) as response:
+            response.raise_for_status()
+            # 响应体边接收边缓存，接收完直接在字节上去掉JSONP包装并解析
+            data = await jsonp.decode_stream(response.aiter_bytes(), response.charset_encoding)
+        
+        if response.status_code == 200:
+            # 提取结果 - 数据在pageHelp.data中，是嵌套数组
+            page_help = data.get('pageHelp', {})
+            data_list = page_help.get('data', [])
             
-            headers = {
-                'Referer': 'http://www.sse.com.cn/',
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
+            # data是二维数组，每个元素又是一个数组
+            result = []
+            if data_list and isinstance(data_list, list):
+                for item in data_list:
+                    if isinstance(item, list):
+                        result.extend(item)
+                    else:
+                        result.append(item)
             
-            response = await client.get(url, params=params, headers=headers)
+            total = int(page_help.get('total') or 0)
+            if page_no == 1:
+                print(f"    上交所搜索到 {total} 条相关公告")
             
-            if response.status_code == 200:
-                # 移除JSONP包装
-                text = response.text
-                if 'jsonpCallback' in text:
-                    match = re.search(r'jsonpCallback\w*\((.*)\)', text)
-                    if match:
-                        data = json.loads(match.group(1))
+            for item_data in result:
+                try:
+                    if not isinstance(item_data, dict):
+                        continue
+                    
+                    title = item_data.get('TITLE', '')
+                    date_str = item_data.get('SSEDATE', '')
+                    url_path = item_data.get('URL', '')
+                    
+                    if not title:
+                        continue
+                    
+                    # 解析日期
+                    if date_str:
+                        try:
+                            pub_date = datetime.strptime(date_str[:10], '%Y-%m-%d')
+                        except:
+                            pub_date = datetime.now()
                     else:
-                        return items
-                else:
-                    data = response.json()
-                
-                # 提取结果 - 数据在pageHelp.data中，是嵌套数组
-                page_help = data.get('pageHelp', {})
-                data_list = page_help.get('data', [])
-                
-                # data是二维数组，每个元素又是一个数组
-                result = []
-                if data_list and isinstance(data_list, list):
-                    for item in data_list:
-                        if isinstance(item, list):
-                            result.extend(item)
-                        else:
-                            result.append(item)
-                
-                if page_no == 1:
-                    total = page_help.get('total', 0)
-                    print(f"    上交所搜索到 {total} 条相关公告")
-                
-                for item_data in result:
-                    try:
-                        if not isinstance(item_data, dict):
-                            continue
-                        
-                        title = item_data.get('TITLE', '')
-                        date_str = item_data.get('SSEDATE', '')
-                        url_path = item_data.get('URL', '')
-                        
-                        if not title:
-                            continue
-                        
-                        # 解析日期
-                        if date_str:
-                            try:
-                                pub_date = datetime.strptime(date_str[:10], '%Y-%m-%d')
-                            except:
-                                pub_date = datetime.now()
-                        else:
-                            # 尝试从URL提取日期
-                            if url_path and ('/2025-' in url_path or '/2024-' in url_path):
-                                match = re.search(r'/(\d{4}-\d{2}-\d{2})/', url_path)
-                                if match:
-                                    pub_date = datetime.strptime(match.group(1), '%Y-%m-%d')
-                                else:
-                                    pub_date = datetime.now()
+                        # 尝试从URL提取日期
+                        if url_path and ('/2025-' in url_path or '/2024-' in url_path):
+                            match = re.search(r'/(\d{4}-\d{2}-\d{2})/', url_path)
+                            if match:
+                                pub_date = datetime.strptime(match.group(1), '%Y-%m-%d')
                             else:
                                 pub_date = datetime.now()
-                        
-                        # 检查日期范围 - 只过滤太旧的数据
-                        if pub_date < start_date:
-                            continue
-                        
-                        # 构造完整URL
-                        if url_path.startswith('//'):
-                            full_url = 'https:' + url_path
-                        elif url_path.startswith('/'):
-                            full_url = 'https://www.sse.com.cn' + url_path
                         else:
-                            full_url = url_path
-                        
-                        news_item = NewsItem(
-                            title=title,
-                            url=full_url,
-                            source="上交所",
-                            date=pub_date,
-                            importance=self._judge_importance(title),
-                            category=self._judge_category(title)
-                        )
-                        items.append(news_item)
+                            pub_date = datetime.now()
+                    
+                    if newest_date is None or pub_date > newest_date:
+                        newest_date = pub_date
                     
-                    except Exception as e:
-                        print(f"    解析单条数据失败: {e}")
+                    # 检查日期范围 - 只过滤太旧的数据
+                    if pub_date < start_date:
                         continue
+                    
+                    # 构造完整URL
+                    if url_path.startswith('//'):
+                        full_url = 'https:' + url_path
+                    elif url_path.startswith('/'):
+                        full_url = 'https://www.sse.com.cn' + url_path
+                    else:
+                        full_url = url_path
+                    
+                    news_item = NewsItem(
+                        title=title,
+                        url=full_url,
+                        source="上交所",
+                        date=pub_date,
+                        importance=self._judge_importance(title),
+                        category=self._judge_category(title)
+                    )
+                    items.append(news_item)
+                
+                except Exception as e:
+                    print(f"    解析单条数据失败: {e}")
+                    continue
         
-        except Exception as e:
-            print(f"    获取第 {page_no} 页失败: {e}")
-        
-        return items
+        return items, total, newest_date
 
 
 # 测试函数
@@ -0,0 +1,295 @@
+"""股票主数据 - 代码、名称、简称和交易所，以及在标题中查找上市公司的实体索引"""
+import csv
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+
+from . import jsonp
+from .keyword_matcher import EntityIndex
+
+
+# 默认的股票主数据文件（可用 --update-stock-master 从东方财富下载）
+DEFAULT_PATH = Path(__file__).resolve().parents[2] / 'data' / 'stock_master.csv'
+
+# 没有股票主数据文件时使用的公司名称（原来写在同花顺收集器中的生物医药公司列表），
+# 只用于同花顺的相关性过滤；重要性判断仍使用 keyword_matcher.OTHER_COMPANIES 中原有的11家公司
+FALLBACK_NAMES = [
+    '瑞博生物', '药明生物', '药明康德', '信达生物', '科伦博泰', '百济神州',
+    '恒瑞医药', '复星医药', '石药集团', '君实生物', '康方生物',
+    '三生制药', '和黄医药', '基石药业', '再鼎医药', '天境生物',
+    '亚盛医药', '贝达药业', '歌礼制药', '前沿生物', '艾力斯',
+    '泽璟制药', '诺诚健华', '康宁杰瑞', '迈威生物', '神州细胞',
+    '华领医药', '开拓药业', '盟科医药', '永泰生物', '传奇生物',
+    '安龙生物', '沃森生物', '智飞生物', '康希诺'
+]
+
+# 东方财富行情列表接口：沪深京A股
+CLIST_URL = "https://push2.eastmoney.com/api/qt/clist/get"
+CLIST_MARKETS = "m:0+t:6,m:0+t:80,m:1+t:2,m:1+t:23,m:0+t:81+s:2048"
+
+CSV_FIELDS = ['code', 'name', 'exchange', 'aliases']
+
+
+def exchange_of(code: str) -> str:
+    """按代码前缀判断交易所（SH/SZ/BJ），无法判断时返回空字符串"""
+    if code.startswith(('60', '68', '90')):
+        return 'SH'
+    if code.startswith(('00', '30', '20')):
+        return 'SZ'
+    if code.startswith(('43', '83', '87', '88', '92')):
+        return 'BJ'
+    return ''
+
+
+def name_aliases(name: str) -> List[str]:
+    """
+    由证券简称生成常见写法
+    
+    去掉空格、全角字母数字转半角（"万  科Ａ" -> "万科A"），去掉 ST/*ST 等风险警示前缀，
+    以及 A/B 股后缀（"万科A" -> "万科"）。
+    """
+    normalized = unicodedata.normalize('NFKC', name).replace(' ', '')
+    aliases = [normalized]
+    base = normalized
+    for prefix in ('S*ST', '*ST', 'SST', 'ST'):
+        if base.upper().startswith(prefix) and len(base) - len(prefix) >= 2:
+            base = base[len(prefix):]
+            aliases.append(base)
+            break
+    if base[-1:] in ('A', 'B') and len(base) >= 3:
+        aliases.append(base[:-1])
+    return [alias for i, alias in enumerate(aliases) if alias and alias not in aliases[:i] and alias != name]
+
+
+@dataclass
+class Issuer:
+    """上市公司"""
+    code: str
+    name: str
+    exchange: str = ""
+    aliases: List[str] = field(default_factory=list)
+    
+    @property
+    def key(self) -> str:
+        """索引中的实体标识：股票代码，没有代码时为名称"""
+        return self.code or self.name
+    
+    def names(self) -> List[str]:
+        """在标题中可能出现的全部写法：简称、别名和股票代码"""
+        names = [self.name] + self.aliases
+        if self.code:
+            names.append(self.code)
+        return names
+
+
+class StockMaster:
+    """
+    股票主数据
+    
+    保存股票代码到名称/简称/交易所的映射，并编译成 EntityIndex，一次扫描标题
+    即可找出提到的全部上市公司。
+    
+    文件为UTF-8 CSV，列为 code,name,exchange,aliases（aliases 用 | 分隔，可手工补充
+    常用简称，如 "茅台"）。
+    
+    用法:
+        master = StockMaster.load("data/stock_master.csv")
+        master.other_issuers("贵州茅台与五粮液同日公告", "600519", "贵州茅台")  # ['000858']
+    """
+    
+    def __init__(self, issuers: Iterable[Issuer], path: Optional[str] = None):
+        """
+        初始化并编译实体索引
+        
+        Args:
+            issuers: 上市公司列表
+            path: 加载来源文件（可选）
+        """
+        self.path = path
+        self.is_fallback = False
+        self.issuers: Dict[str, Issuer] = {}
+        for issuer in issuers:
+            self.issuers.setdefault(issuer.key, issuer)
+        self.index = EntityIndex({key: issuer.names() for key, issuer in self.issuers.items()})
+    
+    @classmethod
+    def load(cls, path: str) -> 'StockMaster':
+        """
+        从CSV文件加载
+        
+        Raises:
+            OSError: 文件无法读取
+            ValueError: 缺少 code/name 列
+        """
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or not {'code', 'name'} <= set(reader.fieldnames):
+                raise ValueError(f"股票主数据文件格式错误: {path} 需要 code 和 name 列")
+            issuers = []
+            for row in reader:
+                code = (row.get('code') or '').strip()
+                name = (row.get('name') or '').strip()
+                if not name:
+                    continue
+                aliases = [alias.strip() for alias in (row.get('aliases') or '').split('|') if alias.strip()]
+                issuers.append(Issuer(
+                    code=code,
+                    name=name,
+                    exchange=(row.get('exchange') or '').strip() or exchange_of(code),
+                    aliases=aliases
+                ))
+        return cls(issuers, path)
+    
+    @classmethod
+    def fallback(cls) -> 'StockMaster':
+        """没有股票主数据文件时使用的内置公司列表（只有名称）"""
+        master = cls(Issuer(code='', name=name) for name in FALLBACK_NAMES)
+        master.is_fallback = True
+        return master
+    
+    def save(self, path: str):
+        """保存为CSV文件"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for issuer in self.issuers.values():
+                writer.writerow({
+                    'code': issuer.code,
+                    'name': issuer.name,
+                    'exchange': issuer.exchange,
+                    'aliases': '|'.join(issuer.aliases)
+                })
+    
+    def get(self, code: str) -> Optional[Issuer]:
+        """按股票代码查找"""
+        return self.issuers.get(code)
+    
+    def mentioned(self, title: str) -> List[str]:
+        """标题中提到的全部上市公司（实体标识列表，按出现顺序）"""
+        return self.index.find_keys(title)
+    
+    def other_issuers(self, title: str, stock_code: str, stock_name: str = "") -> List[str]:
+        """
+        标题中提到的本公司以外的上市公司
+        
+        Args:
+            title: 消息标题
+            stock_code: 本公司股票代码
+            stock_name: 本公司名称
+        
+        Returns:
+            实体标识列表（股票代码，主数据中没有代码时为名称）
+        """
+        own = {stock_code, stock_name}
+        issuer = self.issuers.get(stock_code)
+        if issuer is not None:
+            own.update(issuer.names())
+        return [key for key in self.index.find_keys(title) if key not in own]
+    
+    def mentions_other_issuer(self, title: str, stock_code: str, stock_name: str = "") -> Optional[bool]:
+        """
+        重要性判断用的"提到其他公司"信号（judge_importance 的 mentions_other_issuer 参数）
+        
+        使用内置公司列表时返回 None，由 judge_importance 按原来的 OTHER_COMPANIES 判断，
+        避免没有主数据文件时重要性结果与原来不同。
+        """
+        if self.is_fallback:
+            return None
+        return bool(self.other_issuers(title, stock_code, stock_name))
+    
+    def leading_issuer(self, title: str) -> Optional[str]:
+        """标题开头提到的上市公司（标题以公司名开头时返回其实体标识）"""
+        for start, _, key in self.index.find(title):
+            if start == 0:
+                return key
+            break
+        return None
+
+
+async def fetch_stock_master(client: httpx.AsyncClient, page_size: int = 100) -> StockMaster:
+    """
+    从东方财富行情列表下载沪深京A股的代码和简称
+    
+    Args:
+        client: HTTP客户端
+        page_size: 每页条数
+    
+    Returns:
+        股票主数据
+    
+    Raises:
+        httpx.HTTPError: 请求失败
+        ValueError: 响应格式错误
+    """
+    issuers = []
+    page = 1
+    while True:
+        response = await client.get(CLIST_URL, params={
+            'pn': page,
+            'pz': page_size,
+            'po': 1,
+            'np': 1,
+            'fltt': 2,
+            'invt': 2,
+            'fid': 'f12',
+            'fs': CLIST_MARKETS,
+            'fields': 'f12,f14'
+        })
+        response.raise_for_status()
+        data = (jsonp.decode(response.content, response.charset_encoding) or {}).get('data') or {}
+        rows = data.get('diff') or []
+        if isinstance(rows, dict):
+            rows = list(rows.values())
+        for row in rows:
+            code = str(row.get('f12') or '').strip()
+            name = str(row.get('f14') or '').strip()
+            if code and name:
+                issuers.append(Issuer(code=code, name=name, exchange=exchange_of(code), aliases=name_aliases(name)))
+        
+        if not rows or len(issuers) >= int(data.get('total') or 0):
+            break
+        page += 1
+    
+    if not issuers:
+        raise ValueError("股票列表为空")
+    return StockMaster(issuers)
+
+
+_shared: Optional[StockMaster] = None
+_shared_lock = threading.Lock()
+
+
+def get_stock_master() -> StockMaster:
+    """
+    进程内共享的股票主数据（第一次使用时加载一次）
+    
+    默认文件 DEFAULT_PATH 存在时从文件加载，否则使用内置的公司列表。
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                try:
+                    _shared = StockMaster.load(str(DEFAULT_PATH)) if DEFAULT_PATH.exists() else StockMaster.fallback()
+                except (OSError, ValueError) as e:
+                    print(f"    加载股票主数据失败，使用内置公司列表: {e}")
+                    _shared = StockMaster.fallback()
+    return _shared
+
+
+def configure_stock_master(path: str):
+    """
+    让共享股票主数据使用指定文件
+    
+    Raises:
+        OSError, ValueError: 文件无法读取或格式错误
+    """
+    global _shared
+    master = StockMaster.load(path)
+    with _shared_lock:
+        _shared = master
@@ -1,8 +1,8 @@
 """深交所数据采集器 - 使用官方API"""
 from datetime import datetime, timedelta
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
 import httpx
-import json
+import math
 import sys
 from pathlib import Path
 
@@ -10,13 +10,36 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.collectors.base_collector import BaseCollector, NewsItem
+from src.collectors.resilience import RETRY_EXTENSION
 
 
 class SZSEAPICollector(BaseCollector):
-    """深交所API数据采集器"""
+    """深交所API数据采集器 - 按日期分片并发回溯"""
     
-    def __init__(self, stock_code: str, stock_name: str = ""):
-        super().__init__(stock_code, stock_name)
+    ANN_LIST_URL = "https://www.szse.cn/api/disc/announcement/annList"
+    DOWNLOAD_URL = "https://disc.static.szse.cn/download"
+    
+    # 每个日期分片覆盖的天数
+    SLICE_DAYS = 90
+    # 同时查询的分片数
+    SLICE_CONCURRENCY = 4
+    # 单个分片内并发请求的页数
+    PAGE_CONCURRENCY = 3
+    # 每页条数和单个分片最多获取的页数，分片内公告超过两者乘积时继续拆分分片
+    PAGE_SIZE = 50
+    MAX_PAGES = 20
+    
+    def __init__(
+        self,
+        stock_code: str,
+        stock_name: str = "",
+        http_session=None,
+        slice_days: int = SLICE_DAYS,
+        slice_concurrency: int = SLICE_CONCURRENCY
+    ):
+        super().__init__(stock_code, stock_name, http_session)
+        self.slice_days = slice_days
+        self.slice_concurrency = slice_concurrency
     
     def get_source_name(self) -> str:
         """获取数据源名称"""
@@ -24,144 +47,250 @@ class SZSEAPICollector(BaseCollector):
     
     async def collect(self, days: int = 365) -> List[NewsItem]:
         """采集数据"""
-        start_date = datetime.now() - timedelta(days=days)
-        items = []
+        return await self._collect_from_pages(days)
+    
+    async def collect_pages(self, days: int = 365) -> AsyncIterator[List[NewsItem]]:
+        """按日期分片逐批采集数据，每个分片完成后产出该分片的公告"""
+        end_date = datetime.now()
+        start_date = self._window_start(days)
+        self.errors = []
+        total_items = 0
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # 使用分页获取更多数据
-                page_size = 50
-                current_page = 1
-                max_pages = 10  # 最多获取10页
+            async with self._http_client() as client:
+                # 将时间窗口切分为多个日期分片并发查询，按分片顺序（由新到旧）产出
+                slices = self._date_slices(start_date, end_date, self.slice_days)
+                async for slice_items in self._iter_pages(
+                    lambda index: self._collect_slice(client, *slices[index]),
+                    range(len(slices)),
+                    self.slice_concurrency
+                ):
+                    total_items += len(slice_items)
+                    yield slice_items
                 
-                while current_page <= max_pages:
-                    page_items = await self._collect_page(
-                        client, 
-                        start_date, 
-                        current_page, 
-                        page_size
-                    )
-                    
-                    if not page_items:
-                        break  # 没有更多数据了
-                    
-                    items.extend(page_items)
-                    
-                    # 如果这一页数据都早于起始日期，停止获取
-                    if all(item.date < start_date for item in page_items):
-                        break
-                    
-                    current_page += 1
-                    print(f"    已获取第 {current_page-1} 页，共 {len(items)} 条")
+                print(f"    深交所 {len(slices)} 个日期分片共获取 {total_items} 条公告")
         
         except Exception as e:
-            print(f"    深交所数据采集失败: {e}")
-            import traceback
-            traceback.print_exc()
+            self._record_error("深交所数据采集失败", e)
+    
+    @staticmethod
+    def _date_slices(
+        start_date: datetime,
+        end_date: datetime,
+        slice_days: int
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        将时间窗口切分为日期分片
+        
+        Args:
+            start_date: 起始日期
+            end_date: 结束日期
+            slice_days: 每个分片覆盖的天数
+            
+        Returns:
+            (分片起始日期, 分片结束日期) 列表，由新到旧排列，相邻分片不重叠
+        """
+        slices = []
+        slice_end = end_date
+        step = timedelta(days=max(1, slice_days))
+        
+        while slice_end >= start_date:
+            slice_start = max(start_date, slice_end - step + timedelta(days=1))
+            slices.append((slice_start, slice_end))
+            slice_end = slice_start - timedelta(days=1)
+        
+        return slices
+    
+    async def _collect_slice(
+        self,
+        client: httpx.AsyncClient,
+        slice_start: datetime,
+        slice_end: datetime,
+        known_first_page: Optional[List[NewsItem]] = None
+    ) -> List[NewsItem]:
+        """
+        采集单个日期分片内的全部公告（失败的分页会记录到 errors 中）
+        
+        分片内公告数超过 PAGE_SIZE * MAX_PAGES 时按日期对半拆分后分别采集；
+        单日公告仍超过上限时记录错误，标记本次采集结果不完整。
+        
+        Args:
+            known_first_page: 已知的首页公告（拆分前的分片首页全部落在本分片内时复用），
+                提供时从第2页开始请求，并由第2页得到分片内公告总数
+        """
+        page_size = self.PAGE_SIZE
+        max_pages = self.MAX_PAGES
+        slice_label = f"{slice_start.strftime('%Y-%m-%d')}~{slice_end.strftime('%Y-%m-%d')}"
+        
+        async def fetch_page(page_num: int):
+            try:
+                return await self._collect_page(client, slice_start, slice_end, page_num, page_size)
+            except Exception as e:
+                self._record_error(f"{slice_label} 第 {page_num} 页获取失败", e)
+                return None
+        
+        if known_first_page is None:
+            first_page = await fetch_page(1)
+            if first_page is None:
+                return []
+            items, total = first_page
+            first_items = list(items)
+            next_page = 2
+        else:
+            first_items = known_first_page
+            items = list(known_first_page)
+            if self._reached_watermark(items):
+                return items
+            second_page = await fetch_page(2)
+            if second_page is None:
+                return items
+            items.extend(second_page[0])
+            total = second_page[1]
+            next_page = 3
+        
+        capacity = page_size * max_pages
+        if total > capacity and not self._reached_watermark(items):
+            days = (slice_end.date() - slice_start.date()).days + 1
+            if days > 1:
+                return await self._collect_split_slice(client, slice_start, slice_end, days, first_items)
+            self._record_error(
+                f"{slice_label} 公告数超过分页上限",
+                ValueError(f"共 {total} 条，只能获取前 {capacity} 条")
+            )
+        
+        # 增量采集时已获取的页中出现采集过的公告则无需翻页
+        last_page = min(max_pages, math.ceil(total / page_size))
+        if last_page >= next_page and not self._reached_watermark(items):
+            pages = await self._gather_pages(
+                fetch_page,
+                range(next_page, last_page + 1),
+                self.PAGE_CONCURRENCY,
+                should_stop=lambda page: page is not None and self._reached_watermark(page[0])
+            )
+            for page in pages:
+                if page is not None:
+                    items.extend(page[0])
+        
+        return items
+    
+    async def _collect_split_slice(
+        self,
+        client: httpx.AsyncClient,
+        slice_start: datetime,
+        slice_end: datetime,
+        days: int,
+        first_page: List[NewsItem]
+    ) -> List[NewsItem]:
+        """
+        将日期分片对半拆分后依次采集（先新后旧，较新的一半已到达水位线时不再采集较旧的一半）
         
-        self.news_items = items
+        公告按日期由新到旧返回，原分片的首页全部落在较新的一半时即是较新一半的首页，
+        直接复用而不重复请求。
+        """
+        split = datetime.combine(slice_start.date(), datetime.min.time()) + timedelta(days=days // 2)
+        reusable = len(first_page) == self.PAGE_SIZE and all(item.date >= split for item in first_page)
+        items = await self._collect_slice(client, split, slice_end, first_page if reusable else None)
+        if not self._reached_watermark(items):
+            items.extend(await self._collect_slice(client, slice_start, split - timedelta(days=1)))
         return items
     
     async def _collect_page(
         self, 
         client: httpx.AsyncClient,
-        start_date: datetime,
-        current_page: int,
+        slice_start: datetime,
+        slice_end: datetime,
+        page_num: int,
         page_size: int
-    ) -> List[NewsItem]:
-        """采集单页数据"""
-        items = []
+    ) -> Tuple[List[NewsItem], int]:
+        """
+        采集日期分片内的单页数据
         
-        try:
-            # 使用深交所的搜索API
-            url = "https://www.szse.cn/api/search/content"
-            
-            # API参数
-            data = {
-                'keyword': self.stock_code,
-                'range': 'title',  # 在标题中搜索
-                'time': '1',  # 时间范围（1=一年内）
-                'orderby': 'time',  # 按时间排序
-                'currentPage': str(current_page),
-                'pageSize': str(page_size),
-                'openChange': 'true',
-                'searchtype': '1'
-            }
+        Returns:
+            (新闻列表, 分片内公告总数)
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-                'Referer': f'https://www.szse.cn/application/search/index.html?keyword={self.stock_code}',
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-                'Accept': 'application/json, text/javascript, */*; q=0.01',
-                'X-Requested-With': 'XMLHttpRequest'
-            }
-            
-            response = await client.post(url, data=data, headers=headers)
+        Raises:
+            httpx.HTTPError: 请求失败（已由共享会话重试）
+        """
+        items = []
+        total = 0
+        
+        # 深交所上市公司公告列表API，seDate限定日期范围
+        payload = {
+            'seDate': [slice_start.strftime('%Y-%m-%d'), slice_end.strftime('%Y-%m-%d')],
+            'stock': [self.stock_code],
+            'channelCode': ['listedNotice_disc'],
+            'pageSize': page_size,
+            'pageNum': page_num
+        }
+        
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+            'Referer': f'https://www.szse.cn/disclosure/listed/notice/index.html?stock={self.stock_code}',
+            'Content-Type': 'application/json',
+            'Accept': 'application/json, text/javascript, */*; q=0.01',
+            'X-Requested-With': 'XMLHttpRequest'
+        }
+        
+        # 请求失败直接抛出，由调用方记录，避免被误判为"没有更多数据"；
+        # 列表查询虽然用POST但没有副作用，允许共享会话重试
+        response = await client.post(
+            self.ANN_LIST_URL, json=payload, headers=headers, extensions={RETRY_EXTENSION: True}
+        )
+        response.raise_for_status()
+        
+        if response.status_code == 200:
+            result = response.json()
+            total = int(result.get('announceCount') or 0)
+            data_list = result.get('data') or []
             
-            if response.status_code == 200:
-                result = response.json()
-                total_size = result.get('totalSize', 0)
-                data_list = result.get('data', [])
-                
-                if current_page == 1:
-                    print(f"    深交所搜索到 {total_size} 条相关记录")
-                
-                for item_data in data_list:
+            for item_data in data_list:
+                try:
+                    # 提取标题（移除HTML标签）
+                    title = item_data.get('title', '')
+                    title = title.replace('<span class="keyword">', '').replace('</span>', '')
+                    title = title.strip()
+                    
+                    if not title:
+                        continue
+                    
+                    # 提取URL
+                    url_path = item_data.get('attachPath', '')
+                    if not url_path:
+                        continue
+                    
+                    # 构造完整URL
+                    if url_path.startswith('http'):
+                        full_url = url_path
+                    elif url_path.startswith('//'):
+                        full_url = 'https:' + url_path
+                    else:
+                        full_url = self.DOWNLOAD_URL + url_path
+                    
+                    # 提取日期 - publishTime格式为 "2025-01-01 00:00:00"
+                    date_str = item_data.get('publishTime', '')
                     try:
-                        # 提取标题（移除HTML标签）
-                        title = item_data.get('doctitle', '')
-                        title = title.replace('<span class="keyword">', '').replace('</span>', '')
-                        title = title.strip()
-                        
-                        if not title:
-                            continue
-                        
-                        # 提取URL
-                        url_path = item_data.get('docpuburl', '')
-                        if not url_path:
-                            continue
-                        
-                        # 构造完整URL
-                        if url_path.startswith('http'):
-                            full_url = url_path
-                        elif url_path.startswith('//'):
-                            full_url = 'https:' + url_path
-                        else:
-                            full_url = 'https://www.szse.cn' + url_path
-                        
-                        # 提取日期 - docpubtime是Unix时间戳（毫秒）
-                        timestamp = item_data.get('docpubtime', 0)
-                        if timestamp:
-                            try:
-                                # 转换毫秒时间戳为datetime
-                                pub_date = datetime.fromtimestamp(timestamp / 1000)
-                            except:
-                                pub_date = datetime.now()
-                        else:
+                        pub_date = datetime.strptime(date_str[:19], '%Y-%m-%d %H:%M:%S')
+                    except ValueError:
+                        try:
+                            pub_date = datetime.strptime(date_str[:10], '%Y-%m-%d')
+                        except ValueError:
                             pub_date = datetime.now()
-                        
-                        # 检查日期范围
-                        if pub_date < start_date:
-                            continue
-                        
-                        news_item = NewsItem(
-                            title=title,
-                            url=full_url,
-                            source="深交所",
-                            date=pub_date,
-                            importance=self._judge_importance(title),
-                            category=self._judge_category(title)
-                        )
-                        items.append(news_item)
                     
-                    except Exception as e:
-                        print(f"    解析单条数据失败: {e}")
-                        continue
-        
-        except Exception as e:
-            print(f"    获取第 {current_page} 页失败: {e}")
+                    news_item = NewsItem(
+                        title=title,
+                        url=full_url,
+                        source="深交所",
+                        date=pub_date,
+                        importance=self._judge_importance(title),
+                        category=self._judge_category(title)
+                    )
+                    items.append(news_item)
+                
+                except Exception as e:
+                    print(f"    解析单条数据失败: {e}")
+                    continue
         
-        return items
+        return items, total
 
 
 # 测试函数
@@ -3,9 +3,10 @@ from datetime import datetime, timedelta
 from typing import List
 import httpx
 import re
-from bs4 import BeautifulSoup
 
 from .base_collector import BaseCollector, NewsItem
+from .stock_master import get_stock_master
+from .parsing import parse_tonghuashun_search, parse_tonghuashun_stock_page
 
 
 class TongHuaShunCollector(BaseCollector):
@@ -26,10 +27,10 @@ class TongHuaShunCollector(BaseCollector):
             新闻消息列表
         """
         news_items = []
-        start_date = datetime.now() - timedelta(days=days)
+        start_date = self._window_start(days)
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self._http_client() as client:
                 # 获取股票页面新闻
                 items = await self._collect_stock_news(client, start_date)
                 news_items.extend(items)
@@ -64,82 +65,54 @@ class TongHuaShunCollector(BaseCollector):
             print(f"    响应状态: {response.status_code}")
             
             if response.status_code == 200:
-                # 同花顺网站现在使用UTF-8编码
-                soup = BeautifulSoup(response.text, 'lxml')
+                # 同花顺网站现在使用UTF-8编码；在解析执行器中解析，不阻塞事件循环
+                records = await self._parse(parse_tonghuashun_stock_page, response.text)
                 
-                # 查找新闻/公告板块
-                news_sections = soup.find_all(['div', 'ul'], class_=re.compile(r'news|notice|announcement|gglist', re.I))
-                
-                for section in news_sections:
-                    news_items = section.find_all(['li', 'a'], limit=30)
-                    
-                    for news_elem in news_items:
-                        try:
-                            if news_elem.name == 'a':
-                                link = news_elem
-                            else:
-                                link = news_elem.find('a', href=True)
-                            
-                            if not link:
-                                continue
-                            
-                            title = link.get_text(strip=True)
-                            if not title or len(title) < 5:
-                                continue
-                            
-                            href = link.get('href', '')
-                            if not href:
-                                continue
-                            
-                            # 检查标题和URL是否与股票相关
-                            if not self._is_relevant(title, href):
-                                continue
-                            
-                            if not href.startswith('http'):
-                                if href.startswith('/'):
-                                    href = self.BASE_URL + href
-                                else:
-                                    href = self.BASE_URL + '/' + href
-                            
-                            # 查找日期
-                            date = None
-                            
-                            # 首先尝试从URL中提取日期（最可靠）
-                            url_date_match = re.search(r'/(\d{8})/', href)
-                            if url_date_match:
-                                date_str = url_date_match.group(1)
-                                try:
-                                    date = datetime.strptime(date_str, '%Y%m%d')
-                                except:
-                                    pass
-                            
-                            # 如果URL中没有，从页面元素中查找
-                            if not date:
-                                date_elem = news_elem.find(['span', 'em'], class_=re.compile(r'date|time', re.I))
-                                if date_elem:
-                                    date_str = date_elem.get_text(strip=True)
-                                    date = self._parse_date(date_str)
-                                else:
-                                    # 尝试从文本中提取日期
-                                    text = news_elem.get_text()
-                                    date_match = re.search(r'(\d{2}-\d{2}|\d{4}-\d{2}-\d{2})', text)
-                                    if date_match:
-                                        date = self._parse_date(date_match.group(1))
-                            
-                            if not date:
-                                date = datetime.now()  # 如果没有日期，使用当前日期
-                            
-                            if date >= start_date:
-                                items.append(NewsItem(
-                                    title=title,
-                                    date=date,
-                                    source="同花顺",
-                                    url=href,
-                                    importance=self._judge_importance(title),
-                                    category=self._judge_category(title)
-                                ))
-                        except Exception as e:
+                for record in records:
+                    try:
+                        title = record['title']
+                        href = record['href']
+                        
+                        # 检查标题和URL是否与股票相关
+                        if not self._is_relevant(title, href):
                             continue
+                        
+                        if not href.startswith('http'):
+                            if href.startswith('/'):
+                                href = self.BASE_URL + href
+                            else:
+                                href = self.BASE_URL + '/' + href
+                        
+                        # 查找日期
+                        date = None
+                        
+                        # 首先尝试从URL中提取日期（最可靠）
+                        url_date_match = re.search(r'/(\d{8})/', href)
+                        if url_date_match:
+                            date_str = url_date_match.group(1)
+                            try:
+                                date = datetime.strptime(date_str, '%Y%m%d')
+                            except:
+                                pass
+                        
+                        # 如果URL中没有，使用页面元素或文本中的日期
+                        if not date and record['date_text']:
+                            date = self._parse_date(record['date_text'])
+                        
+                        if not date:
+                            date = datetime.now()  # 如果没有日期，使用当前日期
+                        
+                        if date >= start_date:
+                            items.append(NewsItem(
+                                title=title,
+                                date=date,
+                                source="同花顺",
+                                url=href,
+                                importance=self._judge_importance(title),
+                                category=self._judge_category(title)
+                            ))
+                    except Exception as e:
+                        continue
                 
                 print(f"    从个股页面解析到 {len(items)} 条信息")
             
@@ -183,18 +156,12 @@ class TongHuaShunCollector(BaseCollector):
             
             if response.status_code == 200:
                 # 同花顺网站使用UTF-8编码
-                soup = BeautifulSoup(response.text, 'lxml')
-                
-                news_list = soup.find_all(['li', 'div'], class_=re.compile(r'list|item', re.I), limit=20)
+                records = await self._parse(parse_tonghuashun_search, response.text)
                 
-                for news in news_list:
+                for record in records:
                     try:
-                        link = news.find('a', href=True)
-                        if not link:
-                            continue
-                        
-                        title = link.get_text(strip=True)
-                        href = link['href']
+                        title = record['title']
+                        href = record['href']
                         
                         if not href.startswith('http'):
                             href = self.NEWS_URL + href
@@ -212,11 +179,9 @@ class TongHuaShunCollector(BaseCollector):
                             except:
                                 pass
                         
-                        # 如果URL中没有，从页面元素中查找
-                        if not date:
-                            date_elem = news.find(['span', 'time'], class_=re.compile(r'date|time', re.I))
-                            if date_elem:
-                                date = self._parse_date(date_elem.get_text(strip=True))
+                        # 如果URL中没有，使用页面元素中的日期
+                        if not date and record['date_text']:
+                            date = self._parse_date(record['date_text'])
                         
                         if date and date >= start_date:
                             items.append(NewsItem(
@@ -298,24 +263,11 @@ class TongHuaShunCollector(BaseCollector):
         if url and self.stock_code in url:
             return True
         
-        # 只排除明确是其他公司的新闻（其他公司为主角）
-        # 且标题和URL都不包含本公司信息
-        other_companies = [
-            '药明生物', '药明康德', '信达生物', '科伦博泰', '百济神州', 
-            '恒瑞医药', '复星医药', '石药集团', '君实生物', '康方生物',
-            '三生制药', '和黄医药', '基石药业', '再鼎医药', '天境生物',
-            '亚盛医药', '贝达药业', '歌礼制药', '前沿生物', '艾力斯',
-            '泽璟制药', '诺诚健华', '康宁杰瑞', '迈威生物', '神州细胞',
-            '华领医药', '开拓药业', '盟科医药', '永泰生物', '传奇生物',
-            '安龙生物', '沃森生物', '智飞生物', '康希诺'
-        ]
-        
-        # 只有当标题以其他公司名开头，且URL也不包含本公司代码时才排除
-        for company in other_companies:
-            if title.startswith(company):
-                # 即使以其他公司开头，如果URL包含本公司代码，也保留（可能是对比新闻）
-                if not (url and self.stock_code in url):
-                    return False
+        # 只排除明确是其他公司的新闻（标题以其他上市公司开头），
+        # 且标题和URL都不包含本公司信息；公司名称来自股票主数据索引
+        leading = get_stock_master().leading_issuer(title)
+        if leading is not None and leading in self._other_issuers(title):
+            return False
         
         # 默认相关（宽松过滤，保留行业新闻）
         return True
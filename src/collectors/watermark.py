@@ -0,0 +1,196 @@
+"""增量采集状态 - 按（股票, 数据源）保存高水位和历史消息"""
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from .base_collector import NewsItem
+from .dedup import IdentityIndex
+
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.strptime(value, DATE_FORMAT)
+
+
+def _format_date(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime(DATE_FORMAT) if value else None
+
+
+@dataclass
+class Watermark:
+    """
+    单个数据源的高水位
+    
+    last_date 为已见过的最新消息日期，known_urls 为该日期附近已见过的消息URL。
+    下次采集从 last_date 当天开始，遇到已知URL即可停止翻页。
+    covered_since 为历史记录完整覆盖的最早日期，请求更长的时间范围时需要全量采集。
+    """
+    last_date: Optional[datetime] = None
+    covered_since: Optional[datetime] = None
+    known_urls: Set[str] = field(default_factory=set)
+    
+    # 保留的已知URL数量上限（只需覆盖高水位附近的消息）
+    KNOWN_URL_LIMIT = 200
+    
+    def window_start(self, start_date: datetime) -> datetime:
+        """
+        计算增量采集的起始日期
+        
+        Args:
+            start_date: 按 days 计算的完整窗口起始日期
+        
+        Returns:
+            高水位可用时为高水位当天零点，否则为 start_date
+        """
+        if self.last_date is None or self.covered_since is None:
+            return start_date
+        if start_date < self.covered_since:
+            # 请求的窗口超出了历史覆盖范围，需要全量采集
+            return start_date
+        boundary = self.last_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        return max(start_date, boundary)
+    
+    def is_known(self, item: NewsItem) -> bool:
+        """消息是否已在之前的运行中采集过"""
+        return item.url in self.known_urls
+    
+    def advance(self, items: List[NewsItem], start_date: datetime):
+        """
+        用本次完整采集到的消息推进高水位
+        
+        Args:
+            items: 本次采集到的新消息
+            start_date: 本次采集实际覆盖的起始日期
+        """
+        if self.covered_since is None or start_date < self.covered_since:
+            self.covered_since = start_date
+        
+        if not items:
+            return
+        
+        newest = sorted(items, key=lambda item: item.date, reverse=True)
+        if self.last_date is None or newest[0].date > self.last_date:
+            self.last_date = newest[0].date
+        
+        # 只保留高水位附近的URL：新消息优先，其次是仍在边界日期内的旧URL
+        urls = [item.url for item in newest if item.url]
+        urls.extend(url for url in self.known_urls if url not in urls)
+        self.known_urls = set(urls[:self.KNOWN_URL_LIMIT])
+    
+    def to_dict(self) -> Dict:
+        return {
+            'last_date': _format_date(self.last_date),
+            'covered_since': _format_date(self.covered_since),
+            'known_urls': sorted(self.known_urls)
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Watermark':
+        return cls(
+            last_date=_parse_date(data.get('last_date')),
+            covered_since=_parse_date(data.get('covered_since')),
+            known_urls=set(data.get('known_urls') or [])
+        )
+
+
+class StockState:
+    """单只股票的增量采集状态：各数据源的高水位和已采集的历史消息"""
+    
+    def __init__(self, path: Path, stock_code: str):
+        self.path = path
+        self.stock_code = stock_code
+        self.watermarks: Dict[str, Watermark] = {}
+        self.history: List[NewsItem] = []
+    
+    @classmethod
+    def load(cls, path: Path, stock_code: str) -> 'StockState':
+        """从状态文件加载（文件不存在或损坏时返回空状态）"""
+        state = cls(path, stock_code)
+        if not path.exists():
+            return state
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            state.watermarks = {
+                source: Watermark.from_dict(mark)
+                for source, mark in (data.get('sources') or {}).items()
+            }
+            state.history = [NewsItem.from_dict(item) for item in data.get('history') or []]
+        except Exception as e:
+            print(f"  ⚠️  增量状态文件 {path} 无法读取，将全量采集: {e}")
+            state.watermarks = {}
+            state.history = []
+        
+        return state
+    
+    def watermark(self, source: str) -> Watermark:
+        """获取数据源的高水位（首次使用时创建空高水位）"""
+        mark = self.watermarks.get(source)
+        if mark is None:
+            mark = Watermark()
+            self.watermarks[source] = mark
+        return mark
+    
+    def merge(self, items: Iterable[NewsItem], start_date: datetime):
+        """
+        将新消息合并进历史记录（按消息身份去重，新采集的版本优先），并裁剪掉窗口之外的旧消息
+        
+        Args:
+            items: 本次采集到的新消息
+            start_date: 完整时间窗口的起始日期
+        """
+        merged = IdentityIndex(self.stock_code).unique(list(items) + self.history)
+        
+        self.history = sorted(
+            (item for item in merged if item.date >= start_date),
+            key=lambda item: item.date,
+            reverse=True
+        )
+        
+        # 裁剪后历史只能覆盖到 start_date
+        for mark in self.watermarks.values():
+            if mark.covered_since is not None and mark.covered_since < start_date:
+                mark.covered_since = start_date
+    
+    def save(self):
+        """写回状态文件（先写临时文件再替换，避免中断时损坏）"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'stock_code': self.stock_code,
+            'updated_at': _format_date(datetime.now()),
+            'sources': {source: mark.to_dict() for source, mark in self.watermarks.items()},
+            'history': [item.to_dict() for item in self.history]
+        }
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.path)
+
+
+class WatermarkStore:
+    """
+    增量采集状态存储
+    
+    每只股票一个JSON文件（state_dir/{stock_code}.json），记录各数据源的
+    高水位和已采集的历史消息。
+    """
+    
+    def __init__(self, state_dir: str = "state"):
+        """
+        初始化状态存储
+        
+        Args:
+            state_dir: 状态文件目录
+        """
+        self.state_dir = Path(state_dir)
+    
+    def load(self, stock_code: str) -> StockState:
+        """加载股票的增量状态"""
+        return StockState.load(self.state_dir / f"{stock_code}.json", stock_code)
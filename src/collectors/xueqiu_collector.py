@@ -1,5 +1,5 @@
 """雪球收集器"""
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List
 import httpx
 
@@ -23,10 +23,10 @@ class XueqiuCollector(BaseCollector):
             新闻消息列表
         """
         news_items = []
-        start_date = datetime.now() - timedelta(days=days)
+        start_date = self._window_start(days)
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self._http_client() as client:
                 # 获取雪球token
                 await self._init_cookies(client)
                 
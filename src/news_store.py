@@ -0,0 +1,354 @@
+"""本地消息库 - 基于SQLite持久化保存 NewsItem"""
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .collectors.base_collector import NewsItem
+from .collectors.dedup import (
+    AGGREGATOR_PREFIXES,
+    announcement_id,
+    announcements_conflict,
+    identity_keys,
+    is_announcement_key,
+    key_hash
+)
+
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    stock_code TEXT NOT NULL,
+    url_key TEXT NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    date TEXT NOT NULL,
+    source TEXT NOT NULL,
+    importance TEXT,
+    category TEXT,
+    content TEXT,
+    announcement TEXT,
+    first_seen TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (stock_code, url_key)
+);
+CREATE INDEX IF NOT EXISTS idx_news_stock_date ON news (stock_code, date);
+CREATE INDEX IF NOT EXISTS idx_news_source ON news (source);
+CREATE INDEX IF NOT EXISTS idx_news_importance ON news (importance);
+CREATE INDEX IF NOT EXISTS idx_news_category ON news (category);
+CREATE TABLE IF NOT EXISTS news_identity (
+    stock_code TEXT NOT NULL,
+    key_hash INTEGER NOT NULL,
+    url_key TEXT NOT NULL,
+    PRIMARY KEY (stock_code, key_hash)
+);
+"""
+
+# 每次 IN (...) 查询的身份键哈希数（低于旧版SQLite的999个参数上限）
+LOOKUP_CHUNK = 500
+
+
+def _rank_sql(column: str) -> str:
+    """SQL中的 announcement_rank：原始公告 2，聚合平台转载 1，没有公告标识 0"""
+    aggregators = ' OR '.join(f"{column} LIKE '{prefix}:%'" for prefix in sorted(AGGREGATOR_PREFIXES))
+    return f"(CASE WHEN {column} IS NULL THEN 0 WHEN {aggregators} THEN 1 ELSE 2 END)"
+
+
+# 已保存的记录比新写入的消息更接近原始公告（如交易所公告被东方财富或雪球的转发命中）时，
+# 保留原记录的链接、标题、日期、来源、公告标识和正文，只补充原来为空的字段
+_KEEP_ORIGINAL = f"({_rank_sql('news.announcement')} > {_rank_sql('excluded.announcement')})"
+
+UPSERT_SQL = f"""
+INSERT INTO news (
+    stock_code, url_key, url, title, date, source, importance, category, content, announcement,
+    first_seen, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (stock_code, url_key) DO UPDATE SET
+    url = CASE WHEN {_KEEP_ORIGINAL} THEN news.url ELSE excluded.url END,
+    title = CASE WHEN {_KEEP_ORIGINAL} THEN news.title ELSE excluded.title END,
+    date = CASE WHEN {_KEEP_ORIGINAL} THEN news.date ELSE excluded.date END,
+    source = CASE WHEN {_KEEP_ORIGINAL} THEN news.source ELSE excluded.source END,
+    importance = COALESCE(excluded.importance, news.importance),
+    category = COALESCE(excluded.category, news.category),
+    content = CASE WHEN {_KEEP_ORIGINAL} THEN COALESCE(news.content, excluded.content)
+        ELSE COALESCE(excluded.content, news.content) END,
+    announcement = CASE WHEN {_KEEP_ORIGINAL} THEN news.announcement
+        ELSE COALESCE(excluded.announcement, news.announcement) END,
+    updated_at = excluded.updated_at
+"""
+
+
+class NewsStore:
+    """
+    SQLite消息库
+    
+    每条消息以（股票代码, 身份键）为主键，按（股票代码, 日期）、来源、重要性
+    和分类建立索引。写入使用单个事务内的批量upsert，重复采集同一条消息只会更新。
+    
+    消息的全部身份键（公告标识、规范化URL、标题+日期，见 dedup 模块）的哈希保存在
+    news_identity 表中，之后的运行从任一数据源采集到同一条消息（如雪球转发的交易所
+    公告、http/https 不同写法的同一PDF）都会更新已有记录而不是新增。
+    
+    用法:
+        with NewsStore("news.db") as store:
+            store.upsert("600519", timeline.news_items)
+            items = store.query("600519", start_date=datetime(2025, 1, 1))
+    """
+    
+    def __init__(self, db_path: str = "news.db"):
+        """
+        初始化消息库（数据库文件不存在时自动创建）
+        
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = db_path
+        if db_path != ':memory:':
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+    
+    def _lookup_identities(
+        self,
+        stock_code: str,
+        hashes: Iterable[int]
+    ) -> Tuple[Dict[int, str], Dict[str, Set[str]]]:
+        """
+        批量查找身份键哈希对应的已有记录（每 LOOKUP_CHUNK 个哈希一次查询）
+        
+        Returns:
+            (哈希 -> 主键, 主键 -> 记录的公告标识集合)
+        """
+        hashes = list(hashes)
+        known: Dict[int, str] = {}
+        announcements: Dict[str, Set[str]] = {}
+        for i in range(0, len(hashes), LOOKUP_CHUNK):
+            chunk = hashes[i:i + LOOKUP_CHUNK]
+            rows = self._conn.execute(
+                "SELECT i.key_hash, i.url_key, n.announcement FROM news_identity i "
+                "LEFT JOIN news n ON n.stock_code = i.stock_code AND n.url_key = i.url_key "
+                f"WHERE i.stock_code = ? AND i.key_hash IN ({','.join('?' * len(chunk))})",
+                [stock_code, *chunk]
+            )
+            for value, url_key, announcement in rows:
+                known[value] = url_key
+                found = announcements.setdefault(url_key, set())
+                if is_announcement_key(url_key):
+                    found.add(url_key)
+                if announcement:
+                    found.add(announcement)
+        return known, announcements
+    
+    @staticmethod
+    def _resolve_key(keys: List[str], known: Dict[int, str], announcements: Dict[str, Set[str]]) -> str:
+        """
+        查找消息已有记录的主键，没有时使用第一个身份键
+        
+        Args:
+            keys: 消息的身份键（identity_keys）
+            known: 已有记录和本批次中已分配的 哈希 -> 主键
+            announcements: 主键 -> 该记录的公告标识
+        """
+        announcement = keys[0] if is_announcement_key(keys[0]) else ""
+        for key in keys:
+            url_key = known.get(key_hash(key))
+            # 同一平台上公告标识不同的两条公告（同一天的同名公告）不合并
+            if url_key is not None and not announcements_conflict(announcement, announcements.get(url_key, ())):
+                return url_key
+        return keys[0]
+    
+    def upsert(self, stock_code: str, news_items: Iterable[NewsItem], stock_name: str = "") -> int:
+        """
+        批量写入消息（单个事务）
+        
+        Args:
+            stock_code: 股票代码
+            news_items: 消息列表
+            stock_name: 股票名称（计算标题身份键时去掉开头的名称，与 IdentityIndex 一致）
+        
+        Returns:
+            写入（新增或更新）的条数
+        """
+        now = datetime.now().strftime(DATE_FORMAT)
+        items = list(news_items)
+        item_keys = [identity_keys(item, stock_name, stock_code) for item in items]
+        known, announcements = self._lookup_identities(
+            stock_code, {key_hash(key) for keys in item_keys for key in keys}
+        )
+        
+        rows = []
+        identities = []
+        for item, keys in zip(items, item_keys):
+            key = self._resolve_key(keys, known, announcements)
+            for value in map(key_hash, keys):
+                known.setdefault(value, key)
+                identities.append((stock_code, value, key))
+            announcement = announcement_id(item.url)
+            if announcement:
+                announcements.setdefault(key, set()).add(announcement)
+            rows.append((
+                stock_code,
+                key,
+                item.url or "",
+                item.title,
+                item.date.strftime(DATE_FORMAT),
+                item.source,
+                item.importance,
+                item.category,
+                item.content,
+                announcement or None,
+                now,
+                now
+            ))
+        
+        if not rows:
+            return 0
+        
+        with self._conn:
+            self._conn.executemany(UPSERT_SQL, rows)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO news_identity (stock_code, key_hash, url_key) VALUES (?, ?, ?)", identities
+            )
+        return len(rows)
+    
+    def query(
+        self,
+        stock_code: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        source: Optional[str] = None,
+        importance: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[NewsItem]:
+        """
+        按条件查询消息，结果按日期由新到旧排列
+        
+        Args:
+            stock_code: 股票代码
+            start_date: 开始日期（含）
+            end_date: 结束日期（含）
+            source: 来源名称
+            importance: 重要性级别（高、中、低）
+            category: 分类名称
+            limit: 最多返回的条数
+        
+        Returns:
+            消息列表
+        """
+        sql = "SELECT title, date, source, url, content, importance, category FROM news WHERE stock_code = ?"
+        params: List = [stock_code]
+        
+        if start_date is not None:
+            sql += " AND date >= ?"
+            params.append(start_date.strftime(DATE_FORMAT))
+        if end_date is not None:
+            sql += " AND date <= ?"
+            params.append(end_date.strftime(DATE_FORMAT))
+        if source is not None:
+            sql += " AND source = ?"
+            params.append(source)
+        if importance is not None:
+            sql += " AND importance = ?"
+            params.append(importance)
+        if category is not None:
+            sql += " AND category = ?"
+            params.append(category)
+        
+        sql += " ORDER BY date DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        return [
+            NewsItem(
+                title=title,
+                date=datetime.strptime(date, DATE_FORMAT),
+                source=source_name,
+                url=url,
+                content=content,
+                importance=importance_level or "中",
+                category=category_name
+            )
+            for title, date, source_name, url, content, importance_level, category_name
+            in self._conn.execute(sql, params)
+        ]
+    
+    def iter_classification(self, batch_size: int = 200000) -> Iterator[List[Tuple]]:
+        """
+        分批读取全部消息的分类信息（按 rowid 翻页，适合千万级数据）
+        
+        Args:
+            batch_size: 每批条数
+        
+        Yields:
+            (rowid, 股票代码, 标题, 重要性, 分类) 列表
+        """
+        last_rowid = 0
+        while True:
+            rows = self._conn.execute(
+                "SELECT rowid, stock_code, title, importance, category FROM news "
+                "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last_rowid, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            yield rows
+            last_rowid = rows[-1][0]
+    
+    def update_classification(self, updates: Iterable[Tuple[str, str, int]]) -> int:
+        """
+        批量更新重要性和分类（单个事务）
+        
+        Args:
+            updates: (重要性, 分类, rowid) 列表
+        
+        Returns:
+            更新的条数
+        """
+        updates = list(updates)
+        if not updates:
+            return 0
+        with self._conn:
+            self._conn.executemany("UPDATE news SET importance = ?, category = ? WHERE rowid = ?", updates)
+        return len(updates)
+    
+    def count(self, stock_code: Optional[str] = None) -> int:
+        """统计消息条数（不指定股票时统计全部）"""
+        if stock_code is None:
+            return self._conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM news WHERE stock_code = ?", (stock_code,)
+        ).fetchone()[0]
+    
+    def get_statistics(self, stock_code: str) -> Dict:
+        """
+        获取股票在库中的统计信息
+        
+        Returns:
+            包含总数、时间范围、来源分布的字典
+        """
+        total, start, end = self._conn.execute(
+            "SELECT COUNT(*), MIN(date), MAX(date) FROM news WHERE stock_code = ?", (stock_code,)
+        ).fetchone()
+        sources = dict(self._conn.execute(
+            "SELECT source, COUNT(*) FROM news WHERE stock_code = ? GROUP BY source", (stock_code,)
+        ).fetchall())
+        return {
+            'total': total,
+            'date_range': {'start': start, 'end': end} if total else None,
+            'sources': sources
+        }
+    
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
+    
+    def __enter__(self) -> 'NewsStore':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -8,12 +8,23 @@ import re
 
 from .collectors.base_collector import NewsItem
 from .ai_summarizer import AISummarizer
+from .collectors.http_session import HTTPSessionManager
+from .collectors.near_dup import SIMILARITY_THRESHOLD, NearDuplicateClusterer, NewsCluster
+from .collectors.stock_master import get_stock_master
+from .news_store import NewsStore
 
 
 class Timeline:
     """时间线管理器"""
     
-    def __init__(self, stock_code: str, stock_name: str = "", ai_api_key: Optional[str] = None, ai_model: str = "qwen-plus"):
+    def __init__(
+        self,
+        stock_code: str,
+        stock_name: str = "",
+        ai_api_key: Optional[str] = None,
+        ai_model: str = "qwen-plus",
+        http_session: Optional[HTTPSessionManager] = None
+    ):
         """
         初始化时间线
         
@@ -22,22 +33,41 @@ class Timeline:
             stock_name: 股票名称
             ai_api_key: Qwen API密钥（可选，用于生成摘要）
             ai_model: Qwen模型名称（默认qwen-plus）
+            http_session: 共享HTTP会话（可选，供AI摘要复用连接）
         """
         self.stock_code = stock_code
         self.stock_name = stock_name
         self.news_items: List[NewsItem] = []
-        self.ai_summarizer = AISummarizer(api_key=ai_api_key, model=ai_model) if ai_api_key else None
+        self.ai_summarizer = AISummarizer(
+            api_key=ai_api_key,
+            model=ai_model,
+            http_session=http_session
+        ) if ai_api_key else None
         self.daily_summaries: Dict[str, str] = {}  # 存储每日摘要
         self.period_summary: str = ""  # 存储时段总结
+        self.incomplete_sources: Dict[str, str] = {}  # 未完整采集的数据源及原因
+        self.clusters: List[NewsCluster] = []  # 近似重复聚类得到的事件（cluster_similar 之后）
+        self._cluster_of: Dict[int, NewsCluster] = {}  # 代表消息 id -> 事件
     
     def add_news(self, news_items: List[NewsItem]):
         """
         添加新闻到时间线
         
+        标题中提到的其他上市公司记录在每条消息的 mentioned_codes 中。
+        
         Args:
             news_items: 新闻列表
         """
+        self._tag_mentions(news_items)
         self.news_items.extend(news_items)
+        self._clear_clusters()
+    
+    def _tag_mentions(self, news_items: List[NewsItem]):
+        """用股票主数据索引标记消息提到的其他上市公司"""
+        master = get_stock_master()
+        for item in news_items:
+            if not item.mentioned_codes:
+                item.mentioned_codes = master.other_issuers(item.title, self.stock_code, self.stock_name)
     
     def sort(self, reverse: bool = True):
         """
@@ -104,6 +134,61 @@ class Timeline:
             if start_date <= item.date <= end_date
         ]
     
+    def load_from_store(
+        self,
+        store: NewsStore,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> int:
+        """
+        从本地消息库加载指定日期范围的消息（替换当前时间线内容）
+        
+        Args:
+            store: 本地消息库
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            
+        Returns:
+            加载的消息条数
+        """
+        self.news_items = store.query(self.stock_code, start_date=start_date, end_date=end_date)
+        self._tag_mentions(self.news_items)
+        self._clear_clusters()
+        return len(self.news_items)
+    
+    def _build_clusters(self, threshold: float = SIMILARITY_THRESHOLD) -> List[NewsCluster]:
+        clusterer = NearDuplicateClusterer(self.stock_code, self.stock_name, threshold=threshold)
+        return clusterer.cluster(self.news_items)
+    
+    def cluster_similar(self, threshold: float = SIMILARITY_THRESHOLD) -> int:
+        """
+        把不同来源以略有不同的标题转载的同一事件聚为一组（近似重复聚类）
+        
+        聚类后时间线只输出每个事件的代表消息，并注明报道条数和来源；之后再添加
+        或重新加载消息会清除聚类结果。
+        
+        Args:
+            threshold: 判定为同一事件的相似度（0~1）
+        
+        Returns:
+            事件数
+        """
+        self.clusters = self._build_clusters(threshold)
+        self._cluster_of = {id(cluster.representative): cluster for cluster in self.clusters}
+        return len(self.clusters)
+    
+    def _clear_clusters(self):
+        self.clusters = []
+        self._cluster_of = {}
+    
+    def timeline_items(self) -> List[NewsItem]:
+        """
+        时间线输出的消息：聚类后为各事件的代表消息，否则为全部消息（保持当前顺序）
+        """
+        if not self.clusters:
+            return self.news_items
+        return [item for item in self.news_items if id(item) in self._cluster_of]
+    
     @staticmethod
     def _markdown_to_html(text: str) -> str:
         """将Markdown格式转换为HTML"""
@@ -118,15 +203,18 @@ class Timeline:
         
         return text
     
-    def group_by_date(self) -> Dict[str, List[NewsItem]]:
+    def group_by_date(self, items: Optional[List[NewsItem]] = None) -> Dict[str, List[NewsItem]]:
         """
         按日期分组
         
+        Args:
+            items: 要分组的新闻（默认为全部消息）
+        
         Returns:
             日期为键，新闻列表为值的字典
         """
         grouped = defaultdict(list)
-        for item in self.news_items:
+        for item in self.news_items if items is None else items:
             date_key = item.date.strftime('%Y-%m-%d')
             grouped[date_key].append(item)
         return dict(grouped)
@@ -156,7 +244,8 @@ class Timeline:
                 'total': 0,
                 'sources': {},
                 'categories': {},
-                'importance': {}
+                'importance': {},
+                'incomplete_sources': dict(self.incomplete_sources)
             }
         
         sources = defaultdict(int)
@@ -169,16 +258,21 @@ class Timeline:
                 categories[item.category] += 1
             importance[item.importance] += 1
         
-        return {
+        stats = {
             'total': len(self.news_items),
             'sources': dict(sources),
             'categories': dict(categories),
             'importance': dict(importance),
+            'incomplete_sources': dict(self.incomplete_sources),
             'date_range': {
                 'start': min(item.date for item in self.news_items).strftime('%Y-%m-%d'),
                 'end': max(item.date for item in self.news_items).strftime('%Y-%m-%d')
             }
         }
+        if self.clusters:
+            stats['events'] = len(self.clusters)
+            stats['multi_source_events'] = sum(1 for cluster in self.clusters if cluster.source_count > 1)
+        return stats
     
     async def generate_summaries(self):
         """
@@ -194,8 +288,15 @@ class Timeline:
         
         print("\n正在生成AI摘要...")
         
+        # 聚类后（cluster_similar）同一事件的多条转载只输入代表消息，并注明报道来源数
+        representatives = self.timeline_items()
+        source_counts = {id(cluster.representative): cluster.source_count for cluster in self.clusters}
+        
+        def counts_of(items: List[NewsItem]) -> Optional[List[int]]:
+            return [source_counts[id(item)] for item in items] if source_counts else None
+        
         # 生成每日摘要
-        grouped = self.group_by_date()
+        grouped = self.group_by_date(representatives)
         total_days = len(grouped)
         
         for i, (date, items) in enumerate(sorted(grouped.items(), reverse=True), 1):
@@ -204,7 +305,8 @@ class Timeline:
                 summary = await self.ai_summarizer.generate_daily_summary(
                     date=date,
                     news_items=items,
-                    stock_name=self.stock_name or self.stock_code
+                    stock_name=self.stock_name or self.stock_code,
+                    source_counts=counts_of(items)
                 )
                 self.daily_summaries[date] = summary
             except Exception as e:
@@ -218,16 +320,22 @@ class Timeline:
             end_date = stats['date_range']['end']
             
             self.period_summary = await self.ai_summarizer.generate_period_summary(
-                news_items=self.news_items,
+                news_items=representatives,
                 stock_name=self.stock_name or self.stock_code,
                 start_date=start_date,
-                end_date=end_date
+                end_date=end_date,
+                source_counts=counts_of(representatives)
             )
         except Exception as e:
             print(f"    失败: {e}")
         
         print(f"✓ 摘要生成完成\n")
     
+    async def aclose(self):
+        """释放AI摘要使用的自有HTTP会话（共享会话由调用方关闭）"""
+        if self.ai_summarizer is not None:
+            await self.ai_summarizer.aclose()
+    
     def to_dict(self) -> Dict:
         """
         转换为字典格式
@@ -235,23 +343,15 @@ class Timeline:
         Returns:
             字典格式的时间线数据
         """
-        return {
+        data = {
             'stock_code': self.stock_code,
             'stock_name': self.stock_name,
             'statistics': self.get_statistics(),
-            'timeline': [
-                {
-                    'date': item.date.strftime('%Y-%m-%d %H:%M:%S'),
-                    'title': item.title,
-                    'source': item.source,
-                    'url': item.url,
-                    'importance': item.importance,
-                    'category': item.category,
-                    'content': item.content
-                }
-                for item in self.news_items
-            ]
+            'timeline': [item.to_dict() for item in self.news_items]
         }
+        if self.clusters:
+            data['clusters'] = [cluster.to_dict() for cluster in self.clusters]
+        return data
     
     def to_json(self, filepath: str = None) -> str:
         """
@@ -292,8 +392,13 @@ class Timeline:
         stats = self.get_statistics()
         lines.append("## 统计信息\n\n")
         lines.append(f"- 总消息数: {stats['total']}\n")
+        if 'events' in stats:
+            lines.append(f"- 事件数（合并多来源转载）: {stats['events']}\n")
         lines.append(f"- 时间范围: {stats.get('date_range', {}).get('start', 'N/A')} ~ {stats.get('date_range', {}).get('end', 'N/A')}\n")
-        lines.append(f"- 数据来源: {', '.join(stats['sources'].keys())}\n\n")
+        lines.append(f"- 数据来源: {', '.join(stats['sources'].keys())}\n")
+        for source, reason in stats['incomplete_sources'].items():
+            lines.append(f"- ⚠️ {source} 采集不完整: {reason}\n")
+        lines.append("\n")
         
         # 时段总结（如果有AI摘要）
         if self.period_summary:
@@ -302,7 +407,7 @@ class Timeline:
         
         # 按日期分组的时间线
         lines.append("## 时间线\n\n")
-        grouped = self.group_by_date()
+        grouped = self.group_by_date(self.timeline_items())
         
         for date in sorted(grouped.keys(), reverse=True):
             items = grouped[date]
@@ -322,6 +427,9 @@ class Timeline:
                 lines.append(f"{importance_emoji} **[{item.source}]** [{item.title}]({item.url})\n")
                 if item.category:
                     lines.append(f"   - 分类: {item.category}\n")
+                cluster = self._cluster_of.get(id(item))
+                if cluster is not None and len(cluster) > 1:
+                    lines.append(f"   - 同一事件: {len(cluster)} 条报道，{cluster.source_count} 个来源（{'、'.join(cluster.sources)}）\n")
                 if item.content:
                     content_preview = item.content[:100] + '...' if len(item.content) > 100 else item.content
                     lines.append(f"   - 摘要: {content_preview}\n")
@@ -511,7 +619,14 @@ class Timeline:
             <div class="stat-item">总消息数: {stats['total']}</div>
             <div class="stat-item">时间范围: {stats.get('date_range', {}).get('start', 'N/A')} ~ {stats.get('date_range', {}).get('end', 'N/A')}</div>
         </div>
-    </div>
+""")
+        if 'events' in stats:
+            html_lines.append(f"""        <div class="stat-item">事件数（合并多来源转载）: {stats['events']}</div>
+""")
+        for source, reason in stats['incomplete_sources'].items():
+            html_lines.append(f"""        <div class="stat-item">⚠️ {source} 采集不完整: {reason}</div>
+""")
+        html_lines.append("""    </div>
 """)
         
         # 时段总结（如果有AI摘要）
@@ -525,7 +640,7 @@ class Timeline:
         
         # 时间线
         html_lines.append('    <div class="timeline">\n')
-        grouped = self.group_by_date()
+        grouped = self.group_by_date(self.timeline_items())
         
         for date in sorted(grouped.keys(), reverse=True):
             items = grouped[date]
@@ -556,6 +671,10 @@ class Timeline:
                 if item.category:
                     html_lines.append(f'                <div class="news-meta">分类: {item.category} | 重要性: {item.importance}</div>\n')
                 
+                cluster = self._cluster_of.get(id(item))
+                if cluster is not None and len(cluster) > 1:
+                    html_lines.append(f'                <div class="news-meta">同一事件: {len(cluster)} 条报道，{cluster.source_count} 个来源（{"、".join(cluster.sources)}）</div>\n')
+                
                 if item.content:
                     content_preview = item.content[:200] + '...' if len(item.content) > 200 else item.content
                     html_lines.append(f'                <div class="news-content">{content_preview}</div>\n')
@@ -1,11 +1,16 @@
 """股票消息收集器主程序"""
 import asyncio
 import argparse
+import json
+import re
 import sys
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 from src.collectors import (
+    BaseCollector,
     CSRCCollector,
     PlaywrightExchangeCollector,
     EastMoneyCollector,
@@ -16,9 +21,149 @@ from src.collectors import (
 from src.collectors.szse_api_collector import SZSEAPICollector
 from src.collectors.sse_api_collector import SSEAPICollector
 from src.collectors.eastmoney_api_collector import EastmoneyAPICollector
+from src.collectors.base_collector import NewsItem
+from src.collectors.browser_pool import BrowserPool
+from src.collectors.dedup import IdentityIndex
+from src.collectors.http_session import HTTPSessionManager
+from src.collectors.keyword_matcher import configure_categories
+from src.collectors.loop_monitor import LoopLagMonitor
+from src.collectors.parsing import ParsingExecutor
+from src.collectors.stock_master import (
+    DEFAULT_PATH as DEFAULT_STOCK_MASTER_PATH, StockMaster, configure_stock_master, fetch_stock_master,
+    get_stock_master
+)
+from src.collectors.watermark import WatermarkStore
+from src.batch_classifier import BatchClassifier
+from src.news_store import NewsStore
 from src.timeline import Timeline
 
 
+OUTPUT_EXTENSIONS = {'markdown': 'md', 'json': 'json', 'html': 'html'}
+
+
+def build_collectors(
+    stock_code: str,
+    stock_name: str = "",
+    http_session: Optional[HTTPSessionManager] = None,
+    browser_pool: Optional[BrowserPool] = None,
+    parse_executor: Optional[ParsingExecutor] = None
+) -> List[BaseCollector]:
+    """
+    根据股票代码所属交易所构建收集器列表
+    
+    Args:
+        stock_code: 股票代码
+        stock_name: 股票名称（可选）
+        http_session: 共享HTTP会话（可选）
+        browser_pool: 共享浏览器池（可选，北交所收集器使用）
+        parse_executor: HTML解析执行器（可选，解析网页的收集器使用）
+        
+    Returns:
+        收集器列表
+    """
+    code = stock_code.strip().split('.')[0]
+    
+    if code.startswith('4') or code.startswith('8'):
+        # 北交所股票：4xxxxx或8xxxxx
+        exchange_collector = BSECollector(stock_code, stock_name, http_session, browser_pool, parse_executor)
+    elif code.startswith('6') or code.startswith('688'):
+        # 上交所股票
+        exchange_collector = SSEAPICollector(stock_code, stock_name, http_session)
+    else:
+        # 深交所股票
+        exchange_collector = SZSEAPICollector(stock_code, stock_name, http_session)
+    
+    return [
+        CSRCCollector(stock_code, stock_name, http_session, parse_executor=parse_executor),
+        exchange_collector,
+        EastmoneyAPICollector(stock_code, stock_name, http_session),
+        TongHuaShunCollector(stock_code, stock_name, http_session, parse_executor=parse_executor),
+        XueqiuCollector(stock_code, stock_name, http_session)
+    ]
+
+
+class SourceSemaphores(dict):
+    """按数据源名称懒创建的信号量表，用于限制同一数据源的并发股票数"""
+    
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = max(1, limit)
+    
+    def __missing__(self, source_name: str) -> asyncio.Semaphore:
+        semaphore = asyncio.Semaphore(self.limit)
+        self[source_name] = semaphore
+        return semaphore
+
+
+async def _stream_collector(
+    index: int,
+    collector: BaseCollector,
+    days: int,
+    queue: asyncio.Queue,
+    source_semaphores: Optional[SourceSemaphores] = None,
+    source_timeout: Optional[float] = None
+):
+    """
+    在数据源并发限制和单数据源时限下逐页运行单个收集器（排队等待不计入时限）
+    
+    每获取一批消息就放入队列 (index, 消息列表, None)，结束时放入 (index, None, 异常或None)。
+    超时或出错之前已放入队列的批次不受影响。
+    """
+    async def drain():
+        pages = collector.collect_pages(days)
+        try:
+            async for page_items in pages:
+                await queue.put((index, page_items, None))
+        finally:
+            await pages.aclose()
+    
+    error = None
+    try:
+        if source_semaphores is None:
+            await asyncio.wait_for(drain(), timeout=source_timeout)
+        else:
+            async with source_semaphores[collector.get_source_name()]:
+                await asyncio.wait_for(drain(), timeout=source_timeout)
+    except Exception as e:
+        error = e
+    
+    await queue.put((index, None, error))
+
+
+def write_timeline(timeline: Timeline, output_format: str, output_file: Optional[str] = None) -> bool:
+    """
+    按指定格式输出时间线
+    
+    Args:
+        timeline: 时间线
+        output_format: 输出格式（markdown/json/html）
+        output_file: 输出文件路径（可选，默认按股票代码和时间自动生成）
+        
+    Returns:
+        是否成功输出（格式不支持时返回False）
+    """
+    if not output_file:
+        # 自动生成文件名
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        ext = OUTPUT_EXTENSIONS.get(output_format, 'txt')
+        output_file = f"timeline_{timeline.stock_code}_{timestamp}.{ext}"
+    
+    print(f"正在生成 {output_format} 格式的时间线...")
+    
+    if output_format == 'markdown':
+        timeline.to_markdown(output_file)
+    elif output_format == 'json':
+        timeline.to_json(output_file)
+    elif output_format == 'html':
+        timeline.to_html(output_file)
+    else:
+        print(f"不支持的输出格式: {output_format}")
+        return False
+    
+    print(f"✓ 时间线已保存到: {output_file}\n")
+    return True
+
+
 async def collect_stock_news(
     stock_code: str,
     stock_name: str = "",
@@ -27,8 +172,19 @@ async def collect_stock_news(
     output_file: str = None,
     ai_api_key: str = None,
     ai_model: str = "qwen-plus",
-    enable_ai_summary: bool = False
-):
+    enable_ai_summary: bool = False,
+    source_semaphores: Optional[SourceSemaphores] = None,
+    verbose: bool = True,
+    http_session: Optional[HTTPSessionManager] = None,
+    source_timeout: Optional[float] = 120.0,
+    state_store: Optional[WatermarkStore] = None,
+    news_store: Optional[NewsStore] = None,
+    browser_pool: Optional[BrowserPool] = None,
+    deadline: Optional[float] = None,
+    source_budgets: Optional[Dict[str, float]] = None,
+    parse_executor: Optional[ParsingExecutor] = None,
+    cluster: bool = False
+) -> Optional[Timeline]:
     """
     收集股票公开消息并生成时间线
     
@@ -41,7 +197,47 @@ async def collect_stock_news(
         ai_api_key: Qwen API密钥（可选）
         ai_model: Qwen模型名称
         enable_ai_summary: 是否启用AI摘要
+        source_semaphores: 数据源并发限制（批量模式下跨股票共享）
+        verbose: 是否打印统计信息和消息预览
+        http_session: 共享HTTP会话（可选），不提供时为本次收集创建并在结束时关闭
+        source_timeout: 单个数据源的采集时限（秒），None表示不限
+        state_store: 增量采集状态（可选），提供时每个数据源只采集高水位之后的新消息，
+            并与之前保存的历史消息合并输出
+        news_store: 本地消息库（可选），提供时将整理后的消息写入库中
+        browser_pool: 共享浏览器池（可选），不提供时需要浏览器的收集器临时启动浏览器
+        deadline: 本次采集的总时限（秒，从开始采集算起），None表示不限；到时仍未完成的
+            数据源会被取消，已产出的消息保留，并在时间线中标记为不完整
+        source_budgets: 按数据源名称覆盖的采集时限（秒），未配置的数据源使用 source_timeout
+        parse_executor: HTML解析执行器（可选），不提供时在事件循环的默认线程池中解析
+        cluster: 是否合并不同来源转载的同一事件（近似重复聚类），时间线只输出每个事件的代表消息
+    
+    Returns:
+        生成的时间线，输出格式不支持时返回None
     """
+    if http_session is None:
+        async with HTTPSessionManager() as http_session:
+            return await collect_stock_news(
+                stock_code=stock_code,
+                stock_name=stock_name,
+                days=days,
+                output_format=output_format,
+                output_file=output_file,
+                ai_api_key=ai_api_key,
+                ai_model=ai_model,
+                enable_ai_summary=enable_ai_summary,
+                source_semaphores=source_semaphores,
+                verbose=verbose,
+                http_session=http_session,
+                source_timeout=source_timeout,
+                state_store=state_store,
+                news_store=news_store,
+                browser_pool=browser_pool,
+                deadline=deadline,
+                source_budgets=source_budgets,
+                parse_executor=parse_executor,
+                cluster=cluster
+            )
+    
     print(f"\n{'='*60}")
     print(f"开始收集股票 {stock_name}({stock_code}) 的公开消息")
     print(f"时间范围: 最近 {days} 天")
@@ -52,131 +248,175 @@ async def collect_stock_news(
         stock_code, 
         stock_name, 
         ai_api_key=ai_api_key if enable_ai_summary else None,
-        ai_model=ai_model
+        ai_model=ai_model,
+        http_session=http_session
     )
     
-    # 判断交易所
-    code = stock_code.strip().split('.')[0]
-    is_bse = code.startswith('4') or code.startswith('8')  # 北交所：4xxxxx或8xxxxx
-    
-    if is_bse:
-        # 北交所股票
-        exchange = 'BSE'
-        exchange_collector = BSECollector(stock_code, stock_name)
-        collectors = [
-            CSRCCollector(stock_code, stock_name),
-            exchange_collector,
-            EastmoneyAPICollector(stock_code, stock_name),
-            TongHuaShunCollector(stock_code, stock_name),
-            XueqiuCollector(stock_code, stock_name)
-        ]
-    elif code.startswith('6') or code.startswith('688'):
-        # 上交所股票
-        exchange = 'SSE'
-        exchange_collector = SSEAPICollector(stock_code, stock_name)
-        collectors = [
-            CSRCCollector(stock_code, stock_name),
-            exchange_collector,
-            EastmoneyAPICollector(stock_code, stock_name),
-            TongHuaShunCollector(stock_code, stock_name),
-            XueqiuCollector(stock_code, stock_name)
-        ]
-    else:
-        # 深交所股票
-        exchange = 'SZSE'
-        exchange_collector = SZSEAPICollector(stock_code, stock_name)
-        collectors = [
-            CSRCCollector(stock_code, stock_name),
-            exchange_collector,
-            EastmoneyAPICollector(stock_code, stock_name),
-            TongHuaShunCollector(stock_code, stock_name),
-            XueqiuCollector(stock_code, stock_name)
-        ]
-    
-    # 并发收集数据
+    collectors = build_collectors(stock_code, stock_name, http_session, browser_pool, parse_executor)
+    
+    # 增量采集：为每个数据源设置高水位，记录本次实际采集的起始日期
+    full_start = datetime.now() - timedelta(days=days)
+    state = state_store.load(stock_code) if state_store is not None else None
+    window_starts = []
+    for collector in collectors:
+        if state is not None:
+            collector.watermark = state.watermark(collector.get_source_name())
+            window_starts.append(collector.watermark.window_start(full_start))
+        else:
+            window_starts.append(full_start)
+    
+    # 并发收集数据：各数据源逐页产出，按到达顺序加入时间线
     print("正在从多个数据源收集消息...\n")
+    loop = asyncio.get_running_loop()
+    deadline_at = loop.time() + deadline if deadline is not None else None
+    queue: asyncio.Queue = asyncio.Queue()
     tasks = []
-    for collector in collectors:
+    timeouts = []
+    for i, collector in enumerate(collectors):
         source_name = collector.get_source_name()
+        timeouts.append((source_budgets or {}).get(source_name, source_timeout))
         print(f"  - {source_name}: 开始收集...")
-        tasks.append(collector.collect(days))
-    
-    # 等待所有任务完成
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+        tasks.append(asyncio.create_task(
+            _stream_collector(i, collector, days, queue, source_semaphores, timeouts[i])
+        ))
     
     # 处理结果
+    collect_start = time.perf_counter()
+    first_batch_seconds = None
+    source_items: List[List[NewsItem]] = [[] for _ in collectors]
     total_news = 0
-    for i, result in enumerate(results):
-        collector = collectors[i]
-        source_name = collector.get_source_name()
+    finished = [False] * len(collectors)
+    remaining = len(collectors)
+    try:
+        while remaining:
+            try:
+                if deadline_at is None or not queue.empty():
+                    i, page_items, error = await queue.get()
+                else:
+                    # 已入队的批次先处理完，队列为空时最多等到总时限
+                    i, page_items, error = await asyncio.wait_for(
+                        queue.get(), timeout=max(0.0, deadline_at - loop.time())
+                    )
+            except asyncio.TimeoutError:
+                break
+            collector = collectors[i]
+            source_name = collector.get_source_name()
+            
+            if page_items is not None:
+                if collector.watermark is not None:
+                    # 过滤掉之前已采集过的消息
+                    page_items = [item for item in page_items if not collector.watermark.is_known(item)]
+                if page_items and first_batch_seconds is None:
+                    first_batch_seconds = time.perf_counter() - collect_start
+                source_items[i].extend(page_items)
+                total_news += len(page_items)
+                timeline.add_news(page_items)
+                continue
+            
+            # 该数据源已结束
+            finished[i] = True
+            remaining -= 1
+            count = len(source_items[i])
+            if isinstance(error, asyncio.TimeoutError):
+                timeline.incomplete_sources[source_name] = f"超过 {timeouts[i]} 秒未完成"
+                print(f"  - {source_name}: ❌ 超时 - 超过 {timeouts[i]} 秒未完成，保留已收集的 {count} 条消息")
+                continue
+            if error is not None:
+                timeline.incomplete_sources[source_name] = f"采集失败: {str(error)}"
+                print(f"  - {source_name}: ❌ 失败 - {str(error)}")
+                continue
+            
+            # 结果不完整时不推进高水位，下次从原位置重新采集
+            if collector.watermark is not None and not collector.incomplete:
+                collector.watermark.advance(source_items[i], window_starts[i])
+            if collector.incomplete:
+                timeline.incomplete_sources[source_name] = f"{len(collector.errors)} 个请求失败"
+                print(f"  - {source_name}: ⚠️  收集 {count} 条消息，{len(collector.errors)} 个请求失败，结果可能不完整")
+            elif window_starts[i] > full_start:
+                print(f"  - {source_name}: ✓ 增量收集 {count} 条新消息（自 {window_starts[i].strftime('%Y-%m-%d')} 起）")
+            elif count:
+                print(f"  - {source_name}: ✓ 成功收集 {count} 条消息")
+            else:
+                print(f"  - {source_name}: ⚠️  无返回数据")
         
-        if isinstance(result, Exception):
-            print(f"  - {source_name}: ❌ 失败 - {str(result)}")
-        elif result is None:
-            print(f"  - {source_name}: ⚠️  无返回数据")
-        else:
-            count = len(result)
-            total_news += count
-            print(f"  - {source_name}: ✓ 成功收集 {count} 条消息")
-            timeline.add_news(result)
+        # 总时限已到：未结束的数据源被取消，保留已产出的消息，不推进高水位
+        for i, collector in enumerate(collectors):
+            if not finished[i]:
+                source_name = collector.get_source_name()
+                timeline.incomplete_sources[source_name] = f"超出总时限 {deadline} 秒"
+                print(f"  - {source_name}: ⏱️  超出总时限 {deadline} 秒，已取消，保留已收集的 {len(source_items[i])} 条消息")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
     
     print(f"\n总共收集到 {total_news} 条消息")
+    if first_batch_seconds is not None:
+        print(f"首批消息用时 {first_batch_seconds:.2f} 秒，全部数据源用时 {time.perf_counter() - collect_start:.2f} 秒")
     
-    # 去重
+    if state is not None:
+        # 合并进历史记录并保存状态，时间线输出完整的历史
+        state.merge(timeline.news_items, full_start)
+        state.save()
+        timeline.news_items = list(state.history)
+        print(f"合并历史后共 {len(timeline.news_items)} 条消息")
+    
+    # 去重：公告标识、规范化URL、标题+日期任一相同即为同一条消息（跨数据源）
     print("正在去重和整理...")
-    # 简单去重：基于URL
-    seen_urls = set()
-    unique_items = []
-    for item in timeline.news_items:
-        if item.url not in seen_urls:
-            seen_urls.add(item.url)
-            unique_items.append(item)
+    identities = IdentityIndex(stock_code, stock_name)
+    unique_items = identities.unique(timeline.news_items)
     
     timeline.news_items = unique_items
-    print(f"去重后剩余 {len(unique_items)} 条消息\n")
+    print(f"去重后剩余 {len(unique_items)} 条消息（合并重复 {identities.duplicates} 条）\n")
     
     # 排序
     timeline.sort(reverse=True)
     
+    # 写入本地消息库
+    if news_store is not None:
+        saved = news_store.upsert(stock_code, timeline.news_items, stock_name)
+        print(f"已写入本地消息库 {saved} 条\n")
+    
+    # 近似重复聚类：标题略有不同的多来源转载归为同一事件（消息库中仍保存全部消息）
+    if cluster:
+        events = timeline.cluster_similar()
+        print(f"近似重复聚类后共 {events} 个事件\n")
+    
     # 生成AI摘要（如果启用）
     if enable_ai_summary and ai_api_key:
-        await timeline.generate_summaries()
+        try:
+            await timeline.generate_summaries()
+        finally:
+            await timeline.aclose()
     
     # 显示统计信息
     stats = timeline.get_statistics()
-    print(f"{'='*60}")
-    print("统计信息:")
-    print(f"  - 总消息数: {stats['total']}")
-    if stats.get('date_range'):
-        print(f"  - 时间范围: {stats['date_range']['start']} ~ {stats['date_range']['end']}")
-    print(f"  - 数据来源分布:")
-    for source, count in stats['sources'].items():
-        print(f"    * {source}: {count} 条")
-    print(f"  - 重要性分布:")
-    for importance, count in stats['importance'].items():
-        print(f"    * {importance}: {count} 条")
-    print(f"{'='*60}\n")
+    if verbose:
+        print(f"{'='*60}")
+        print("统计信息:")
+        print(f"  - 总消息数: {stats['total']}")
+        if 'events' in stats:
+            print(f"  - 事件数: {stats['events']}（多来源报道 {stats['multi_source_events']} 个）")
+        if stats.get('date_range'):
+            print(f"  - 时间范围: {stats['date_range']['start']} ~ {stats['date_range']['end']}")
+        print(f"  - 数据来源分布:")
+        for source, count in stats['sources'].items():
+            print(f"    * {source}: {count} 条")
+        print(f"  - 重要性分布:")
+        for importance, count in stats['importance'].items():
+            print(f"    * {importance}: {count} 条")
+        if stats['incomplete_sources']:
+            print(f"  - 采集不完整的数据源:")
+            for source, reason in stats['incomplete_sources'].items():
+                print(f"    * {source}: {reason}")
+        print(f"{'='*60}\n")
     
     # 生成输出
-    if not output_file:
-        # 自动生成文件名
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        ext = {'markdown': 'md', 'json': 'json', 'html': 'html'}.get(output_format, 'txt')
-        output_file = f"timeline_{stock_code}_{timestamp}.{ext}"
-    
-    print(f"正在生成 {output_format} 格式的时间线...")
-    
-    if output_format == 'markdown':
-        timeline.to_markdown(output_file)
-    elif output_format == 'json':
-        timeline.to_json(output_file)
-    elif output_format == 'html':
-        timeline.to_html(output_file)
-    else:
-        print(f"不支持的输出格式: {output_format}")
-        return
+    if not write_timeline(timeline, output_format, output_file):
+        return None
     
-    print(f"✓ 时间线已保存到: {output_file}\n")
+    if not verbose:
+        return timeline
     
     # 显示部分内容预览
     print("最新消息预览:")
@@ -188,6 +428,410 @@ async def collect_stock_news(
     
     if len(timeline.news_items) > 5:
         print(f"... 还有 {len(timeline.news_items) - 5} 条消息")
+    
+    return timeline
+
+
+def render_from_store(
+    db_path: str,
+    stock_code: str,
+    stock_name: str = "",
+    days: int = 365,
+    output_format: str = "markdown",
+    output_file: Optional[str] = None,
+    cluster: bool = False
+) -> Optional[Timeline]:
+    """
+    直接从本地消息库生成时间线（不重新采集）
+    
+    Args:
+        db_path: 本地消息库路径
+        stock_code: 股票代码
+        stock_name: 股票名称（可选）
+        days: 输出最近多少天的消息
+        output_format: 输出格式（markdown/json/html）
+        output_file: 输出文件路径（可选）
+        cluster: 是否合并不同来源转载的同一事件
+        
+    Returns:
+        生成的时间线，输出格式不支持时返回None
+    """
+    timeline = Timeline(stock_code, stock_name)
+    with NewsStore(db_path) as store:
+        count = timeline.load_from_store(store, start_date=datetime.now() - timedelta(days=days))
+    
+    print(f"从本地消息库 {db_path} 加载 {stock_name}({stock_code}) 最近 {days} 天的消息: {count} 条")
+    if cluster:
+        print(f"近似重复聚类后共 {timeline.cluster_similar()} 个事件")
+    if not write_timeline(timeline, output_format, output_file):
+        return None
+    return timeline
+
+
+async def update_stock_master(path: str) -> StockMaster:
+    """
+    下载沪深京A股列表并保存为股票主数据文件，之后的采集使用新的主数据
+    
+    Args:
+        path: 保存路径
+        
+    Returns:
+        下载的股票主数据
+    """
+    print("下载股票列表...")
+    async with HTTPSessionManager() as http_session:
+        master = await fetch_stock_master(http_session.client)
+    master.save(path)
+    configure_stock_master(path)
+    print(f"✓ 股票主数据已保存到 {path}（{len(master.issuers)} 只股票）")
+    return master
+
+
+def reclassify_store(
+    db_path: str,
+    stock_names: Dict[str, str],
+    workers: Optional[int] = None
+) -> Dict:
+    """
+    用当前的重要性/分类规则重新分类消息库中的全部历史消息（不重新采集）
+    
+    Args:
+        db_path: 本地消息库路径
+        stock_names: 股票代码到名称的字典（库中只保存代码，名称用于判断消息是否与本公司直接相关）
+        workers: 分类进程数（默认使用CPU核数）
+        
+    Returns:
+        重新分类统计
+    """
+    with NewsStore(db_path) as store, BatchClassifier(workers=workers) as classifier:
+        print(f"重新分类消息库 {db_path}（{store.count()} 条，{classifier.workers} 个进程）...")
+        stats = classifier.reclassify_store(store, stock_names)
+    
+    print(
+        f"✓ 重新分类完成: {stats['total']} 条，{stats['changed']} 条结果有变化，"
+        f"耗时 {stats['seconds']:.1f} 秒（{stats['titles_per_second']} 条/秒）"
+    )
+    if stats['missing_names']:
+        print(
+            f"  ⚠️ {len(stats['missing_names'])} 只股票没有提供名称，仅按代码判断相关性: "
+            f"{', '.join(stats['missing_names'][:10])}"
+        )
+    return stats
+
+
+def print_rate_stats(http_session: HTTPSessionManager):
+    """打印各主机的限速统计，便于在吞吐量和被封风险之间调参"""
+    stats = http_session.rate_limiter.get_stats()
+    if not stats:
+        return
+    
+    print("  - 主机请求速率（次/秒）:")
+    for host, host_stats in stats.items():
+        print(
+            f"    * {host}: 实际 {host_stats['observed_rate']} / 当前上限 {host_stats['current_rate']}"
+            f" / 配置 {host_stats['configured_rate']}，"
+            f"请求 {host_stats['requests']} 次，限流信号 {host_stats['throttled']} 次"
+        )
+
+
+def print_browser_stats(browser_pool: BrowserPool):
+    """打印浏览器池的启动次数和请求拦截统计（本次运行未使用浏览器时不打印）"""
+    stats = browser_pool.get_stats()
+    if not stats['launches']:
+        return
+    
+    print(f"  - 浏览器: 启动 {stats['launches']} 次，借出页面 {stats['pages_served']} 次")
+    routing = stats.get('routing')
+    if routing:
+        print(
+            f"    * 放行请求 {routing['allowed_requests']} 个，拦截 {routing['blocked_requests']} 个"
+            f"（第三方 {routing['blocked_third_party']} 个），"
+            f"估算节省流量 {routing['estimated_bytes_saved'] / 1024 / 1024:.1f} MB"
+        )
+
+
+def print_parse_stats(parse_executor: ParsingExecutor, loop_monitor: LoopLagMonitor):
+    """打印HTML解析统计和事件循环阻塞情况（对比 --parse-executor inline 与 thread/process）"""
+    parse_stats = parse_executor.get_stats()
+    loop_stats = loop_monitor.get_stats()
+    print(
+        f"  - HTML解析（{parse_stats['mode']}）: {parse_stats['jobs']} 次，"
+        f"累计 {parse_stats['parse_seconds']} 秒，最长 {parse_stats['max_parse_ms']} 毫秒"
+    )
+    print(
+        f"  - 事件循环延迟: 平均 {loop_stats['mean_lag_ms']} 毫秒，最大 {loop_stats['max_lag_ms']} 毫秒，"
+        f"卡顿 {loop_stats['stalls']} 次（累计 {loop_stats['stalled_seconds']} 秒）"
+    )
+
+
+def parse_rate_limits(values: List[str]) -> Dict[str, float]:
+    """
+    解析命令行中的限速配置
+    
+    Args:
+        values: 形如 "query.sse.com.cn=2.5" 的字符串列表
+        
+    Returns:
+        主机到速率（次/秒）的字典
+    """
+    rate_limits = {}
+    for value in values or []:
+        host, sep, rate = value.partition('=')
+        if not sep or not host.strip():
+            raise ValueError(f"限速配置格式应为 主机=速率: {value}")
+        rate = float(rate)
+        if rate <= 0:
+            raise ValueError(f"限速速率必须大于0: {value}")
+        rate_limits[host.strip()] = rate
+    return rate_limits
+
+
+def parse_source_budgets(values: List[str]) -> Dict[str, float]:
+    """
+    解析命令行中的数据源时限配置
+    
+    Args:
+        values: 形如 "BSE=60" 的字符串列表（名称与收集器的数据源名称一致）
+    
+    Returns:
+        数据源名称到时限（秒）的字典
+    """
+    budgets = {}
+    for value in values or []:
+        source, sep, seconds = value.partition('=')
+        if not sep or not source.strip():
+            raise ValueError(f"数据源时限格式应为 数据源=秒数: {value}")
+        seconds = float(seconds)
+        if seconds <= 0:
+            raise ValueError(f"数据源时限必须大于0: {value}")
+        budgets[source.strip()] = seconds
+    return budgets
+
+
+def load_watchlist(filepath: str) -> List[Tuple[str, str]]:
+    """
+    读取自选股列表文件
+    
+    每行一只股票，格式为 "代码 名称" 或 "代码,名称"，名称可省略；
+    空行和以 # 开头的行会被忽略，重复代码只保留第一次出现。
+    
+    Args:
+        filepath: 自选股文件路径
+        
+    Returns:
+        (股票代码, 股票名称) 列表
+    """
+    stocks = []
+    seen_codes = set()
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            
+            parts = re.split(r'[,，\s]+', line, maxsplit=1)
+            code = parts[0].strip()
+            name = parts[1].strip() if len(parts) > 1 else ""
+            
+            if not code or code in seen_codes:
+                continue
+            seen_codes.add(code)
+            stocks.append((code, name))
+    
+    return stocks
+
+
+async def collect_watchlist(
+    watchlist_file: str,
+    days: int = 365,
+    output_format: str = "markdown",
+    output_dir: str = "timelines",
+    concurrency: int = 4,
+    source_concurrency: int = 2,
+    ai_api_key: str = None,
+    ai_model: str = "qwen-plus",
+    enable_ai_summary: bool = False,
+    max_connections: int = 100,
+    per_host_connections: int = 6,
+    rate_limits: Optional[Dict[str, float]] = None,
+    source_timeout: Optional[float] = 120.0,
+    state_dir: Optional[str] = None,
+    db_path: Optional[str] = None,
+    browser_pages: int = 4,
+    block_resources: bool = True,
+    deadline: Optional[float] = None,
+    source_budgets: Optional[Dict[str, float]] = None,
+    parse_mode: str = 'thread',
+    parse_workers: Optional[int] = None,
+    cluster: bool = False
+) -> Dict:
+    """
+    批量收集自选股列表中所有股票的消息
+    
+    所有股票共享同一组数据源并发限制：最多同时处理 concurrency 只股票，
+    每个数据源最多同时服务 source_concurrency 只股票，所有请求复用同一个
+    HTTP连接池。每只股票输出一个文件，并在输出目录写入一份运行汇总（batch_summary.json）。
+    
+    Args:
+        watchlist_file: 自选股文件路径
+        days: 收集最近多少天的消息
+        output_format: 输出格式（markdown/json/html）
+        output_dir: 输出目录
+        concurrency: 全局并发股票数
+        source_concurrency: 单个数据源的并发股票数
+        ai_api_key: Qwen API密钥（可选）
+        ai_model: Qwen模型名称
+        enable_ai_summary: 是否启用AI摘要
+        max_connections: HTTP连接池最大连接数
+        per_host_connections: 单个主机的最大并发连接数
+        rate_limits: 按主机覆盖的请求速率（次/秒）
+        source_timeout: 单个数据源的采集时限（秒），None表示不限
+        state_dir: 增量采集状态目录（可选），提供时只采集上次运行之后的新消息
+        db_path: 本地消息库路径（可选），提供时所有股票的消息写入同一个库
+        browser_pages: 共享浏览器池同时打开的页面数上限
+        block_resources: 是否拦截浏览器中的图片/字体/样式表和第三方请求
+        deadline: 整批运行的采集时限（秒），None表示不限；每只股票只能使用剩余的时间，
+            时限到达后尚未开始的股票被跳过
+        source_budgets: 按数据源名称覆盖的采集时限（秒）
+        parse_mode: HTML解析执行方式（inline/thread/process）
+        parse_workers: 解析线程/进程数（可选）
+        cluster: 是否合并不同来源转载的同一事件
+    
+    Returns:
+        运行汇总字典
+    """
+    stocks = load_watchlist(watchlist_file)
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    ext = OUTPUT_EXTENSIONS.get(output_format, 'txt')
+    
+    print(f"批量模式: 共 {len(stocks)} 只股票，全局并发 {concurrency}，单数据源并发 {source_concurrency}")
+    
+    stock_semaphore = asyncio.Semaphore(max(1, concurrency))
+    source_semaphores = SourceSemaphores(source_concurrency)
+    state_store = WatermarkStore(state_dir) if state_dir else None
+    news_store = NewsStore(db_path) if db_path else None
+    # 浏览器在第一只需要它的股票（北交所）开始采集时才启动
+    browser_pool = BrowserPool(max_pages=browser_pages, block_resources=block_resources)
+    parse_executor = ParsingExecutor(mode=parse_mode, max_workers=parse_workers)
+    loop_monitor = LoopLagMonitor()
+    http_session = HTTPSessionManager(
+        max_connections=max_connections,
+        per_host_limit=per_host_connections,
+        rate_limits=rate_limits
+    )
+    started_at = datetime.now()
+    run_start = time.perf_counter()
+    deadline_at = run_start + deadline if deadline is not None else None
+    
+    async def run_one(stock_code: str, stock_name: str) -> Dict:
+        async with stock_semaphore:
+            stock_start = time.perf_counter()
+            output_file = str(output_path / f"timeline_{stock_code}.{ext}")
+            record = {
+                'stock_code': stock_code,
+                'stock_name': stock_name,
+                'output_file': output_file
+            }
+            stock_deadline = deadline_at - stock_start if deadline_at is not None else None
+            if stock_deadline is not None and stock_deadline <= 0:
+                print(f"  - {stock_name}({stock_code}): ⏱️  已超出总时限，跳过")
+                record['status'] = 'skipped'
+                record['total'] = 0
+                record['elapsed_seconds'] = 0.0
+                return record
+            try:
+                timeline = await collect_stock_news(
+                    stock_code=stock_code,
+                    stock_name=stock_name,
+                    days=days,
+                    output_format=output_format,
+                    output_file=output_file,
+                    ai_api_key=ai_api_key,
+                    ai_model=ai_model,
+                    enable_ai_summary=enable_ai_summary,
+                    source_semaphores=source_semaphores,
+                    verbose=False,
+                    http_session=http_session,
+                    source_timeout=source_timeout,
+                    state_store=state_store,
+                    news_store=news_store,
+                    browser_pool=browser_pool,
+                    deadline=stock_deadline,
+                    source_budgets=source_budgets,
+                    parse_executor=parse_executor,
+                    cluster=cluster
+                )
+                record['status'] = 'ok' if timeline is not None else 'failed'
+                record['total'] = len(timeline.news_items) if timeline is not None else 0
+                if timeline is not None and timeline.clusters:
+                    record['events'] = len(timeline.clusters)
+                if timeline is not None and timeline.incomplete_sources:
+                    record['incomplete_sources'] = dict(timeline.incomplete_sources)
+            except Exception as e:
+                print(f"  - {stock_name}({stock_code}): ❌ 失败 - {str(e)}")
+                record['status'] = 'failed'
+                record['total'] = 0
+                record['error'] = str(e)
+            record['elapsed_seconds'] = round(time.perf_counter() - stock_start, 2)
+            return record
+    
+    try:
+        async with http_session, browser_pool, parse_executor, loop_monitor:
+            records = await asyncio.gather(*(run_one(code, name) for code, name in stocks))
+    finally:
+        if news_store is not None:
+            news_store.close()
+    
+    elapsed = time.perf_counter() - run_start
+    succeeded = sum(1 for record in records if record['status'] == 'ok')
+    skipped = sum(1 for record in records if record['status'] == 'skipped')
+    summary = {
+        'started_at': started_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'elapsed_seconds': round(elapsed, 2),
+        'days': days,
+        'concurrency': concurrency,
+        'source_concurrency': source_concurrency,
+        'incremental': state_store is not None,
+        'total_stocks': len(stocks),
+        'deadline': deadline,
+        'succeeded': succeeded,
+        'failed': len(stocks) - succeeded - skipped,
+        'skipped': skipped,
+        'incomplete': sum(1 for record in records if record.get('incomplete_sources')),
+        'total_news': sum(record['total'] for record in records),
+        'stocks_per_minute': round(len(stocks) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        'rate_limits': http_session.rate_limiter.get_stats(),
+        'open_circuits': http_session.open_hosts(),
+        'browser_pool': browser_pool.get_stats(),
+        'parsing': parse_executor.get_stats(),
+        'event_loop': loop_monitor.get_stats(),
+        'stocks': list(records)
+    }
+    
+    summary_file = output_path / 'batch_summary.json'
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    
+    print(f"\n{'='*60}")
+    print("批量运行汇总:")
+    print(f"  - 股票数: {summary['total_stocks']}（成功 {summary['succeeded']}，失败 {summary['failed']}）")
+    if summary['incomplete']:
+        print(f"  - 部分数据源未完整采集的股票: {summary['incomplete']} 只")
+    if summary['skipped']:
+        print(f"  - 因超出总时限跳过的股票: {summary['skipped']} 只")
+    print(f"  - 消息总数: {summary['total_news']}")
+    print(f"  - 耗时: {summary['elapsed_seconds']} 秒")
+    print(f"  - 吞吐量: {summary['stocks_per_minute']} 只/分钟")
+    print_rate_stats(http_session)
+    if summary['open_circuits']:
+        print(f"  - 仍处于熔断状态的主机: {', '.join(summary['open_circuits'])}")
+    print_browser_stats(browser_pool)
+    print_parse_stats(parse_executor, loop_monitor)
+    print(f"  - 汇总文件: {summary_file}")
+    print(f"{'='*60}\n")
+    
+    return summary
 
 
 def main():
@@ -205,12 +849,22 @@ def main():
   
   # 指定输出文件
   python main.py 600519 -n 贵州茅台 -o timeline.md
+  
+  # 合并多个来源转载的同一事件
+  python main.py 600519 -n 贵州茅台 --cluster
+  
+  # 批量收集自选股列表（每行 "代码 名称"），输出到 timelines/ 目录
+  python main.py -w watchlist.txt -d 30 --concurrency 8 --source-concurrency 2
+  
+  # 修改关键词规则后重新分类消息库中的历史消息（名称取自自选股文件）
+  python main.py --db news.db --reclassify -w watchlist.txt --category-rules rules.json
         """
     )
     
     parser.add_argument(
         'stock_code',
-        help='股票代码，如 600519 或 000001'
+        nargs='?',
+        help='股票代码，如 600519 或 000001（使用 --watchlist 时可省略）'
     )
     
     parser.add_argument(
@@ -240,6 +894,12 @@ def main():
         help='输出文件路径（可选，默认自动生成）'
     )
     
+    parser.add_argument(
+        '--cluster',
+        action='store_true',
+        help='合并不同来源以略有不同的标题转载的同一事件，时间线只输出代表消息并注明报道来源数'
+    )
+    
     parser.add_argument(
         '--ai-summary',
         action='store_true',
@@ -259,24 +919,276 @@ def main():
         help='Qwen模型名称（默认qwen-plus，可选qwen-turbo/qwen-max等）'
     )
     
+    parser.add_argument(
+        '-w', '--watchlist',
+        dest='watchlist',
+        help='自选股列表文件，每行 "代码 名称"，启用批量模式'
+    )
+    
+    parser.add_argument(
+        '--output-dir',
+        dest='output_dir',
+        default='timelines',
+        help='批量模式的输出目录（默认timelines）'
+    )
+    
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=4,
+        help='批量模式下同时处理的股票数（默认4）'
+    )
+    
+    parser.add_argument(
+        '--source-concurrency',
+        dest='source_concurrency',
+        type=int,
+        default=2,
+        help='批量模式下单个数据源同时服务的股票数（默认2）'
+    )
+    
+    parser.add_argument(
+        '--max-connections',
+        dest='max_connections',
+        type=int,
+        default=100,
+        help='批量模式下HTTP连接池的最大连接数（默认100）'
+    )
+    
+    parser.add_argument(
+        '--per-host-connections',
+        dest='per_host_connections',
+        type=int,
+        default=6,
+        help='批量模式下单个主机的最大并发连接数（默认6）'
+    )
+    
+    parser.add_argument(
+        '--browser-pages',
+        dest='browser_pages',
+        type=int,
+        default=4,
+        help='共享浏览器同时打开的页面数（默认4，仅北交所使用浏览器）'
+    )
+    
+    parser.add_argument(
+        '--no-block-resources',
+        dest='block_resources',
+        action='store_false',
+        help='不拦截浏览器中的图片、字体、样式表和第三方域名请求（默认拦截）'
+    )
+    
+    parser.add_argument(
+        '--parse-executor',
+        dest='parse_mode',
+        choices=list(ParsingExecutor.MODES),
+        default='thread',
+        help='HTML解析的执行方式（默认thread；批量运行可用process充分利用多核，inline用于对比事件循环阻塞）'
+    )
+    
+    parser.add_argument(
+        '--parse-workers',
+        dest='parse_workers',
+        type=int,
+        help='HTML解析的线程/进程数（默认CPU核数，最多4个）'
+    )
+    
+    parser.add_argument(
+        '--rate-limit',
+        dest='rate_limits',
+        action='append',
+        default=[],
+        metavar='HOST=RATE',
+        help='按主机设置请求速率（次/秒），可重复指定，如 --rate-limit query.sse.com.cn=2'
+    )
+    
+    parser.add_argument(
+        '--source-timeout',
+        dest='source_timeout',
+        type=float,
+        default=120.0,
+        help='单个数据源的采集时限（秒，默认120），超时的数据源会被跳过'
+    )
+    
+    parser.add_argument(
+        '--source-budget',
+        dest='source_budgets',
+        action='append',
+        default=[],
+        metavar='SOURCE=SECONDS',
+        help='按数据源覆盖采集时限（秒），可重复指定，如 --source-budget BSE=60'
+    )
+    
+    parser.add_argument(
+        '--deadline',
+        type=float,
+        help='总采集时限（秒，可选）；到时仍未完成的数据源被取消，保留已收集的消息并标记为不完整，'
+             '批量模式下为整批运行的时限'
+    )
+    
+    parser.add_argument(
+        '--category-rules',
+        dest='category_rules',
+        help='消息分类规则配置文件（JSON，可选）；运行期间文件修改后自动重新加载，无需重启'
+    )
+    
+    parser.add_argument(
+        '--stock-master',
+        dest='stock_master',
+        help=f'股票主数据文件（CSV，列为 code,name,exchange,aliases），用于识别标题中提到的上市公司；'
+             f'默认 {DEFAULT_STOCK_MASTER_PATH}，文件不存在时使用内置的公司列表'
+    )
+    
+    parser.add_argument(
+        '--update-stock-master',
+        dest='update_stock_master',
+        action='store_true',
+        help='从东方财富下载沪深京A股列表，保存到 --stock-master 指定的文件（默认路径见上）'
+    )
+    
+    parser.add_argument(
+        '--state-dir',
+        dest='state_dir',
+        help='增量采集状态目录（可选），记录每个数据源已采集到的位置，之后只采集新消息并与历史合并'
+    )
+    
+    parser.add_argument(
+        '--db',
+        dest='db_path',
+        help='本地SQLite消息库路径（可选），采集结果会写入库中'
+    )
+    
+    parser.add_argument(
+        '--from-db',
+        dest='from_db',
+        action='store_true',
+        help='不重新采集，直接从 --db 指定的消息库生成时间线'
+    )
+    
+    parser.add_argument(
+        '--reclassify',
+        action='store_true',
+        help='不采集，用当前规则重新计算 --db 消息库中全部消息的重要性和分类；'
+             '股票名称取自股票主数据、股票代码参数和 --watchlist'
+    )
+    
+    parser.add_argument(
+        '--reclassify-workers',
+        dest='reclassify_workers',
+        type=int,
+        help='重新分类使用的进程数（默认使用CPU核数）'
+    )
+    
     args = parser.parse_args()
     
+    if args.reclassify and not args.db_path:
+        parser.error('--reclassify 需要提供 --db 消息库路径')
+    if not args.stock_code and not args.watchlist and not args.reclassify and not args.update_stock_master:
+        parser.error('需要提供股票代码或 --watchlist 自选股文件')
+    if args.from_db and (not args.db_path or not args.stock_code):
+        parser.error('--from-db 需要同时提供股票代码和 --db 消息库路径')
+    
+    try:
+        rate_limits = parse_rate_limits(args.rate_limits)
+        source_budgets = parse_source_budgets(args.source_budgets)
+        if args.category_rules:
+            configure_categories(args.category_rules)
+        if args.stock_master and not args.update_stock_master:
+            configure_stock_master(args.stock_master)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    
     # 获取API密钥（支持多个环境变量）
     import os
     api_key = args.api_key or os.environ.get('QWEN_API_KEY') or os.environ.get('DASHSCOPE_API_KEY')
     
     # 运行异步任务
     try:
-        asyncio.run(collect_stock_news(
-            stock_code=args.stock_code,
-            stock_name=args.stock_name,
-            days=args.days,
-            output_format=args.format,
-            output_file=args.output_file,
-            ai_api_key=api_key,
-            ai_model=args.model,
-            enable_ai_summary=args.ai_summary
-        ))
+        if args.update_stock_master:
+            asyncio.run(update_stock_master(args.stock_master or str(DEFAULT_STOCK_MASTER_PATH)))
+            if not args.stock_code and not args.watchlist and not args.reclassify:
+                return
+        
+        if args.reclassify:
+            stock_names = {
+                code: issuer.name for code, issuer in get_stock_master().issuers.items() if issuer.code
+            }
+            if args.watchlist:
+                stock_names.update((code, name) for code, name in load_watchlist(args.watchlist) if name)
+            if args.stock_code:
+                stock_names[args.stock_code] = args.stock_name
+            reclassify_store(args.db_path, stock_names, workers=args.reclassify_workers)
+        elif args.watchlist:
+            asyncio.run(collect_watchlist(
+                watchlist_file=args.watchlist,
+                days=args.days,
+                output_format=args.format,
+                output_dir=args.output_dir,
+                concurrency=args.concurrency,
+                source_concurrency=args.source_concurrency,
+                ai_api_key=api_key,
+                ai_model=args.model,
+                enable_ai_summary=args.ai_summary,
+                max_connections=args.max_connections,
+                per_host_connections=args.per_host_connections,
+                rate_limits=rate_limits,
+                source_timeout=args.source_timeout,
+                state_dir=args.state_dir,
+                db_path=args.db_path,
+                browser_pages=args.browser_pages,
+                block_resources=args.block_resources,
+                deadline=args.deadline,
+                source_budgets=source_budgets,
+                parse_mode=args.parse_mode,
+                parse_workers=args.parse_workers,
+                cluster=args.cluster
+            ))
+        elif args.from_db:
+            render_from_store(
+                db_path=args.db_path,
+                stock_code=args.stock_code,
+                stock_name=args.stock_name,
+                days=args.days,
+                output_format=args.format,
+                output_file=args.output_file,
+                cluster=args.cluster
+            )
+        else:
+            async def run_single():
+                news_store = NewsStore(args.db_path) if args.db_path else None
+                browser_pool = BrowserPool(max_pages=args.browser_pages, block_resources=args.block_resources)
+                parse_executor = ParsingExecutor(mode=args.parse_mode, max_workers=args.parse_workers)
+                loop_monitor = LoopLagMonitor()
+                try:
+                    async with HTTPSessionManager(rate_limits=rate_limits) as http_session, \
+                            browser_pool, parse_executor, loop_monitor:
+                        await collect_stock_news(
+                            stock_code=args.stock_code,
+                            stock_name=args.stock_name,
+                            days=args.days,
+                            output_format=args.format,
+                            output_file=args.output_file,
+                            ai_api_key=api_key,
+                            ai_model=args.model,
+                            enable_ai_summary=args.ai_summary,
+                            http_session=http_session,
+                            source_timeout=args.source_timeout,
+                            state_store=WatermarkStore(args.state_dir) if args.state_dir else None,
+                            news_store=news_store,
+                            browser_pool=browser_pool,
+                            deadline=args.deadline,
+                            source_budgets=source_budgets,
+                            parse_executor=parse_executor,
+                            cluster=args.cluster
+                        )
+                        print_rate_stats(http_session)
+                        print_browser_stats(browser_pool)
+                        print_parse_stats(parse_executor, loop_monitor)
+                finally:
+                    if news_store is not None:
+                        news_store.close()
+            
+            asyncio.run(run_single())
     except KeyboardInterrupt:
         print("\n\n程序被用户中断")
         sys.exit(1)
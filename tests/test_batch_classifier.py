@@ -0,0 +1,132 @@
+"""批量分类测试"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.batch_classifier import BatchClassifier
+from src.collectors import keyword_matcher
+from src.collectors.base_collector import NewsItem
+from src.collectors.keyword_matcher import judge_category, judge_importance
+from src.collectors.stock_master import get_stock_master
+from src.news_store import NewsStore
+
+
+TITLES = [
+    "贵州茅台2026年半年度报告",
+    "贵州茅台关于回购股份进展情况的公告",
+    "五粮液发布新品",
+    "白酒板块午后拉升",
+    "贵州茅台董事会决议公告",
+    "分析师点评：贵州茅台维持买入评级",
+    "贵州茅台关于股东减持股份的提示性公告",
+    "大盘收评：沪指涨0.5%",
+]
+
+
+def _expected(titles, code="600519", name="贵州茅台"):
+    master = get_stock_master()
+    importances = [
+        judge_importance(title, code, name, mentions_other_issuer=master.mentions_other_issuer(title, code, name))
+        for title in titles
+    ]
+    return importances, [judge_category(title) for title in titles]
+
+
+def _write_rules(path, category):
+    path.write_text(
+        json.dumps({"default": "其他", "rules": [{"category": category, "keywords": ["公告"]}]}, ensure_ascii=False),
+        encoding="utf-8"
+    )
+    return str(path)
+
+
+def test_inline_matches_single_title_rules():
+    with BatchClassifier(workers=1) as classifier:
+        assert classifier.classify(TITLES, "600519", "贵州茅台") == _expected(TITLES)
+        assert classifier._pool is None
+
+
+def test_process_chunks_match_inline_and_keep_order():
+    titles = TITLES * 5
+    with BatchClassifier(workers=1) as inline:
+        expected = inline.classify(titles, "600519", "贵州茅台")
+    
+    with BatchClassifier(workers=2, chunk_size=3) as classifier:
+        result = classifier.classify(titles, "600519", "贵州茅台")
+        assert classifier._pool is not None
+    
+    assert result == expected
+    assert classifier.get_stats()['titles'] == len(titles)
+
+
+def test_per_title_stock_context_is_chunked_with_titles():
+    codes = ["600519", "000858"] * 4
+    names = ["贵州茅台", "五粮液"] * 4
+    titles = TITLES
+    
+    with BatchClassifier(workers=2, chunk_size=3) as classifier:
+        importances, _ = classifier.classify(titles, codes, names)
+    
+    master = get_stock_master()
+    assert importances == [
+        judge_importance(title, code, name, mentions_other_issuer=master.mentions_other_issuer(title, code, name))
+        for title, code, name in zip(titles, codes, names)
+    ]
+
+
+def test_mismatched_stock_context_is_rejected():
+    with BatchClassifier(workers=1) as classifier:
+        with pytest.raises(ValueError):
+            classifier.classify(TITLES, ["600519"], ["贵州茅台"])
+
+
+def test_category_rules_apply_without_touching_shared_classifier(tmp_path):
+    rules = _write_rules(tmp_path / "rules.json", "测试分类")
+    shared_path = keyword_matcher.CATEGORIES.config_path
+    titles = ["贵州茅台董事会决议公告"] * 4
+    
+    with BatchClassifier(workers=1, category_rules=rules) as inline:
+        _, inline_categories = inline.classify(titles, "600519", "贵州茅台")
+    with BatchClassifier(workers=2, chunk_size=2, category_rules=rules) as pooled:
+        _, pooled_categories = pooled.classify(titles, "600519", "贵州茅台")
+    
+    assert inline_categories == pooled_categories == ["测试分类"] * 4
+    assert keyword_matcher.CATEGORIES.config_path == shared_path
+    assert judge_category(titles[0]) != "测试分类"
+
+
+def test_reclassify_store_writes_only_changed_rows(tmp_path):
+    day = datetime(2026, 9, 1, 16, 0)
+    items = [
+        NewsItem(title, day - timedelta(hours=i), "东方财富", f"https://example.com/{i}")
+        for i, title in enumerate(TITLES)
+    ]
+    importances, categories = _expected(TITLES)
+    # 前两条已是当前规则的结果，其余为过时的分类
+    for i, item in enumerate(items):
+        item.importance = importances[i] if i < 2 else "过时"
+        item.category = categories[i] if i < 2 else "过时"
+    
+    with NewsStore(str(tmp_path / "news.db")) as store:
+        store.upsert("600519", items, "贵州茅台")
+        with BatchClassifier(workers=2, chunk_size=3) as classifier:
+            result = classifier.reclassify_store(store, {"600519": "贵州茅台"}, batch_size=5)
+        
+        assert result['total'] == len(TITLES)
+        assert result['changed'] == len(TITLES) - 2
+        assert result['missing_names'] == []
+        stored = {item.title: (item.importance, item.category) for item in store.query("600519")}
+    
+    assert stored == {title: pair for title, pair in zip(TITLES, zip(importances, categories))}
+
+
+def test_reclassify_store_reports_codes_without_names(tmp_path):
+    with NewsStore(str(tmp_path / "news.db")) as store:
+        store.upsert("000858", [NewsItem("五粮液发布新品", datetime(2026, 9, 1), "雪球", "https://example.com/a")])
+        with BatchClassifier(workers=1) as classifier:
+            result = classifier.reclassify_store(store)
+    
+    assert result['total'] == 1
+    assert result['missing_names'] == ["000858"]
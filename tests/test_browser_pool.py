@@ -0,0 +1,217 @@
+"""浏览器池测试：用假的 Playwright/浏览器验证页面并发上限、浏览器轮换和上下文清理"""
+
+import asyncio
+
+import pytest
+
+from src.collectors.browser_pool import BrowserPool
+
+
+class _FakeContext:
+    def __init__(self, browser, fail_new_page=False):
+        self.browser = browser
+        self.fail_new_page = fail_new_page
+        self.routes = []
+        self.closed = False
+    
+    async def route(self, pattern, handler):
+        self.routes.append(pattern)
+    
+    async def new_page(self):
+        if self.fail_new_page:
+            raise RuntimeError("new_page failed")
+        return object()
+    
+    async def close(self):
+        self.closed = True
+        self.browser.open_contexts -= 1
+
+
+class _FakeBrowser:
+    def __init__(self, playwright):
+        self.playwright = playwright
+        self.contexts = []
+        self.open_contexts = 0
+        self.connected = True
+        self.closed = False
+    
+    def is_connected(self):
+        return self.connected
+    
+    async def new_context(self, **options):
+        context = _FakeContext(self, fail_new_page=self.playwright.fail_new_page)
+        self.contexts.append(context)
+        self.open_contexts += 1
+        return context
+    
+    async def close(self):
+        self.closed = True
+
+
+class _FakeChromium:
+    def __init__(self, playwright):
+        self.playwright = playwright
+    
+    async def launch(self, **options):
+        browser = _FakeBrowser(self.playwright)
+        self.playwright.browsers.append(browser)
+        return browser
+
+
+class _FakePlaywright:
+    def __init__(self):
+        self.browsers = []
+        self.fail_new_page = False
+        self.stopped = False
+        self.chromium = _FakeChromium(self)
+    
+    async def stop(self):
+        self.stopped = True
+
+
+def _pool(**kwargs):
+    pool = BrowserPool(**kwargs)
+    playwright = _FakePlaywright()
+    # 预先放入假的 Playwright，_acquire_slot 不会再启动真实的 Playwright
+    pool._playwright = playwright
+    return pool, playwright
+
+
+def test_max_pages_bounds_open_pages():
+    pool, playwright = _pool(max_pages=2)
+    open_pages = 0
+    peak = 0
+    
+    async def borrow():
+        nonlocal open_pages, peak
+        async with pool.page():
+            open_pages += 1
+            peak = max(peak, open_pages)
+            await asyncio.sleep(0.01)
+            open_pages -= 1
+    
+    async def run():
+        await asyncio.gather(*(borrow() for _ in range(6)))
+        await pool.aclose()
+    
+    asyncio.run(run())
+    
+    assert peak == 2
+    assert pool.pages_served == 6
+    assert pool.launches == 1
+    assert all(context.closed for context in playwright.browsers[0].contexts)
+    assert playwright.browsers[0].closed
+    assert playwright.stopped
+
+
+def test_browser_rotates_after_max_uses():
+    pool, playwright = _pool(max_uses=2)
+    
+    async def run():
+        for _ in range(5):
+            async with pool.page():
+                pass
+        retired = [browser.closed for browser in playwright.browsers]
+        await pool.aclose()
+        return retired
+    
+    retired = asyncio.run(run())
+    
+    assert pool.launches == 3
+    assert [len(browser.contexts) for browser in playwright.browsers] == [2, 2, 1]
+    # 轮换下来的浏览器立即关闭，当前浏览器在 aclose 时关闭
+    assert retired == [True, True, False]
+    assert all(browser.closed for browser in playwright.browsers)
+
+
+def test_retired_browser_closes_after_last_page():
+    pool, playwright = _pool(max_uses=1, max_pages=2)
+    
+    async def run():
+        async with pool.page():
+            first = playwright.browsers[0]
+            # 第一个页面仍在使用时轮换：旧浏览器等页面关闭后才退出
+            async with pool.page():
+                assert pool.launches == 2
+                assert not first.closed
+            assert not first.closed
+        assert first.closed
+        await pool.aclose()
+    
+    asyncio.run(run())
+
+
+def test_disconnected_browser_is_replaced():
+    pool, playwright = _pool()
+    
+    async def run():
+        async with pool.page():
+            pass
+        playwright.browsers[0].connected = False
+        async with pool.page():
+            pass
+        await pool.aclose()
+    
+    asyncio.run(run())
+    
+    assert pool.launches == 2
+    assert playwright.browsers[0].closed
+
+
+def test_context_closed_when_caller_raises():
+    pool, playwright = _pool(max_pages=1)
+    
+    async def run():
+        with pytest.raises(ValueError):
+            async with pool.page():
+                raise ValueError("parse failed")
+        assert pool._current.active == 0
+        # 信号量已归还，之后仍可借出页面
+        async with pool.page():
+            pass
+        await pool.aclose()
+    
+    asyncio.run(run())
+    
+    browser = playwright.browsers[0]
+    assert [context.closed for context in browser.contexts] == [True, True]
+    assert browser.open_contexts == 0
+
+
+def test_context_closed_when_new_page_fails():
+    pool, playwright = _pool(max_pages=1)
+    playwright.fail_new_page = True
+    
+    async def run():
+        with pytest.raises(RuntimeError):
+            async with pool.page():
+                pass
+        slot = pool._current
+        await pool.aclose()
+        return slot
+    
+    slot = asyncio.run(run())
+    
+    assert playwright.browsers[0].contexts[0].closed
+    assert slot.active == 0
+    assert pool.pages_served == 0
+
+
+def test_route_policy_installed_only_when_blocking():
+    pool, playwright = _pool()
+    plain_pool, plain_playwright = _pool(block_resources=False)
+    
+    async def run():
+        async with pool.page():
+            pass
+        async with plain_pool.page():
+            pass
+        await pool.aclose()
+        await plain_pool.aclose()
+    
+    asyncio.run(run())
+    
+    assert playwright.browsers[0].contexts[0].routes == ['**/*']
+    assert plain_playwright.browsers[0].contexts[0].routes == []
+    assert 'routing' in pool.get_stats()
+    assert 'routing' not in plain_pool.get_stats()
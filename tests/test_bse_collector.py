@@ -0,0 +1,86 @@
+"""北交所收集器测试：只在公告接口不可用时回退到浏览器搜索"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from src.collectors.base_collector import NewsItem
+from src.collectors.bse_collector import BSECollector
+
+
+class _Session:
+    """只提供 client 的共享会话"""
+    
+    def __init__(self, handler):
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class _FakeBrowserBSE(BSECollector):
+    """浏览器回退只记录调用并返回一条固定公告"""
+    
+    def __init__(self, handler):
+        super().__init__("830799", "艾融软件", _Session(handler))
+        self.browser_calls = 0
+    
+    async def _collect_with_browser(self, start_date):
+        self.browser_calls += 1
+        return [NewsItem("艾融软件浏览器搜索公告", datetime.now(), "北交所", "https://www.bse.cn/disclosure/b.pdf")]
+
+
+def _payload(content, total_pages=1):
+    body = [{"listInfo": {"content": content, "totalPages": total_pages}}]
+    return httpx.Response(200, text="null(" + json.dumps(body, ensure_ascii=False) + ")")
+
+
+def _record(title="艾融软件关于召开股东大会的通知"):
+    return {
+        "disclosureTitle": title,
+        "destFilePath": "/disclosure/2026/a.pdf",
+        "publishDate": (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d"),
+    }
+
+
+def _collect(handler):
+    collector = _FakeBrowserBSE(handler)
+    items = asyncio.run(collector.collect(days=30))
+    return collector, items
+
+
+def test_direct_results_skip_browser():
+    collector, items = _collect(lambda request: _payload([_record()]))
+    
+    assert [item.title for item in items] == ["艾融软件关于召开股东大会的通知"]
+    assert collector.browser_calls == 0
+    assert not collector.errors
+
+
+def test_empty_direct_result_does_not_fall_back():
+    collector, items = _collect(lambda request: _payload([], total_pages=0))
+    
+    assert items == []
+    assert collector.browser_calls == 0
+    assert not collector.errors
+
+
+@pytest.mark.parametrize("response", [
+    httpx.Response(503, text="busy"),
+    httpx.Response(200, text="<html>系统维护中</html>"),
+    httpx.Response(200, text='null([{"listInfo": "维护中"}])'),
+], ids=["http-error", "html", "unexpected-shape"])
+def test_failed_direct_request_falls_back_to_browser(response):
+    collector, items = _collect(lambda request: response)
+    
+    assert collector.browser_calls == 1
+    assert [item.title for item in items] == ["艾融软件浏览器搜索公告"]
+    # 浏览器结果取代接口结果，接口失败不再影响完整性判断
+    assert not collector.errors
+
+
+def test_unrecognised_records_fall_back_to_browser():
+    collector, items = _collect(lambda request: _payload([{"unknownField": "艾融软件公告"}]))
+    
+    assert collector.browser_calls == 1
+    assert [item.title for item in items] == ["艾融软件浏览器搜索公告"]
@@ -0,0 +1,91 @@
+"""单只股票采集测试：总时限和单数据源时限到达时保留已产出的消息"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import stock_news_collector
+from src.collectors.base_collector import BaseCollector, NewsItem
+from stock_news_collector import collect_stock_news
+
+
+class _SleepyCollector(BaseCollector):
+    """每隔 delay 秒产出一页（每页一条消息）的收集器，不发请求"""
+    
+    def __init__(self, stock_code, stock_name, source, pages, delay):
+        super().__init__(stock_code, stock_name)
+        self.source = source
+        self.pages = pages
+        self.delay = delay
+    
+    def get_source_name(self):
+        return self.source
+    
+    async def collect(self, days=365):
+        return await self._collect_from_pages(days)
+    
+    async def collect_pages(self, days=365):
+        for page in range(self.pages):
+            if page:
+                await asyncio.sleep(self.delay)
+            yield [NewsItem(
+                f"{self.stock_name}{self.source}第{page + 1}页消息",
+                datetime.now() - timedelta(hours=page + 1),
+                self.source,
+                f"https://example.com/{self.source}/{page}"
+            )]
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    """快速数据源产出2页后结束；慢速数据源产出首页后每页等待10秒"""
+    def build(stock_code, stock_name="", *args):
+        return [
+            _SleepyCollector(stock_code, stock_name, "快速", pages=2, delay=0.01),
+            _SleepyCollector(stock_code, stock_name, "慢速", pages=3, delay=10),
+        ]
+    
+    monkeypatch.setattr(stock_news_collector, "build_collectors", build)
+
+
+def _collect(tmp_path, **kwargs):
+    start = time.perf_counter()
+    timeline = asyncio.run(collect_stock_news(
+        "600519", "贵州茅台", days=30, output_format="json", output_file=str(tmp_path / "timeline.json"),
+        verbose=False, **kwargs
+    ))
+    return timeline, time.perf_counter() - start
+
+
+def test_deadline_keeps_partial_results(tmp_path, sources):
+    timeline, elapsed = _collect(tmp_path, deadline=0.3)
+    
+    assert elapsed < 5
+    assert sorted(item.title for item in timeline.news_items) == [
+        "贵州茅台快速第1页消息", "贵州茅台快速第2页消息", "贵州茅台慢速第1页消息"
+    ]
+    assert timeline.incomplete_sources == {"慢速": "超出总时限 0.3 秒"}
+
+
+def test_source_budget_keeps_partial_results(tmp_path, sources):
+    timeline, elapsed = _collect(tmp_path, source_timeout=None, source_budgets={"慢速": 0.2})
+    
+    assert elapsed < 5
+    assert sorted(item.title for item in timeline.news_items) == [
+        "贵州茅台快速第1页消息", "贵州茅台快速第2页消息", "贵州茅台慢速第1页消息"
+    ]
+    assert timeline.incomplete_sources == {"慢速": "超过 0.2 秒未完成"}
+
+
+def test_sources_within_limits_are_complete(tmp_path, monkeypatch):
+    def build(stock_code, stock_name="", *args):
+        return [_SleepyCollector(stock_code, stock_name, "快速", pages=3, delay=0.01)]
+    
+    monkeypatch.setattr(stock_news_collector, "build_collectors", build)
+    
+    timeline, _ = _collect(tmp_path, deadline=5, source_budgets={"快速": 5})
+    
+    assert len(timeline.news_items) == 3
+    assert timeline.incomplete_sources == {}
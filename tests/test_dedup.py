@@ -0,0 +1,62 @@
+"""消息身份去重测试"""
+
+from datetime import datetime
+
+from src.collectors.base_collector import NewsItem
+from src.collectors.dedup import (
+    IdentityIndex,
+    announcement_id,
+    announcement_rank,
+    announcements_conflict,
+    canonicalize_url
+)
+
+
+DAY = datetime(2026, 9, 1, 16, 0)
+SSE_URL = "https://static.sse.com.cn/disclosure/listedinfo/announcement/c/new/2026-09-01/600519_20260901_{}.pdf"
+EM_URL = "https://data.eastmoney.com/notices/detail/600519/AN202609011234567890.html"
+TITLE = "贵州茅台关于回购股份进展情况的公告"
+
+
+def test_canonicalize_url_drops_tracking_noise():
+    assert canonicalize_url("http://www.Example.com//a/b/?utm_source=x&id=2&t=1#top") == "https://example.com/a/b?id=2"
+    assert canonicalize_url("//example.com/a") == "https://example.com/a"
+
+
+def test_announcement_id_namespaces():
+    assert announcement_id(SSE_URL.format("ABCD")) == "sse:600519_20260901_abcd"
+    assert announcement_id(EM_URL) == "em:AN202609011234567890"
+    assert announcement_id("http://www.cninfo.com.cn/new/disclosure/detail?announcementId=1224567890") == "cninfo:1224567890"
+    assert announcement_id("https://xueqiu.com/123") == ""
+
+
+def test_announcements_conflict_only_within_namespace():
+    sse = "sse:600519_20260901_abcd"
+    
+    assert announcements_conflict(sse, ["sse:600519_20260901_efgh"])
+    assert not announcements_conflict(sse, ["em:AN202609011234567890"])
+    assert not announcements_conflict(sse, [sse])
+    assert not announcements_conflict("", ["sse:600519_20260901_efgh"])
+
+
+def test_announcement_rank():
+    assert announcement_rank("sse:600519_20260901_abcd") > announcement_rank("em:AN202609011234567890") > announcement_rank("")
+
+
+def test_exchange_and_aggregator_copies_merge():
+    sse = NewsItem(TITLE, DAY, "上交所", SSE_URL.format("ABCD"))
+    em = NewsItem("贵州茅台：关于回购股份进展情况的公告", DAY, "东方财富", EM_URL)
+    repost = NewsItem(TITLE, DAY, "雪球", "https://xueqiu.com/123")
+    
+    index = IdentityIndex("600519", "贵州茅台")
+    unique = index.unique([repost, em, sse])
+    
+    assert unique == [sse]
+    assert index.duplicates == 2
+
+
+def test_distinct_exchange_files_stay_separate():
+    first = NewsItem(TITLE, DAY, "上交所", SSE_URL.format("ABCD"))
+    second = NewsItem(TITLE, DAY, "上交所", SSE_URL.format("EFGH"))
+    
+    assert IdentityIndex("600519", "贵州茅台").unique([first, second]) == [first, second]
@@ -0,0 +1,60 @@
+"""东方财富公告接口收集器测试"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import httpx
+
+from src.collectors.eastmoney_api_collector import EastmoneyAPICollector
+
+
+class _Session:
+    """只提供 client 的共享会话"""
+    
+    def __init__(self, handler):
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def _response(body):
+    return httpx.Response(200, text="jQuery(" + json.dumps(body, ensure_ascii=False) + ")")
+
+
+def _notices(page, count=50):
+    now = datetime.now()
+    return [
+        {
+            "title": f"<em>贵州茅台</em>公告{page}-{i}",
+            "date": (now - timedelta(hours=page * 50 + i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "url": f"https://data.eastmoney.com/notices/detail/600519/AN{page:04d}{i:04d}.html",
+            "content": "正文"
+        }
+        for i in range(count)
+    ]
+
+
+def _collect(handler):
+    collector = EastmoneyAPICollector("600519", "", http_session=_Session(handler))
+    return collector, asyncio.run(collector.collect(days=30))
+
+
+def test_api_error_is_recorded_as_failed_request():
+    collector, items = _collect(lambda request: _response({"code": 500, "msg": "系统繁忙"}))
+    
+    assert items == []
+    assert collector.incomplete
+    assert "系统繁忙" in collector.errors[0]
+
+
+def test_api_error_on_later_page_keeps_earlier_pages():
+    def handler(request):
+        page = json.loads(request.url.params["param"])["param"]["noticeWeb"]["pageIndex"]
+        if page == 2:
+            return _response({"code": 1, "msg": "限流"})
+        return _response({"code": 0, "hitsTotal": 120, "result": {"noticeWeb": _notices(page, 50 if page < 3 else 20)}})
+    
+    collector, items = _collect(handler)
+    
+    assert len(items) == 70
+    assert len(collector.errors) == 1
+    assert "第 2 页" in collector.errors[0]
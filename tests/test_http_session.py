@@ -0,0 +1,120 @@
+"""共享HTTP会话测试：按主机的连接名额在响应体关闭时释放"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.collectors.http_session import HostLimitedTransport
+
+
+HOST = "example.com"
+URL = f"https://{HOST}/api"
+
+
+class _RecordingLimiter:
+    """记录请求结果的限速器替身"""
+    
+    def __init__(self):
+        self.records = []
+    
+    async def acquire(self, host):
+        pass
+    
+    def record(self, host, status_code, body_size=None):
+        self.records.append((host, status_code, body_size))
+
+
+def _transport(handler, limiter=None, per_host_limit=1):
+    return HostLimitedTransport(httpx.MockTransport(handler), per_host_limit=per_host_limit, rate_limiter=limiter)
+
+
+def _permits(transport):
+    return transport._semaphores[HOST]._value
+
+
+def test_permit_held_until_body_closed():
+    transport = _transport(lambda request: httpx.Response(200, content=b"x" * 100))
+    
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            async with client.stream("GET", URL) as response:
+                assert _permits(transport) == 0
+                second = asyncio.create_task(client.get(URL))
+                await asyncio.sleep(0.05)
+                assert not second.done()
+                await response.aread()
+            response = await asyncio.wait_for(second, timeout=1)
+            assert response.status_code == 200
+        assert _permits(transport) == 1
+    
+    asyncio.run(run())
+
+
+def test_body_bytes_and_status_recorded():
+    limiter = _RecordingLimiter()
+    transport = _transport(lambda request: httpx.Response(429, content=b"x" * 123), limiter)
+    
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get(URL)
+    
+    asyncio.run(run())
+    
+    assert limiter.records == [(HOST, 429, 123)]
+    assert _permits(transport) == 1
+
+
+def test_permit_released_on_transport_error():
+    limiter = _RecordingLimiter()
+    
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+    
+    transport = _transport(handler, limiter)
+    
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(httpx.ConnectError):
+                await client.get(URL)
+    
+    asyncio.run(run())
+    
+    assert limiter.records == [(HOST, None, None)]
+    assert _permits(transport) == 1
+
+
+def test_permit_released_on_cancel():
+    async def run():
+        entered = asyncio.Event()
+        
+        async def handler(request):
+            entered.set()
+            await asyncio.sleep(10)
+            return httpx.Response(200)
+        
+        transport = _transport(handler)
+        async with httpx.AsyncClient(transport=transport) as client:
+            task = asyncio.create_task(client.get(URL))
+            await entered.wait()
+            assert _permits(transport) == 0
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        return transport
+    
+    transport = asyncio.run(run())
+    
+    assert _permits(transport) == 1
+
+
+def test_hosts_limited_independently():
+    transport = _transport(lambda request: httpx.Response(200, content=b"ok"), per_host_limit=1)
+    
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            async with client.stream("GET", URL):
+                other = await asyncio.wait_for(client.get("https://other.example.org/"), timeout=1)
+                assert other.status_code == 200
+    
+    asyncio.run(run())
@@ -0,0 +1,51 @@
+"""JSON/JSONP解码测试：与原来的正则+json.loads解码结果一致"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.bench_jsonp import _legacy_decode, _sample_payload
+from src.collectors import jsonp
+
+
+@pytest.mark.parametrize("source", ["sse", "eastmoney"])
+def test_decode_matches_legacy(source):
+    payload = _sample_payload(source)
+    expected = _legacy_decode(payload.decode("utf-8"))
+    
+    assert jsonp.decode(payload) == expected
+    assert jsonp.decode(payload.decode("utf-8")) == expected
+    assert jsonp.decode(bytearray(payload)) == expected
+
+
+@pytest.mark.parametrize("text", [
+    'cb({"a": [1, 2]})',
+    '  jQuery1234_5678({"a": [1, 2]});  \n',
+    'window.$cb({"a": [1, 2]})',
+    'null({"a": [1, 2]})',
+    'cb({"a": [1, 2], "s": "含(括号)的文本"})'
+])
+def test_callback_variants(text):
+    assert jsonp.decode(text) == _legacy_decode(text)
+    assert jsonp.decode(text.encode("utf-8")) == _legacy_decode(text)
+
+
+def test_plain_json_and_encoding():
+    assert jsonp.decode(b' [1, {"a": null}] ') == [1, {"a": None}]
+    assert jsonp.decode('cb({"title": "公告"})'.encode("gbk"), "gbk") == {"title": "公告"}
+
+
+@pytest.mark.parametrize("text", ['cb({"a": 1}', '<html>error</html>', ''])
+def test_invalid_payload_raises_value_error(text):
+    with pytest.raises(ValueError):
+        jsonp.decode(text.encode("utf-8"))
+
+
+def test_decode_stream():
+    payload = _sample_payload("sse")
+    
+    async def chunks():
+        for i in range(0, len(payload), 1000):
+            yield payload[i:i + 1000]
+    
+    assert asyncio.run(jsonp.decode_stream(chunks())) == jsonp.decode(payload)
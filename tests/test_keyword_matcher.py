@@ -0,0 +1,143 @@
+"""标题关键词匹配测试：与原来逐个关键词判断的实现结果一致"""
+
+import json
+import os
+
+import pytest
+
+from benchmarks.bench_keyword_matcher import _legacy_judge_category, _legacy_judge_importance, _sample_titles
+from src.collectors.keyword_matcher import (
+    CATEGORY_RULES,
+    DEFAULT_CATEGORY,
+    CategoryClassifier,
+    KeywordMatcher,
+    judge_category,
+    judge_importance
+)
+
+
+TITLES = _sample_titles(2000, distinct=2000) + [
+    "", "ETF资金流向", "贵州茅台：关于召开2026年第一次临时股东大会的通知",
+    "药明康德2026年半年度报告", "600519 分析师点评三季度业绩", "某科技公司荣获年度品牌奖"
+]
+
+
+@pytest.mark.parametrize("stock_code,stock_name", [("600519", "贵州茅台"), ("603259", "药明康德"), ("600519", "")])
+def test_judge_importance_matches_legacy(stock_code, stock_name):
+    for title in TITLES:
+        assert judge_importance(title, stock_code, stock_name) == _legacy_judge_importance(title, stock_code, stock_name), title
+
+
+def test_judge_category_matches_legacy():
+    for title in TITLES:
+        assert judge_category(title) == _legacy_judge_category(title), title
+
+
+def test_keyword_matcher_overlapping_patterns():
+    matcher = KeywordMatcher({'a': ['股东大会', '大会'], 'b': ['东大'], 'c': ['临时股东']})
+    
+    mask = matcher.scan("临时股东大会")
+    
+    assert matcher.groups(mask) == ['a', 'b', 'c']
+    assert matcher.scan("董事会") == 0
+
+
+def test_category_classifier_rule_priority():
+    classifier = CategoryClassifier([("治理", ["大会"]), ("财务", ["年报", "股东大会"]), ("治理", ["董事会"])], default="其他")
+    
+    assert classifier.classify("股东大会审议年报") == "治理"
+    assert classifier.classify("董事会审议年报") == "治理"
+    assert classifier.classify("发布年报") == "财务"
+    assert classifier.classify("新品上市") == "其他"
+
+
+def test_default_classifier_uses_builtin_rules():
+    classifier = CategoryClassifier()
+    
+    assert classifier.rules == [(category, list(keywords)) for category, keywords in CATEGORY_RULES]
+    assert classifier.default == DEFAULT_CATEGORY
+
+
+class _Clock:
+    """可手动推进的计时函数"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+def _write_rules(path, rules, default=None, mtime=None):
+    config = {"rules": [{"category": category, "keywords": keywords} for category, keywords in rules]}
+    if default:
+        config["default"] = default
+    path.write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+    if mtime is not None:
+        # 显式设置修改时间，不依赖文件系统的时间精度
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "rules.json"
+    _write_rules(path, [("治理", ["董事会"])], mtime=1_000_000)
+    return path
+
+
+def test_hot_reload_waits_for_check_interval(rules_file):
+    clock = _Clock()
+    classifier = CategoryClassifier(config_path=str(rules_file), clock=clock)
+    assert classifier.classify("董事会决议公告") == "治理"
+    
+    _write_rules(rules_file, [("公司治理", ["董事会"])], default="未分类", mtime=1_000_100)
+    clock.now += 4.9
+    
+    assert classifier.classify("董事会决议公告") == "治理"
+    assert classifier.reloads == 0
+    
+    clock.now += 0.1
+    
+    assert classifier.classify("董事会决议公告") == "公司治理"
+    assert classifier.classify("新品上市") == "未分类"
+    assert classifier.reloads == 1
+
+
+def test_hot_reload_skips_unchanged_file(rules_file):
+    clock = _Clock()
+    classifier = CategoryClassifier(config_path=str(rules_file), clock=clock)
+    clock.now += 5
+    
+    assert classifier.reload_if_changed() is False
+    assert classifier.classify("董事会决议公告") == "治理"
+    assert classifier.reloads == 0
+
+
+def test_hot_reload_keeps_rules_when_file_is_invalid(rules_file):
+    clock = _Clock()
+    classifier = CategoryClassifier(config_path=str(rules_file), clock=clock)
+    
+    rules_file.write_text("{不是JSON", encoding="utf-8")
+    os.utime(rules_file, (1_000_100, 1_000_100))
+    clock.now += 5
+    
+    assert classifier.classify("董事会决议公告") == "治理"
+    assert classifier.reloads == 0
+    
+    # 修正后的配置在下一次检查时生效
+    _write_rules(rules_file, [("公司治理", ["董事会"])], mtime=1_000_200)
+    clock.now += 5
+    
+    assert classifier.classify("董事会决议公告") == "公司治理"
+    assert classifier.reloads == 1
+
+
+def test_hot_reload_keeps_rules_when_file_is_removed(rules_file):
+    clock = _Clock()
+    classifier = CategoryClassifier(config_path=str(rules_file), clock=clock)
+    
+    rules_file.unlink()
+    clock.now += 5
+    
+    assert classifier.classify("董事会决议公告") == "治理"
+    assert classifier.reloads == 0
@@ -0,0 +1,56 @@
+"""近似重复聚类测试"""
+
+from datetime import datetime
+
+from src.collectors.base_collector import NewsItem
+from src.collectors.dedup import announcement_id
+from src.collectors.near_dup import NearDuplicateClusterer
+
+
+DAY = datetime(2026, 9, 1, 9, 30)
+SSE_URL = "https://static.sse.com.cn/disclosure/listedinfo/announcement/c/new/2026-09-01/600519_20260901_{}.pdf"
+EM_URL = "https://data.eastmoney.com/notices/detail/600519/AN20260901123456789{}.html"
+
+
+def _cluster(items):
+    return NearDuplicateClusterer("600519", "贵州茅台").cluster(items)
+
+
+def test_exchange_announcement_clusters_with_aggregator_copy():
+    sse = NewsItem("贵州茅台关于回购股份进展情况的公告", DAY, "上交所", SSE_URL.format("ABCD"))
+    em = NewsItem("贵州茅台：关于回购股份进展情况的公告", DAY, "东方财富", EM_URL.format("0"))
+    
+    clusters = _cluster([em, sse])
+    
+    assert len(clusters) == 1
+    assert clusters[0].representative is sse
+    assert len(clusters[0].items) == 2
+
+
+def test_same_exchange_announcements_stay_separate():
+    first = NewsItem("贵州茅台关于回购股份进展情况的公告", DAY, "上交所", SSE_URL.format("ABCD"))
+    second = NewsItem("贵州茅台关于回购股份进展情况的公告", DAY, "上交所", SSE_URL.format("EFGH"))
+    
+    assert len(_cluster([first, second])) == 2
+
+
+def test_media_reposts_cluster_within_window():
+    original = NewsItem("贵州茅台前三季度营业收入同比增长百分之十五", DAY, "同花顺", "https://news.10jqka.com.cn/1.shtml")
+    repost = NewsItem("贵州茅台：前三季度营业收入同比增长百分之十五", DAY, "雪球", "https://xueqiu.com/1")
+    late = NewsItem("贵州茅台前三季度营业收入同比增长百分之十五", datetime(2026, 12, 1), "雪球", "https://xueqiu.com/2")
+    
+    clusters = _cluster([original, repost, late])
+    
+    assert sorted(len(cluster.items) for cluster in clusters) == [1, 2]
+
+
+def test_repost_does_not_bridge_distinct_exchange_files():
+    first = NewsItem("贵州茅台关于回购股份进展情况的公告", DAY, "上交所", SSE_URL.format("ABCD"))
+    second = NewsItem("贵州茅台关于回购股份进展情况的公告", DAY, "上交所", SSE_URL.format("EFGH"))
+    repost = NewsItem("贵州茅台：关于回购股份进展情况的公告", datetime(2026, 9, 1, 18, 0), "东方财富", EM_URL.format("0"))
+    
+    clusters = _cluster([first, second, repost])
+    
+    assert sorted(len(cluster.items) for cluster in clusters) == [1, 2]
+    for cluster in clusters:
+        assert len({announcement_id(item.url) for item in cluster.items if "sse.com.cn" in item.url}) == 1
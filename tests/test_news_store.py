@@ -0,0 +1,138 @@
+"""本地消息库测试"""
+
+from datetime import datetime
+
+import pytest
+
+from src.collectors.base_collector import NewsItem
+from src.news_store import NewsStore
+
+
+DAY = datetime(2026, 9, 1, 16, 0)
+SSE_URL = "https://static.sse.com.cn/disclosure/listedinfo/announcement/c/new/2026-09-01/600519_20260901_{}.pdf"
+EM_URL = "https://data.eastmoney.com/notices/detail/600519/AN202609011234567890.html"
+TITLE = "贵州茅台关于回购股份进展情况的公告"
+
+
+def _sse(file_id="ABCD"):
+    return NewsItem(TITLE, DAY, "上交所", SSE_URL.format(file_id))
+
+
+def _em():
+    return NewsItem("贵州茅台：关于回购股份进展情况的公告", DAY, "东方财富", EM_URL, content="公告正文")
+
+
+def _repost():
+    return NewsItem(TITLE, DAY, "雪球", "https://xueqiu.com/123", content="转发评论")
+
+
+@pytest.fixture
+def store():
+    with NewsStore(":memory:") as store:
+        yield store
+
+
+def test_reposts_merge_into_exchange_original(store):
+    store.upsert("600519", [_sse()], "贵州茅台")
+    store.upsert("600519", [_repost(), _em()], "贵州茅台")
+    
+    items = store.query("600519")
+    
+    assert len(items) == 1
+    assert items[0].source == "上交所"
+    assert items[0].url == SSE_URL.format("ABCD")
+    assert items[0].content == "转发评论"
+
+
+def test_exchange_original_replaces_earlier_copies(store):
+    store.upsert("600519", [_repost()], "贵州茅台")
+    store.upsert("600519", [_em()], "贵州茅台")
+    store.upsert("600519", [_sse()], "贵州茅台")
+    
+    items = store.query("600519")
+    
+    assert len(items) == 1
+    assert items[0].source == "上交所"
+    assert items[0].url == SSE_URL.format("ABCD")
+    assert items[0].content == "公告正文"
+
+
+def test_distinct_exchange_files_are_kept(store):
+    store.upsert("600519", [_sse("ABCD")], "贵州茅台")
+    store.upsert("600519", [_sse("EFGH")], "贵州茅台")
+    
+    assert store.count("600519") == 2
+
+
+def test_identities_are_per_stock(store):
+    store.upsert("600519", [_repost()], "贵州茅台")
+    store.upsert("000858", [_repost()], "五粮液")
+    
+    assert store.count() == 2
+
+
+def _news(index, day, source="东方财富", importance="中", category="公司治理"):
+    return NewsItem(
+        f"贵州茅台第{index}项事项进展", day, source, f"https://example.com/news/{index}",
+        importance=importance, category=category
+    )
+
+
+def test_query_filters_and_orders_by_date(store):
+    store.upsert("600519", [
+        _news(1, datetime(2026, 9, 1), importance="高"),
+        _news(2, datetime(2026, 9, 3), source="雪球"),
+        _news(3, datetime(2026, 9, 2), category="财务报告"),
+    ], "贵州茅台")
+    
+    assert [item.title for item in store.query("600519")] == [
+        "贵州茅台第2项事项进展", "贵州茅台第3项事项进展", "贵州茅台第1项事项进展"
+    ]
+    assert [item.title for item in store.query("600519", start_date=datetime(2026, 9, 2))] == [
+        "贵州茅台第2项事项进展", "贵州茅台第3项事项进展"
+    ]
+    assert len(store.query("600519", end_date=datetime(2026, 9, 2))) == 2
+    assert [item.source for item in store.query("600519", source="雪球")] == ["雪球"]
+    assert [item.importance for item in store.query("600519", importance="高")] == ["高"]
+    assert [item.category for item in store.query("600519", category="财务报告")] == ["财务报告"]
+    assert len(store.query("600519", limit=1)) == 1
+    assert store.query("000858") == []
+
+
+def test_upsert_updates_existing_record(store):
+    store.upsert("600519", [_news(1, datetime(2026, 9, 1), importance="低")], "贵州茅台")
+    updated = _news(1, datetime(2026, 9, 1), importance="高")
+    updated.content = "公告正文"
+    
+    assert store.upsert("600519", [updated], "贵州茅台") == 1
+    
+    items = store.query("600519")
+    assert store.count("600519") == 1
+    assert (items[0].importance, items[0].content) == ("高", "公告正文")
+    assert store.upsert("600519", []) == 0
+
+
+def test_count_and_statistics(store):
+    store.upsert("600519", [
+        _news(1, datetime(2026, 9, 1, 9, 30)),
+        _news(2, datetime(2026, 9, 3, 15, 0), source="雪球"),
+    ], "贵州茅台")
+    store.upsert("000858", [_news(3, datetime(2026, 9, 2))], "五粮液")
+    
+    assert store.count() == 3
+    assert store.count("600519") == 2
+    assert store.get_statistics("600519") == {
+        'total': 2,
+        'date_range': {'start': "2026-09-01 09:30:00", 'end': "2026-09-03 15:00:00"},
+        'sources': {"东方财富": 1, "雪球": 1}
+    }
+    assert store.get_statistics("300750") == {'total': 0, 'date_range': None, 'sources': {}}
+
+
+def test_store_persists_to_file(tmp_path):
+    path = str(tmp_path / "data" / "news.db")
+    with NewsStore(path) as store:
+        store.upsert("600519", [_news(1, datetime(2026, 9, 1))], "贵州茅台")
+    
+    with NewsStore(path) as store:
+        assert [item.url for item in store.query("600519")] == ["https://example.com/news/1"]
@@ -0,0 +1,43 @@
+"""网页解析测试：lxml 快速路径与 BeautifulSoup 对照实现结果一致"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.bench_parsing import SAMPLE_PARSERS, _sample_page
+from src.collectors import parsing
+
+
+@pytest.mark.parametrize("source", sorted(SAMPLE_PARSERS))
+def test_lxml_matches_bs4_on_sample_pages(source):
+    fast, reference = SAMPLE_PARSERS[source]
+    html = _sample_page(source, entries=40, filler=30)
+    
+    result = fast(html)
+    
+    assert result == reference(html)
+    assert result
+
+
+@pytest.mark.parametrize("source", sorted(SAMPLE_PARSERS))
+@pytest.mark.parametrize("html", [
+    "",
+    "<html><body><p>没有消息</p></body></html>",
+    "<html><body><ul class=\"news_list\"><li><a>无链接</a></li><li><a href=\"/x.shtml\"></a></li></ul></body></html>",
+    "<div class=\"articleh\"><span class=\"l3\"><a href=\"/n.html\">帖子&amp;标题 <b>加粗</b></a></span></div>"
+])
+def test_lxml_matches_bs4_on_edge_cases(source, html):
+    fast, reference = SAMPLE_PARSERS[source]
+    
+    assert fast(html) == reference(html)
+
+
+@pytest.mark.parametrize("mode", parsing.ParsingExecutor.MODES)
+def test_parsing_executor_modes(mode):
+    html = _sample_page("tonghuashun_search", entries=5, filler=5)
+    
+    async def run():
+        async with parsing.ParsingExecutor(mode=mode, max_workers=1) as executor:
+            return await executor.run(parsing.parse_tonghuashun_search, html)
+    
+    assert asyncio.run(run()) == parsing.parse_tonghuashun_search(html)
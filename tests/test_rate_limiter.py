@@ -0,0 +1,142 @@
+"""按主机限速器测试：AIMD调速、降速冷却、实际速率统计和限流信号判断"""
+
+import asyncio
+
+import pytest
+
+from src.collectors.rate_limiter import HostRateLimiter, TokenBucket
+
+
+class _Clock:
+    """可手动推进的计时函数"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def fake_sleep(clock, monkeypatch):
+    """asyncio.sleep 只推进假时钟，记录每次等待的秒数"""
+    sleeps = []
+    
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        clock.now += seconds
+    
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    return sleeps
+
+
+def test_throttle_decreases_multiplicatively_once_per_cooldown(clock):
+    bucket = TokenBucket(8.0, cooldown=1.0, clock=clock)
+    
+    bucket.on_throttle()
+    assert bucket.rate == 4.0
+    
+    # 同一波失败在冷却期内只降速一次
+    clock.now += 0.5
+    bucket.on_throttle()
+    assert bucket.rate == 4.0
+    
+    clock.now += 0.5
+    bucket.on_throttle()
+    assert bucket.rate == 2.0
+    assert bucket.throttled == 3
+
+
+def test_throttle_stops_at_min_rate(clock):
+    bucket = TokenBucket(1.0, min_rate=0.3, clock=clock)
+    for _ in range(5):
+        bucket.on_throttle()
+        clock.now += 1
+    
+    assert bucket.rate == 0.3
+
+
+def test_success_increases_additively_up_to_configured_rate(clock):
+    bucket = TokenBucket(2.0, increase_step=0.5, clock=clock)
+    bucket.on_throttle()
+    assert bucket.rate == 1.0
+    
+    bucket.on_success()
+    assert bucket.rate == 1.5
+    bucket.on_success()
+    bucket.on_success()
+    assert bucket.rate == 2.0
+
+
+def test_acquire_waits_for_refill_at_current_rate(clock, fake_sleep):
+    bucket = TokenBucket(2.0, clock=clock)
+    
+    async def run():
+        for _ in range(4):
+            await bucket.acquire()
+    
+    asyncio.run(run())
+    
+    # 初始容量2个令牌，之后每0.5秒补充一个
+    assert fake_sleep == [0.5, 0.5]
+    assert clock.now == 1001.0
+    assert bucket.requests == 4
+
+
+def test_observed_rate_uses_sliding_window(clock):
+    bucket = TokenBucket(100.0, window=10.0, clock=clock)
+    
+    async def run():
+        for _ in range(5):
+            await bucket.acquire()
+            clock.now += 1
+    
+    asyncio.run(run())
+    
+    assert bucket.observed_rate() == 1.0
+    
+    # 窗口外的请求不再计入：10秒窗口内只剩最后两次请求
+    clock.now += 8
+    assert bucket.observed_rate() == 0.2
+    clock.now += 10
+    assert bucket.observed_rate() == 0.0
+
+
+@pytest.mark.parametrize("status_code,body_size", [
+    (None, None), (403, 100), (429, 100), (500, 100), (503, None), (200, 0)
+])
+def test_throttle_signals(clock, status_code, body_size):
+    limiter = HostRateLimiter({"example.com": 4.0}, clock=clock)
+    
+    limiter.record("example.com", status_code, body_size)
+    
+    stats = limiter.get_stats()["example.com"]
+    assert stats['current_rate'] == 2.0
+    assert stats['throttled'] == 1
+
+
+@pytest.mark.parametrize("status_code,body_size", [(200, 100), (200, None), (404, 0), (302, 0)])
+def test_normal_responses_are_not_throttled(clock, status_code, body_size):
+    limiter = HostRateLimiter({"example.com": 4.0}, clock=clock)
+    limiter.bucket("example.com").rate = 3.0
+    
+    limiter.record("example.com", status_code, body_size)
+    
+    stats = limiter.get_stats()["example.com"]
+    assert stats['current_rate'] == 3.2
+    assert stats['throttled'] == 0
+
+
+def test_hosts_use_separate_buckets(clock):
+    limiter = HostRateLimiter({"a.example.com": 4.0}, default_rate=10.0, clock=clock)
+    
+    limiter.record("a.example.com", 429)
+    
+    assert limiter.bucket("a.example.com").rate == 2.0
+    assert limiter.bucket("b.example.com").rate == 10.0
+    assert limiter.bucket("b.example.com").max_rate == 10.0
@@ -0,0 +1,59 @@
+"""请求容错层测试"""
+
+import asyncio
+
+import httpx
+
+from src.collectors.resilience import RETRY_EXTENSION, ResilientTransport, RetryPolicy
+
+
+def _run(method, status=503, failure_threshold=5, retry_policy=None, **kwargs):
+    calls = []
+    
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(status)
+    
+    transport = ResilientTransport(
+        httpx.MockTransport(handler),
+        retry_policy=retry_policy or RetryPolicy(max_attempts=3, base_delay=0),
+        failure_threshold=failure_threshold
+    )
+    
+    async def send():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.request(method, "https://example.com/api", **kwargs)
+    
+    response = asyncio.run(send())
+    return response, calls, transport
+
+
+def test_get_is_retried():
+    response, calls, _ = _run("GET")
+    
+    assert response.status_code == 503
+    assert calls == ["GET"] * 3
+
+
+def test_post_is_not_retried_by_default():
+    _, calls, _ = _run("POST", json={"prompt": "摘要"})
+    
+    assert calls == ["POST"]
+
+
+def test_post_retry_opt_in():
+    _, per_request, _ = _run("POST", extensions={RETRY_EXTENSION: True})
+    _, per_client, _ = _run(
+        "POST", retry_policy=RetryPolicy(max_attempts=3, base_delay=0, retry_methods=["GET", "POST"])
+    )
+    
+    assert per_request == ["POST"] * 3
+    assert per_client == ["POST"] * 3
+
+
+def test_forbidden_counts_as_breaker_failure():
+    response, calls, transport = _run("GET", status=403, failure_threshold=1)
+    
+    assert response.status_code == 403
+    assert calls == ["GET"]
+    assert transport.open_hosts() == ["example.com"]
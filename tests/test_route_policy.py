@@ -0,0 +1,80 @@
+"""浏览器请求拦截策略测试"""
+
+import asyncio
+
+import pytest
+
+from src.collectors.browser_pool import RoutePolicy
+
+
+@pytest.mark.parametrize("resource_type,url,blocked", [
+    ("image", "https://www.bse.cn/logo.png", True),
+    ("font", "https://www.sse.com.cn/a.woff", True),
+    ("stylesheet", "https://www.szse.cn/a.css", True),
+    ("media", "https://www.bse.cn/a.mp4", True),
+    ("document", "https://www.bse.cn/disclosure/announcement.html", False),
+    ("xhr", "https://www.bse.cn/disclosureInfoController/infoResult.do", False),
+    ("script", "https://query.sse.com.cn/a.js", False),
+    ("script", "https://hm.baidu.com/hm.js", True),
+    ("xhr", "https://notsse.com.cn/api", True),
+    ("document", "https://example.com/", False),
+    ("script", "data:text/javascript,1", False),
+])
+def test_should_block(resource_type, url, blocked):
+    assert RoutePolicy().should_block(resource_type, url) is blocked
+
+
+def test_third_party_allowed_when_disabled():
+    policy = RoutePolicy(block_third_party=False)
+    
+    assert not policy.should_block("script", "https://hm.baidu.com/hm.js")
+    assert policy.should_block("image", "https://hm.baidu.com/a.png")
+
+
+def test_custom_types_and_domains():
+    policy = RoutePolicy(blocked_types=["media"], first_party_domains=["example.com"])
+    
+    assert not policy.should_block("image", "https://cdn.example.com/a.png")
+    assert policy.should_block("image", "https://www.bse.cn/a.png")
+
+
+class _FakeRequest:
+    def __init__(self, resource_type, url):
+        self.resource_type = resource_type
+        self.url = url
+
+
+class _FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = _FakeRequest(resource_type, url)
+        self.result = None
+    
+    async def abort(self):
+        self.result = "abort"
+    
+    async def continue_(self):
+        self.result = "continue"
+
+
+def test_handle_records_stats():
+    policy = RoutePolicy()
+    routes = [
+        _FakeRoute("image", "https://www.bse.cn/a.png"),
+        _FakeRoute("image", "https://www.bse.cn/b.png"),
+        _FakeRoute("script", "https://hm.baidu.com/hm.js"),
+        _FakeRoute("xhr", "https://www.bse.cn/api"),
+    ]
+    
+    async def run():
+        for route in routes:
+            await policy.handle(route)
+    
+    asyncio.run(run())
+    stats = policy.get_stats()
+    
+    assert [route.result for route in routes] == ["abort", "abort", "abort", "continue"]
+    assert stats["allowed_requests"] == 1
+    assert stats["blocked_requests"] == 3
+    assert stats["blocked_third_party"] == 1
+    assert stats["blocked_by_type"] == {"image": 2, "script": 1}
+    assert stats["estimated_bytes_saved"] == 2 * 30_000 + 40_000
@@ -0,0 +1,44 @@
+"""股票主数据测试"""
+
+from benchmarks.bench_keyword_matcher import _legacy_judge_importance
+from src.collectors.keyword_matcher import judge_importance
+from src.collectors.stock_master import Issuer, StockMaster
+
+
+def _importance(master, title, stock_code="688000", stock_name="瑞博生物"):
+    return judge_importance(
+        title, stock_code, stock_name,
+        mentions_other_issuer=master.mentions_other_issuer(title, stock_code, stock_name)
+    )
+
+
+def test_fallback_keeps_original_importance_rules():
+    master = StockMaster.fallback()
+    titles = [
+        "沃森生物2026年半年度报告",
+        "药明康德2026年半年度报告",
+        "瑞博生物与沃森生物签署合作协议",
+        "康希诺发布业绩快报"
+    ]
+    
+    for title in titles:
+        assert _importance(master, title) == _legacy_judge_importance(title, "688000", "瑞博生物")
+    assert _importance(master, "沃森生物2026年半年度报告") == "高"
+
+
+def test_fallback_names_still_drive_relevance():
+    master = StockMaster.fallback()
+    
+    assert master.leading_issuer("沃森生物2026年半年度报告") == "沃森生物"
+    assert master.other_issuers("沃森生物2026年半年度报告", "688000", "瑞博生物") == ["沃森生物"]
+
+
+def test_loaded_master_marks_other_issuers():
+    master = StockMaster([
+        Issuer(code="600519", name="贵州茅台", exchange="SH"),
+        Issuer(code="000858", name="五粮液", exchange="SZ")
+    ])
+    
+    assert master.mentions_other_issuer("五粮液2026年半年度报告", "600519", "贵州茅台") is True
+    assert master.mentions_other_issuer("贵州茅台2026年半年度报告", "600519", "贵州茅台") is False
+    assert _importance(master, "五粮液2026年半年度报告", "600519", "贵州茅台") == "低"
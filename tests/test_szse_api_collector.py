@@ -0,0 +1,124 @@
+"""深交所日期分片测试：分片边界和超出分页上限时的拆分"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.collectors.base_collector import NewsItem
+from src.collectors.szse_api_collector import SZSEAPICollector
+
+
+@pytest.mark.parametrize("start,end,slice_days", [
+    (datetime(2025, 9, 1, 14, 30), datetime(2026, 9, 1, 10, 0), 90),
+    (datetime(2026, 8, 1), datetime(2026, 9, 1), 1),
+    (datetime(2026, 8, 1), datetime(2026, 9, 1), 31),
+    (datetime(2026, 8, 1), datetime(2026, 9, 1), 32),
+    (datetime(2026, 9, 1, 8, 0), datetime(2026, 9, 1, 18, 0), 90),
+])
+def test_date_slices_cover_window_without_overlap(start, end, slice_days):
+    slices = SZSEAPICollector._date_slices(start, end, slice_days)
+    
+    assert slices[0][1] == end
+    assert slices[-1][0] == start
+    for slice_start, slice_end in slices:
+        assert slice_start <= slice_end
+        assert (slice_end.date() - slice_start.date()).days + 1 <= slice_days
+    # 相邻分片首尾相差一天：既不重叠也不留空
+    for (newer_start, _), (_, older_end) in zip(slices, slices[1:]):
+        assert newer_start.date() - older_end.date() == timedelta(days=1)
+
+
+def test_date_slices_zero_days_uses_single_day_slices():
+    slices = SZSEAPICollector._date_slices(datetime(2026, 9, 1), datetime(2026, 9, 3), 0)
+    
+    assert [slice_end.day for _, slice_end in slices] == [3, 2, 1]
+
+
+class _FakeSZSE(SZSEAPICollector):
+    """按日期范围分页返回固定公告的深交所采集器（不发请求），分页上限为 5 条 * 2 页"""
+    
+    PAGE_SIZE = 5
+    MAX_PAGES = 2
+    PAGE_CONCURRENCY = 1
+    
+    def __init__(self, items):
+        super().__init__("000002", "万科A")
+        self.all_items = sorted(items, key=lambda item: item.date, reverse=True)
+        self.requests = []
+    
+    async def _collect_page(self, client, slice_start, slice_end, page_num, page_size):
+        self.requests.append((slice_start.date(), slice_end.date(), page_num))
+        matched = [
+            item for item in self.all_items
+            if slice_start.date() <= item.date.date() <= slice_end.date()
+        ]
+        start = (page_num - 1) * page_size
+        return list(matched[start:start + page_size]), len(matched)
+
+
+def _items(per_day):
+    """per_day: {日期: 条数}"""
+    return [
+        NewsItem(f"万科A公告{day:%m%d}-{i}", day + timedelta(hours=9, minutes=i), "深交所",
+                 f"https://disc.static.szse.cn/download/{day:%Y%m%d}_{i}.pdf")
+        for day, count in per_day.items()
+        for i in range(count)
+    ]
+
+
+def _collect(collector, start, end):
+    return asyncio.run(collector._collect_slice(None, start, end))
+
+
+def test_slice_within_capacity_is_not_split():
+    items = _items({datetime(2026, 9, d): 2 for d in range(1, 5)})
+    collector = _FakeSZSE(items)
+    
+    result = _collect(collector, datetime(2026, 9, 1), datetime(2026, 9, 4))
+    
+    assert sorted(item.url for item in result) == sorted(item.url for item in items)
+    assert [page for _, _, page in collector.requests] == [1, 2]
+    assert not collector.errors
+
+
+def test_split_collects_every_item_once_and_reuses_first_page():
+    # 4 天共 16 条，超过 10 条的分页上限；最新的两天各 4 条，首页 5 条全部落在较新的一半
+    items = _items({datetime(2026, 9, d): 4 for d in range(1, 5)})
+    collector = _FakeSZSE(items)
+    
+    result = _collect(collector, datetime(2026, 9, 1), datetime(2026, 9, 4))
+    
+    assert sorted(item.url for item in result) == sorted(item.url for item in items)
+    assert len(result) == len(items)
+    assert not collector.errors
+    newer_half = [page for start, _, page in collector.requests if start == datetime(2026, 9, 3).date()]
+    assert newer_half == [2]
+
+
+def test_split_refetches_first_page_that_spans_both_halves():
+    # 最新一天只有 2 条，原分片首页跨越两半，较新的一半重新请求首页
+    items = _items({datetime(2026, 9, 4): 2, datetime(2026, 9, 3): 1, datetime(2026, 9, 2): 6, datetime(2026, 9, 1): 6})
+    collector = _FakeSZSE(items)
+    
+    result = _collect(collector, datetime(2026, 9, 1), datetime(2026, 9, 4))
+    
+    assert sorted(item.url for item in result) == sorted(item.url for item in items)
+    assert (datetime(2026, 9, 3).date(), datetime(2026, 9, 4).date(), 1) in collector.requests
+    assert not collector.errors
+
+
+def test_split_recurses_until_single_day_over_capacity_is_reported():
+    # 9月2日单日 12 条，无法再拆分：记录错误，只取前 10 条
+    items = _items({datetime(2026, 9, 1): 3, datetime(2026, 9, 2): 12})
+    collector = _FakeSZSE(items)
+    
+    result = _collect(collector, datetime(2026, 9, 1), datetime(2026, 9, 2))
+    
+    day2 = [item for item in result if item.date.day == 2]
+    day1 = [item for item in result if item.date.day == 1]
+    assert len(day2) == 10
+    assert len(day1) == 3
+    assert len({item.url for item in result}) == len(result)
+    assert len(collector.errors) == 1
+    assert "2026-09-02~2026-09-02 公告数超过分页上限" in collector.errors[0]
@@ -0,0 +1,130 @@
+"""自选股批量采集测试"""
+
+import asyncio
+import json
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+import stock_news_collector
+from src.collectors.base_collector import BaseCollector, NewsItem
+from stock_news_collector import SourceSemaphores, collect_watchlist, load_watchlist
+
+
+class _StubCollector(BaseCollector):
+    """不发请求的收集器：等待一段时间后返回一条消息，并记录同一数据源的最大并发数"""
+    
+    active = Counter()
+    peak = Counter()
+    
+    def __init__(self, stock_code, stock_name, source, delay=0.05):
+        super().__init__(stock_code, stock_name)
+        self.source = source
+        self.delay = delay
+    
+    def get_source_name(self):
+        return self.source
+    
+    async def collect(self, days=365):
+        cls = type(self)
+        cls.active[self.source] += 1
+        cls.peak[self.source] = max(cls.peak[self.source], cls.active[self.source])
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            cls.active[self.source] -= 1
+        return [NewsItem(
+            f"{self.stock_name}关于{self.source}事项的公告",
+            datetime.now() - timedelta(days=1),
+            self.source,
+            f"https://example.com/{self.source}/{self.stock_code}"
+        )]
+
+
+@pytest.fixture
+def stub_collectors(monkeypatch):
+    _StubCollector.active.clear()
+    _StubCollector.peak.clear()
+    
+    def build(stock_code, stock_name="", *args):
+        return [_StubCollector(stock_code, stock_name, source) for source in ("交易所", "东方财富")]
+    
+    monkeypatch.setattr(stock_news_collector, "build_collectors", build)
+
+
+def test_load_watchlist_skips_comments_and_duplicates(tmp_path):
+    path = tmp_path / "watchlist.txt"
+    path.write_text(
+        "# 自选股\n600519 贵州茅台\n\n000858,五粮液\n300750，宁德时代\n600519 重复\n830799\n",
+        encoding="utf-8"
+    )
+    
+    assert load_watchlist(str(path)) == [
+        ("600519", "贵州茅台"),
+        ("000858", "五粮液"),
+        ("300750", "宁德时代"),
+        ("830799", ""),
+    ]
+
+
+def test_source_semaphores_are_created_per_source():
+    async def run():
+        semaphores = SourceSemaphores(0)
+        first = semaphores["东方财富"]
+        assert semaphores["东方财富"] is first
+        assert semaphores["雪球"] is not first
+        assert semaphores.limit == 1
+        
+        async with first:
+            assert first.locked()
+            assert not semaphores["雪球"].locked()
+    
+    asyncio.run(run())
+
+
+def test_collect_watchlist_bounds_concurrency_and_writes_summary(tmp_path, stub_collectors):
+    watchlist = tmp_path / "watchlist.txt"
+    codes = ["600519", "000858", "600036", "000001", "601318", "000333"]
+    watchlist.write_text("\n".join(f"{code} 股票{code}" for code in codes), encoding="utf-8")
+    output_dir = tmp_path / "timelines"
+    
+    summary = asyncio.run(collect_watchlist(
+        str(watchlist),
+        output_format="json",
+        output_dir=str(output_dir),
+        concurrency=4,
+        source_concurrency=2
+    ))
+    
+    # 每个数据源同时服务的股票数不超过 source_concurrency
+    assert _StubCollector.peak == {"交易所": 2, "东方财富": 2}
+    assert summary['total_stocks'] == summary['succeeded'] == len(codes)
+    assert summary['failed'] == summary['skipped'] == 0
+    assert summary['total_news'] == 2 * len(codes)
+    assert summary['stocks_per_minute'] > 0
+    assert [record['stock_code'] for record in summary['stocks']] == codes
+    for code in codes:
+        assert (output_dir / f"timeline_{code}.json").exists()
+    
+    with open(output_dir / "batch_summary.json", encoding="utf-8") as f:
+        written = json.load(f)
+    assert written['succeeded'] == len(codes)
+    assert written['stocks_per_minute'] == summary['stocks_per_minute']
+    assert written['stocks'] == summary['stocks']
+
+
+def test_collect_watchlist_limits_concurrent_stocks(tmp_path, stub_collectors):
+    watchlist = tmp_path / "watchlist.txt"
+    watchlist.write_text("\n".join(f"60000{i}" for i in range(5)), encoding="utf-8")
+    
+    asyncio.run(collect_watchlist(
+        str(watchlist),
+        output_format="json",
+        output_dir=str(tmp_path / "timelines"),
+        concurrency=1,
+        source_concurrency=4
+    ))
+    
+    # 只允许一只股票同时采集时，每个数据源也只有一个请求在进行
+    assert _StubCollector.peak == {"交易所": 1, "东方财富": 1}
@@ -0,0 +1,73 @@
+"""增量采集状态测试"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from src.collectors.base_collector import NewsItem
+from src.collectors.szse_api_collector import SZSEAPICollector
+from src.collectors.watermark import Watermark, WatermarkStore
+
+
+def _item(index, date):
+    return NewsItem(f"万科A关于第{index}项事项的公告", date, "深交所", f"https://disc.static.szse.cn/download/{index}.pdf")
+
+
+def test_state_round_trip(tmp_path):
+    store = WatermarkStore(str(tmp_path))
+    state = store.load("000002")
+    start = datetime(2026, 1, 1)
+    items = [_item(i, datetime(2026, 9, 1, 10, i)) for i in range(3)]
+    state.watermark("深交所").advance(items, start)
+    state.merge(items, start)
+    state.save()
+    
+    loaded = store.load("000002")
+    mark = loaded.watermark("深交所")
+    
+    assert mark.last_date == datetime(2026, 9, 1, 10, 2)
+    assert mark.covered_since == start
+    assert mark.known_urls == {item.url for item in items}
+    assert [item.url for item in loaded.history] == [item.url for item in reversed(items)]
+    assert Watermark.from_dict(mark.to_dict()) == mark
+
+
+def test_window_start_uses_watermark_day():
+    mark = Watermark(last_date=datetime(2026, 9, 1, 10, 0), covered_since=datetime(2026, 1, 1))
+    
+    assert mark.window_start(datetime(2026, 3, 1)) == datetime(2026, 9, 1)
+    # 请求的窗口超出历史覆盖范围时全量采集
+    assert mark.window_start(datetime(2025, 6, 1)) == datetime(2025, 6, 1)
+    assert Watermark().window_start(datetime(2026, 3, 1)) == datetime(2026, 3, 1)
+
+
+class _PagedSZSE(SZSEAPICollector):
+    """按页返回固定公告列表的深交所采集器（不发请求）"""
+    
+    PAGE_CONCURRENCY = 1
+    
+    def __init__(self, items):
+        super().__init__("000002", "万科A")
+        self.all_items = items
+        self.requested = []
+    
+    async def _collect_page(self, client, slice_start, slice_end, page_num, page_size):
+        self.requested.append(page_num)
+        start = (page_num - 1) * page_size
+        return list(self.all_items[start:start + page_size]), len(self.all_items)
+
+
+def test_incremental_collection_stops_at_known_page():
+    newest = datetime(2026, 9, 1, 18, 0)
+    items = [_item(i, newest - timedelta(minutes=i)) for i in range(400)]
+    collector = _PagedSZSE(items)
+    collector.watermark = Watermark(
+        last_date=items[120].date,
+        covered_since=datetime(2026, 1, 1),
+        known_urls={item.url for item in items[120:]}
+    )
+    
+    collected = asyncio.run(collector._collect_slice(None, datetime(2026, 8, 1), newest))
+    
+    assert collector.requested == [1, 2, 3]
+    assert len(collected) == 150
+    assert sum(not collector.watermark.is_known(item) for item in collected) == 120